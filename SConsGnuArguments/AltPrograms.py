@@ -46,6 +46,23 @@ Supported variables:
     YACC
         The yacc program
 
+Detection of programs:
+======================
+
+By default the variables are left undefined. `Detect()` searches PATH for
+the same candidate programs as autoconf does (e.g. ``gawk mawk nawk awk``
+for ``AWK``) and returns values which may be used as defaults::
+
+    decls = SConsGnuArguments.AltPrograms.Declarations(detect = True)
+
+`DetectLex()` determines ``LEX_OUTPUT_ROOT`` and ``LEXLIB`` by a trial run
+of the lex program found.
+
+`Probe()` also determines flavors of the programs found and may store the
+results in a file, such that subsequent runs don't need to run any of them::
+
+    progs = SConsGnuArguments.AltPrograms.Detect(env, cache_file = True)
+
 .. _autoconf output variables: http://www.gnu.org/software/autoconf/manual/autoconf.html#Output-Variable-Index
 .. _Alternative Programs: http://www.gnu.org/software/autoconf/manual/autoconf.html#Alternative-Programs
 """
@@ -74,63 +91,83 @@ Supported variables:
 
 __docformat__ = 'restructuredText'
 
-import SConsArguments
+import os
+import sys
 import SConsGnuArguments.Util
 
-UNDEFINED = SConsArguments.UNDEFINED
-
-#############################################################################
-_std_arg_triples = [
-    ( 'AWK',
-      "The awk program",
-      UNDEFINED ),
-    ( 'EGREP',
-      "The egrep program",
-      UNDEFINED ),
-    ( 'FGREP',
-      "The fgrep program",
-      UNDEFINED ),
-    ( 'GREP',
-      "The grep program",
-      UNDEFINED ),
-    ( 'INSTALL',
-      "The program used to install files",
-      UNDEFINED ),
-    ( 'INSTALL_DATA',
-       "The program used to install data",
-      '${INSTALL}'),
-    ( 'INSTALL_PROGRAM',
-      "The program used to install programs",
-      '${INSTALL}'),
-    ( 'INSTALL_SCRIPT',
-      "The program used to install scripts",
-      '${INSTALL}'),
-    ( 'LEX',
-      "The lex program",
-      UNDEFINED ),
-    ( 'LEX_OUTPUT_ROOT',
-      "The base of the file name that the LEX generates",
-      UNDEFINED ),
-    ( 'LEXLIB',
-      "Library that should be linked to LEX-generated programs",
-      UNDEFINED ),
-    ( 'LN_S',
-      "Either 'ln -s', 'cp -pR' or just 'ln'",
-      UNDEFINED ),
-    ( 'MKDIR_P',
-      "Either 'mkdir -p' or 'install-sh'",
-      UNDEFINED ),
-    ( 'RANLIB',
-      "The ranlib program",
-      UNDEFINED ),
-    ( 'SED',
-      "The sed program",
-      UNDEFINED ),
-    ( 'YACC',
-      "The yacc program",
-      UNDEFINED ),
-]
-"""Predefined arguments. This is for internal use, it IS **NOT a part of public API**"""
+if sys.version_info < (3, 7):
+    # no module __getattr__ (PEP 562), UNDEFINED must be imported now
+    import SConsArguments
+    UNDEFINED = SConsArguments.UNDEFINED
+
+#############################################################################
+def __getattr__(name):
+    """Return ``UNDEFINED`` (from SConsArguments) when it's first accessed,
+    such that importing this module does not load SConsArguments (python 3.7
+    and later). This is for internal use, it IS **NOT a part of public
+    API**"""
+    if name == 'UNDEFINED':
+        import SConsArguments
+        return SConsArguments.UNDEFINED
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+#############################################################################
+def _std_arg_triples_factory():
+    """Return the list of predefined argument triples. Called once, when
+    `_std_arg_registry` is first used. This is for internal use, it IS
+    **NOT a part of public API**"""
+    import SConsArguments
+    UNDEFINED = SConsArguments.UNDEFINED
+    return [
+        ( 'AWK',
+          "The awk program",
+          UNDEFINED ),
+        ( 'EGREP',
+          "The egrep program",
+          UNDEFINED ),
+        ( 'FGREP',
+          "The fgrep program",
+          UNDEFINED ),
+        ( 'GREP',
+          "The grep program",
+          UNDEFINED ),
+        ( 'INSTALL',
+          "The program used to install files",
+          UNDEFINED ),
+        ( 'INSTALL_DATA',
+           "The program used to install data",
+          '${INSTALL}'),
+        ( 'INSTALL_PROGRAM',
+          "The program used to install programs",
+          '${INSTALL}'),
+        ( 'INSTALL_SCRIPT',
+          "The program used to install scripts",
+          '${INSTALL}'),
+        ( 'LEX',
+          "The lex program",
+          UNDEFINED ),
+        ( 'LEX_OUTPUT_ROOT',
+          "The base of the file name that the LEX generates",
+          UNDEFINED ),
+        ( 'LEXLIB',
+          "Library that should be linked to LEX-generated programs",
+          UNDEFINED ),
+        ( 'LN_S',
+          "Either 'ln -s', 'cp -pR' or just 'ln'",
+          UNDEFINED ),
+        ( 'MKDIR_P',
+          "Either 'mkdir -p' or 'install-sh'",
+          UNDEFINED ),
+        ( 'RANLIB',
+          "The ranlib program",
+          UNDEFINED ),
+        ( 'SED',
+          "The sed program",
+          UNDEFINED ),
+        ( 'YACC',
+          "The yacc program",
+          UNDEFINED ),
+    ]
 
 #############################################################################
 def __init_module_vars():
@@ -138,19 +175,687 @@ def __init_module_vars():
     pass
 __init_module_vars()
 
+_std_arg_registry = SConsGnuArguments.Util._ArgumentRegistry(_std_arg_triples_factory)
+"""Predefined arguments indexed by name. This is for internal use, it IS **NOT
+a part of public API**"""
+
+_std_arg_triples = _std_arg_registry
+"""Predefined arguments (the registry iterates over argument triples). This
+is for internal use, it IS **NOT a part of public API**"""
+
+_schema_kw = { 'opt_key_transform' : False }
+"""Keywords of `Declarations()` the frozen schema is generated for. This is
+for internal use, it IS **NOT a part of public API**"""
+
+#############################################################################
+def _schema_table():
+    """Return the frozen schema table for ``bin/gen_schema.py``. This is an
+    internal function and IS **NOT a part of public API**."""
+    registry = _std_arg_registry
+    return SConsGnuArguments.Util.schema_table(registry, registry.digest(), _schema_kw)
+
+#############################################################################
+_std_candidates = {
+    'AWK'       : [ 'gawk', 'mawk', 'nawk', 'awk' ],
+    'EGREP'     : [ 'egrep' ],
+    'FGREP'     : [ 'fgrep' ],
+    'GREP'      : [ 'grep', 'ggrep' ],
+    'INSTALL'   : [ 'ginstall', 'scoinst', 'install' ],
+    'LEX'       : [ 'flex', 'lex' ],
+    'LN_S'      : [ 'ln -s', 'cp -pR' ],
+    'MKDIR_P'   : [ 'mkdir -p' ],
+    'RANLIB'    : [ 'ranlib' ],
+    'SED'       : [ 'gsed', 'sed' ],
+    'YACC'      : [ 'bison -y', 'byacc', 'yacc' ],
+}
+"""Candidate programs searched by `Detect()`, in order of preference, as in
+autoconf's ``AC_PROG_*`` macros. Each candidate is a program name optionally
+followed by arguments. This is for internal use, it IS **NOT a part of public
+API**"""
+
+#############################################################################
+def Candidates(name = None):
+    """Return candidate programs searched by `Detect()`.
+
+    :Parameters:
+        name : str
+            argument name, e.g. ``'AWK'``; if ``None``, a dict with candidates
+            for all supported arguments is returned.
+    :Returns:
+        list of candidates (e.g. ``['gawk', 'mawk', 'nawk', 'awk']``) or dict
+        ``{name : candidates}``
+    """
+    if name is None:
+        return dict((k, list(v)) for (k, v) in _std_candidates.items())
+    return list(_std_candidates.get(name, []))
+
+#############################################################################
+def _search_path(env, path):
+    """Return PATH (and PATHEXT) to be searched for programs. This is for
+    internal use, it IS **NOT a part of public API**"""
+    pathext = None
+    if path is None:
+        if env is not None:
+            path = env['ENV'].get('PATH')
+            pathext = env['ENV'].get('PATHEXT')
+        else:
+            path = os.environ.get('PATH')
+    if pathext is None:
+        pathext = os.environ.get('PATHEXT')
+    return path, pathext
+
+#############################################################################
+class _PathIndex(object):
+    """Index of file names found in PATH directories.
+
+    Each PATH directory is listed once and the names of its entries are
+    recorded, so that any number of program lookups is answered mostly from
+    memory. Whether a candidate is an executable file is checked only when
+    it is looked up, and the answer is remembered. The directories are
+    listed concurrently, one task per directory. `refresh()` lists again
+    only the directories whose modification time has changed. This is for
+    internal use, it IS **NOT a part of public API**.
+    """
+    def __init__(self, path, pathext = None):
+        self.path = path or ''
+        self.pathext = pathext
+        self.dirs = []
+        for d in self.path.split(os.pathsep):
+            if d and d not in self.dirs:
+                self.dirs.append(d)
+        if pathext:
+            self.exts = [e.lower() for e in pathext.split(os.pathsep) if e]
+        else:
+            self.exts = []
+        self.__scans = {}
+        self.__executable = {}
+
+    def __scan(self, dirname):
+        try:
+            mtime = os.stat(dirname).st_mtime
+            names = os.listdir(dirname)
+        except OSError:
+            return (None, {})
+        entries = dict((name, name) for name in names)
+        if self.exts:
+            for name in names:
+                (base, ext) = os.path.splitext(name)
+                if ext.lower() in self.exts:
+                    entries.setdefault(base, name)
+        return (mtime, entries)
+
+    def __stale(self, dirname):
+        try:
+            return self.__scans[dirname][0] != os.stat(dirname).st_mtime
+        except KeyError:
+            return True
+        except OSError:
+            return self.__scans[dirname][0] is not None
+
+    def refresh(self, jobs = None):
+        """List directories which are new or have changed since last scan."""
+        stale = [d for d in self.dirs if self.__stale(d)]
+        if not stale:
+            return
+        scans = SConsGnuArguments.Util.thread_map(self.__scan, stale, jobs)
+        self.__scans.update(zip(stale, scans))
+        self.__executable.clear()
+
+    def __is_executable(self, full):
+        try:
+            return self.__executable[full]
+        except KeyError:
+            result = self.__executable[full] = os.path.isfile(full) and os.access(full, os.X_OK)
+            return result
+
+    def lookup(self, program):
+        """Return full path of `program` found first in PATH or ``None``."""
+        if os.path.dirname(program):
+            if os.path.isfile(program) and os.access(program, os.X_OK):
+                return program
+            return None
+        if len(self.__scans) < len(self.dirs):
+            self.refresh()
+        for d in self.dirs:
+            name = self.__scans[d][1].get(program)
+            if name is not None:
+                full = os.path.join(d, name)
+                if self.__is_executable(full):
+                    return full
+        return None
+
+_path_index = None
+"""The index shared by all lookups in this process. This is for internal
+use, it IS **NOT a part of public API**"""
+
+#############################################################################
+def _get_path_index(path, pathext, jobs = None, refresh = True):
+    """Return index of `path`. The index is recreated when PATH changes and
+    (unless `refresh` is false) the modified directories are listed again.
+    Callers performing a batch of lookups should refresh the index once, at
+    the beginning of the batch. This is for internal use, it IS **NOT a part
+    of public API**"""
+    global _path_index
+    index = _path_index
+    if index is None or index.path != (path or '') or index.pathext != pathext:
+        index = _path_index = _PathIndex(path, pathext)
+    if refresh:
+        index.refresh(jobs)
+    return index
+
+#############################################################################
+def WhereIs(program, env = None, path = None):
+    """Find `program` in PATH using the shared PATH index.
+
+    The first call lists every PATH directory once, subsequent calls are
+    answered from memory. If the program is not found, the directories
+    modified in the meantime are listed again and the lookup is repeated
+    (a program installed meanwhile into an earlier PATH directory is
+    noticed by the next `Detect()` or `Probe()`).
+
+    :Parameters:
+        program : str
+            program name, e.g. ``'gawk'``,
+        env
+            SCons environment, its ``env['ENV']['PATH']`` is searched; if
+            ``None``, ``os.environ['PATH']`` is used,
+        path : str
+            search this PATH instead.
+    :Returns:
+        full path to the program or ``None``
+    """
+    if os.path.dirname(program):
+        return _PathIndex(None).lookup(program)
+    (path, pathext) = _search_path(env, path)
+    index = _get_path_index(path, pathext, refresh = False)
+    found = index.lookup(program)
+    if found is None:
+        index.refresh()
+        found = index.lookup(program)
+    return found
+
+#############################################################################
+def Detect(env = None, names = None, **kw):
+    """Detect alternative programs by searching candidates over PATH.
+
+    For every argument name the candidates (see `Candidates()`) are looked up
+    in PATH and the first one found wins. The lookups are answered from an
+    index of PATH directories, which are listed once (concurrently, on a pool
+    of threads) and shared by all detections in the process. The result may
+    be used as ``defaults`` for `Declarations()`:
+
+    .. python::
+        # SConstruct
+        progs = SConsGnuArguments.AltPrograms.Detect(env)
+        decls = SConsGnuArguments.AltPrograms.Declarations(defaults = progs)
+
+    :Parameters:
+        env
+            SCons environment, its ``env['ENV']['PATH']`` is searched; if
+            ``None``, ``os.environ['PATH']`` is used,
+        names : list
+            argument names to detect (default: all names having candidates).
+    :Keywords:
+        path : str
+            search this PATH instead,
+        candidates : dict
+            ``{name : [candidate, ...]}``, extends or overrides the standard
+            candidate lists; may introduce new (user-defined) names,
+        jobs : int
+            maximum number of threads used for listing PATH directories,
+        probe : boolean
+            check behavior of the programs found (see `Probe()`), so that for
+            example ``EGREP`` becomes ``grep -E`` if supported; this also
+            determines ``LEX_OUTPUT_ROOT`` and ``LEXLIB`` with `DetectLex()`,
+        cache_file : str | boolean
+            reuse results cached in this file, implies ``probe``, see
+            `Probe()`.
+
+    :Returns:
+        dict ``{name : program}`` where ``program`` is the full path of the
+        first candidate found, followed by the candidate's arguments (e.g.
+        ``'/usr/bin/bison -y'``); names with no candidate found are omitted
+    """
+    if kw.get('probe') or kw.get('cache_file'):
+        result = dict((n, r['program']) for (n, r) in Probe(env, names, **kw).items())
+        lexvars = ('LEX_OUTPUT_ROOT', 'LEXLIB')
+        if 'LEX' in result and (names is None or any(n in names for n in lexvars)):
+            found = DetectLex(env, result['LEX'], **kw)
+            result.update((n, v) for (n, v) in found.items() if names is None or n in names)
+        return _remember_detected(result)
+    candidates = Candidates()
+    candidates.update(kw.get('candidates', {}))
+    if names is None:
+        names = sorted(candidates.keys())
+    (path, pathext) = _search_path(env, kw.get('path'))
+    index = _get_path_index(path, pathext, kw.get('jobs'))
+
+    result = {}
+    for name in names:
+        for candidate in candidates.get(name, []):
+            parts = candidate.split(None, 1)
+            found = index.lookup(parts[0])
+            if found is not None:
+                result[name] = ' '.join([found] + parts[1:])
+                break
+    return _remember_detected(result)
+
+#############################################################################
+_detected_programs = {}
+"""Programs found by `Detect()` in this process, ``{name : set(programs)}``.
+Used to tell detected defaults from values set by the user. This is for
+internal use, it IS **NOT a part of public API**"""
+
+def _remember_detected(result):
+    """Record `result` of `Detect()` in `_detected_programs` and return it.
+    This is for internal use, it IS **NOT a part of public API**"""
+    for (name, program) in result.items():
+        _detected_programs.setdefault(name, set()).add(program)
+    return result
+
+#############################################################################
+def _stat_key(path):
+    """Return ``[inode, mtime, size]`` of file `path` or ``None``. This is for
+    internal use, it IS **NOT a part of public API**"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_ino, st.st_mtime, st.st_size]
+
+#############################################################################
+def _run(argv, stdin = '', timeout = None, cwd = None):
+    """Run `argv` in directory `cwd` feeding it with `stdin` and return
+    ``(returncode, output)`` or ``None`` if the program can't be run or it's
+    killed after `timeout` seconds. This is for internal use, it IS **NOT a
+    part of public API**"""
+    import subprocess
+    import threading
+    killed = []
+    popen_kw = {}
+    if os.name == 'posix':
+        # probes run concurrently, don't let children inherit pipes of the
+        # sibling probes (it would delay their EOF)
+        popen_kw['close_fds'] = True
+    # run the probe in its own process group, so that its children (which
+    # may hold the output pipe open) are killed with it
+    group = hasattr(os, 'killpg')
+    if group:
+        if sys.version_info >= (3, 2):
+            popen_kw['start_new_session'] = True
+        else:
+            # preexec_fn is not safe in threads on python 2, use setsid(1)
+            setsid = _setsid_program()
+            if setsid is not None:
+                argv = [setsid] + list(argv)
+            else:
+                group = False
+    def kill():
+        killed.append(True)
+        try:
+            if group:
+                import signal
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+        except OSError:
+            pass
+    try:
+        with open(os.devnull, 'w') as devnull:
+            proc = subprocess.Popen(argv, stdin = subprocess.PIPE, stdout = subprocess.PIPE,
+                                    stderr = devnull, cwd = cwd, **popen_kw)
+            timer = threading.Timer(timeout or _default_timeout, kill)
+            timer.start()
+            try:
+                output = proc.communicate(stdin.encode('utf-8'))[0]
+            finally:
+                timer.cancel()
+    except (OSError, ValueError):
+        return None
+    if killed:
+        return None
+    if not isinstance(output, str):
+        output = output.decode('utf-8', 'replace')
+    return (proc.returncode, output)
+
+#############################################################################
+def _setsid_program():
+    """Return path to the ``setsid`` program or ``None``. This is for
+    internal use, it IS **NOT a part of public API**"""
+    global _setsid
+    if _setsid is False:
+        _setsid = WhereIs('setsid') or WhereIs('setsid', path = os.pathsep.join(['/usr/bin', '/bin']))
+    return _setsid
+
+_setsid = False
+"""Cached result of `_setsid_program()`. This is for internal use, it IS
+**NOT a part of public API**"""
+
+_default_timeout = 10.0
+"""Default timeout (in seconds) of a single probe. This is for internal use,
+it IS **NOT a part of public API**"""
+
+#############################################################################
+_long_line = 'x' * 16384
+_std_feature_probes = {
+    'GREP'      : [ ('E', ['-E', 'a|x'], 'ab\n', 'ab'),
+                    ('F', ['-F', 'a|x'], 'a|x\n', 'a|x'),
+                    ('long_lines', ['x$'], _long_line + '\n', _long_line) ],
+    'EGREP'     : [ ('long_lines', ['x$'], _long_line + '\n', _long_line) ],
+    'FGREP'     : [ ('long_lines', ['xx'], _long_line + '\n', _long_line) ],
+    'SED'       : [ ('long_lines', ['s/x$/y/'], _long_line + '\n', _long_line[:-1] + 'y') ],
+    'AWK'       : [ ('works', ['BEGIN { print length("abc") }'], '', '3') ],
+}
+"""Behavioral checks run by `Probe()` for particular programs, as tuples
+``(feature, arguments, input, expected_output)``, similar to the ones
+performed by autoconf's ``AC_PROG_*`` macros. This is for internal use, it IS
+**NOT a part of public API**"""
+
+#############################################################################
+def _run_probe(task):
+    """Run single probe described by ``(path, feature, arguments, input,
+    expected_output, timeout)`` tuple. The ``'flavor'`` probe returns the
+    first line of the output, other probes return ``True`` or ``False``. This
+    is for internal use, it IS **NOT a part of public API**"""
+    (path, feature, args, stdin, expected, timeout) = task
+    res = _run([path] + args, stdin, timeout)
+    if feature == 'flavor':
+        if res is None or res[0] != 0:
+            return None
+        for line in res[1].splitlines():
+            if line.strip():
+                return line.strip()
+        return None
+    return res is not None and res[0] == 0 and res[1].strip() == expected
+
+#############################################################################
+def _probe_slot(name, candidates, path, pathext):
+    """Return the key of the cached probe result. This is for internal use, it
+    IS **NOT a part of public API**"""
+    return SConsGnuArguments.Util._digest(['AltPrograms', name, candidates, path, pathext])
+
+#############################################################################
+def _probe_store(env, cache_file):
+    """Return the store for `cache_file` or ``None``. This is for internal
+    use, it IS **NOT a part of public API**"""
+    Util = SConsGnuArguments.Util
+    if not cache_file:
+        return None
+    if cache_file is True:
+        if env is not None:
+            cache_file = env.File('#' + Util._default_cache_file).abspath
+        else:
+            cache_file = Util._default_cache_file
+    return Util._JsonStore.open(cache_file)
+
+#############################################################################
+def _find_record(index, candidates):
+    """Find the first of `candidates` in `index` and return a new (not yet
+    probed) record for it. This is for internal use, it IS **NOT a part of
+    public API**"""
+    for candidate in candidates:
+        parts = candidate.split(None, 1)
+        found = index.lookup(parts[0])
+        if found is not None:
+            return { 'program'  : ' '.join([found] + parts[1:]),
+                     'path'     : found,
+                     'stat'     : _stat_key(found),
+                     'flavor'   : None,
+                     'features' : {} }
+    return None
+
+#############################################################################
+def _probe_records(records, timeout = None, jobs = None):
+    """Run the flavor and feature probes for all `records` (dict ``{name :
+    record}``) concurrently and store their results in the records. This is
+    for internal use, it IS **NOT a part of public API**"""
+    tasks = []
+    for (name, rec) in records.items():
+        tasks.append((name, (rec['path'], 'flavor', ['--version'], '', None, timeout)))
+        for (feature, args, stdin, expected) in _std_feature_probes.get(name, []):
+            tasks.append((name, (rec['path'], feature, args, stdin, expected, timeout)))
+    results = SConsGnuArguments.Util.thread_map(_run_probe, [t for (_, t) in tasks], jobs)
+    for ((name, task), res) in zip(tasks, results):
+        if task[1] == 'flavor':
+            records[name]['flavor'] = res
+        else:
+            records[name]['features'][task[1]] = res
+
+#############################################################################
+def Probe(env = None, names = None, **kw):
+    """Detect alternative programs and probe their flavors.
+
+    Works as `Detect()`, but returns more information about every program
+    found. Each found program is run with ``--version`` to determine its
+    flavor and, similarly to autoconf's ``AC_PROG_GREP``, ``AC_PROG_SED``
+    and so on, its behavior is checked (e.g. whether ``grep`` supports
+    ``-E`` or ``sed`` handles long lines). All the probes are launched
+    concurrently, each one is killed if it doesn't complete within
+    ``timeout``. ``EGREP`` and ``FGREP`` resolve to ``grep -E`` and ``grep
+    -F`` when supported by the grep found. Similarly to autoconf's ``config.cache``, the results may be
+    stored in a file and reused by subsequent runs; a cached result is used
+    without spawning any process as long as the program candidates, the
+    PATH and the executable's inode, modification time and size remain
+    unchanged. Only the results which fail this check are probed again.
+    Programs not found are never cached.
+
+    :Parameters:
+        env
+            SCons environment, its ``env['ENV']['PATH']`` is searched; if
+            ``None``, ``os.environ['PATH']`` is used,
+        names : list
+            argument names to detect (default: all names having candidates).
+    :Keywords:
+        path : str
+            search this PATH instead,
+        candidates : dict
+            ``{name : [candidate, ...]}``, extends or overrides the standard
+            candidate lists,
+        jobs : int
+            maximum number of threads used for listing PATH directories and
+            maximum number of probes running at a time,
+        timeout : float
+            time limit (in seconds) for a single probe (default: 10),
+        cache_file : str | boolean
+            file to store the results in; ``True`` selects
+            ``.sconsign-gnu-arguments.json`` in the top-level directory (or
+            in the current directory, if `env` is ``None``).
+
+    :Returns:
+        dict ``{name : record}``, where ``record`` is a dict with keys
+        ``'program'`` (same as returned by `Detect()`), ``'path'`` (full path
+        to the executable), ``'stat'``, ``'flavor'`` (the first line printed
+        by ``--version`` or ``None``) and ``'features'`` (dict ``{feature :
+        boolean}``); names with no candidate found are omitted
+    """
+    Util = SConsGnuArguments.Util
+    candidates = Candidates()
+    candidates.update(kw.get('candidates', {}))
+    if names is None:
+        names = sorted(candidates.keys())
+    (path, pathext) = _search_path(env, kw.get('path'))
+    jobs = kw.get('jobs')
+
+    store = _probe_store(env, kw.get('cache_file'))
+
+    result = {}
+    missing = []
+    for name in names:
+        cands = candidates.get(name, [])
+        if store is not None:
+            record = store.get(_probe_slot(name, cands, path, pathext))
+            if record is not None and _stat_key(record['path']) == record['stat']:
+                result[name] = record
+                continue
+        missing.append(name)
+
+    if missing:
+        # The PATH is listed only if there is something to find.
+        index = _get_path_index(path, pathext, jobs)
+        records = {}
+        for name in missing:
+            record = _find_record(index, candidates.get(name, []))
+            if record is not None:
+                records[name] = record
+        # EGREP and FGREP prefer 'grep -E' and 'grep -F', as autoconf does
+        greps = [n for n in ('EGREP', 'FGREP') if n in missing]
+        if greps and 'GREP' not in records and 'GREP' not in result:
+            grep = _find_record(index, candidates.get('GREP', []))
+            if grep is not None:
+                records['GREP'] = grep
+        _probe_records(records, kw.get('timeout'), jobs)
+        grep = records.get('GREP') or result.get('GREP')
+        for name in greps:
+            flag = name[0]
+            if grep is not None and grep['features'].get(flag):
+                records[name] = dict(grep, program = '%s -%s' % (grep['path'], flag), features = {})
+        found = [(n, r) for (n, r) in records.items() if n in missing]
+        result.update(found)
+        if store is not None:
+            store.update([(_probe_slot(n, candidates.get(n, []), path, pathext), r) for (n, r) in found])
+    return result
+
+#############################################################################
+_lex_conftest = r"""%%
+a { ECHO; }
+b { REJECT; }
+c { yymore (); }
+d { yyless (1); }
+e { yyless (input () != 0); }
+f { unput (yytext[0]); }
+. { BEGIN INITIAL; }
+%%
+#ifdef YYTEXT_POINTER
+extern char *yytext;
+#endif
+int
+main (void)
+{
+  return ! yylex () + ! yywrap ();
+}
+"""
+"""The lex source used by `DetectLex()`, same as in autoconf's
+``AC_PROG_LEX``. This is for internal use, it IS **NOT a part of public
+API**"""
+
+_std_lex_libs = [ '', '-lfl', '-ll' ]
+"""Libraries tried by `DetectLex()`, in order of preference. This is for
+internal use, it IS **NOT a part of public API**"""
+
+#############################################################################
+def _lex_trial(lex, cc, timeout = None):
+    """Run the trial lex and link in a temporary directory and return dict
+    with ``LEX_OUTPUT_ROOT`` and ``LEXLIB`` determined. This is for internal
+    use, it IS **NOT a part of public API**"""
+    import tempfile
+    import shutil
+    tmpdir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(tmpdir, 'conftest.l'), 'w') as f:
+            f.write(_lex_conftest)
+        res = _run(lex + ['conftest.l'], '', timeout, tmpdir)
+        if res is None or res[0] != 0:
+            return {}
+        for root in ('lex.yy', 'lexyy'):
+            if os.path.isfile(os.path.join(tmpdir, root + '.c')):
+                break
+        else:
+            return {}
+        result = { 'LEX_OUTPUT_ROOT' : root }
+        if cc is None:
+            return result
+        for lib in _std_lex_libs:
+            argv = cc + ['-o', 'conftest', root + '.c'] + ([lib] if lib else [])
+            res = _run(argv, '', timeout, tmpdir)
+            if res is not None and res[0] == 0:
+                result['LEXLIB'] = lib
+                break
+        return result
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors = True)
+
+#############################################################################
+def DetectLex(env = None, lex = None, **kw):
+    """Determine ``LEX_OUTPUT_ROOT`` and ``LEXLIB``, as autoconf's
+    ``AC_PROG_LEX`` does.
+
+    The lex program is run on a small test source in a temporary directory,
+    the name of the generated file determines ``LEX_OUTPUT_ROOT``
+    (``lex.yy`` or ``lexyy``). Then the generated scanner is linked without
+    additional libraries, with ``-lfl`` and with ``-ll``; the first that
+    succeeds determines ``LEXLIB``. With ``cache_file`` the outcome is stored
+    and reused as long as the lex and C compiler executables remain the same
+    (same path, inode, modification time and size).
+
+    :Parameters:
+        env
+            SCons environment; its ``env['ENV']['PATH']`` is searched for
+            the programs and its ``CC`` (if set) is used as C compiler,
+        lex : str
+            the lex program (e.g. ``'/usr/bin/flex'``); if ``None``, it's
+            found with `Detect()`.
+    :Keywords:
+        path : str
+            search this PATH instead,
+        cc : str
+            C compiler used for the trial link (default: ``$CC`` or ``cc``),
+        timeout : float
+            time limit (in seconds) for each of the trial runs,
+        cache_file : str | boolean
+            file to store the results in, see `Probe()`.
+    :Returns:
+        dict with keys ``'LEX_OUTPUT_ROOT'`` and ``'LEXLIB'``; the keys which
+        could not be determined are omitted
+    """
+    (path, pathext) = _search_path(env, kw.get('path'))
+    index = _get_path_index(path, pathext)
+    if lex is None:
+        lex = Detect(env, ['LEX'], path = path).get('LEX')
+        if lex is None:
+            return {}
+    cc = kw.get('cc')
+    if cc is None and env is not None:
+        cc = env.subst('$CC') or None
+    if cc is None:
+        cc = 'cc'
+
+    def resolve(program):
+        argv = program.split()
+        found = index.lookup(argv[0])
+        return [found] + argv[1:] if found is not None else None
+    lex = resolve(lex)
+    if lex is None:
+        return {}
+    cc = resolve(cc)
+
+    store = _probe_store(env, kw.get('cache_file'))
+    if store is not None:
+        identity = [lex, _stat_key(lex[0])]
+        if cc is not None:
+            identity.extend([cc, _stat_key(cc[0])])
+        slot = SConsGnuArguments.Util._digest(['AltPrograms.DetectLex'] + identity)
+        cached = store.get(slot)
+        if cached is not None:
+            return dict(cached)
+    result = _lex_trial(lex, cc, kw.get('timeout'))
+    if store is not None and result:
+        store.put(slot, result)
+    return result
+
 #############################################################################
 def Names(name_filter = lambda x : True):
     """Return list of argument names for alternative programs.
 
     :Parameters:
-        name_filter : callable
+        name_filter : callable | list | tuple | set | frozenset
             callable object (e.g. lambda) of type ``name_filter(name) ->
             boolean`` used to filter-out unwanted variables; only these
-            variables are processed, for which name_filter returns ``True``
+            variables are processed, for which name_filter returns ``True``;
+            alternativelly a collection of names of variables to be processed
     :Returns:
         the list of standard GNU directory variable names
     """
-    return SConsGnuArguments.Util.names_from_triples(_std_arg_triples, name_filter)
+    return list(SConsGnuArguments.Util.names_from_triples(_std_arg_registry, name_filter))
 
 ###############################################################################
 def Declarations(**kw):
@@ -159,10 +864,20 @@ def Declarations(**kw):
     :Keywords:
         defaults : dict
             user-specified default values for the *arguments* being declared,
-        name_filter : callable
+        name_filter : callable | list | tuple | set | frozenset
             callable object (e.g. lambda) of type ``name_filter(name) ->
             boolean`` used to filter-out unwanted variables; only these
-            variables are processed, for which name_filter returns ``True``
+            variables are processed, for which name_filter returns ``True``;
+            alternativelly a collection of names of variables to be processed
+        detect : boolean
+            if ``True``, programs found in ``os.environ['PATH']`` by
+            `Detect()` are used as default values, unless ``defaults`` says
+            otherwise,
+        lazy : boolean
+            if ``True``, the declaration of each argument is built when it's
+            accessed for the first time (or at ``Commit()``), this saves time
+            when only few of the arguments are actually used (ignored with
+            python 2, see `SConsGnuArguments.Util.arguments_from_triples()`),
         nameconv : `SConsArguments._ArgumentNameConv`
             a `SConsArguments._ArgumentNameConv` object used to transform
             *argument* names to *endpoint* (construction variable, command-line
@@ -195,9 +910,21 @@ def Declarations(**kw):
         option_transform
             passed to `SConsArguments._ArgumentNameConv.__init__()`.
 
+    When called with default keywords, the declarations are taken from the
+    frozen schema module generated by ``bin/gen_schema.py`` (if present and
+    up to date).
+
     :Returns:
         an instance of `SConsArguments._ArgumentDeclarations`
     """
     if not 'opt_key_transform' in kw:
         kw['opt_key_transform'] = False
-    return SConsGnuArguments.Util.arguments_from_triples(_std_arg_triples, **kw)
+    if kw.pop('detect', False):
+        defaults = Detect(names = Names(kw.get('name_filter', lambda x : True)))
+        defaults.update(kw.get('defaults', {}))
+        kw['defaults'] = defaults
+    elif kw == _schema_kw:
+        decls = SConsGnuArguments.Util.frozen_declarations('AltPrograms', _std_arg_registry.digest(), kw)
+        if decls is not None:
+            return decls
+    return SConsGnuArguments.Util.arguments_from_triples(_std_arg_registry, **kw)
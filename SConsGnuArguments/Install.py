@@ -0,0 +1,719 @@
+"""`SConsGnuArguments.Install`
+
+In-process installation of files into `SConsGnuArguments.InstallDirs`
+destinations.
+
+**General Description**
+
+The ``$INSTALL``, ``$INSTALL_DATA``, ``$INSTALL_PROGRAM`` and
+``$INSTALL_SCRIPT`` variables provided by `SConsGnuArguments.AltPrograms`
+are command strings. Used as such, they run one external ``install`` process
+per file. This module performs the installation within SCons process
+instead: the files are grouped by destination directory, each directory is
+created once, the contents are copied with ``copy_file_range()`` or
+``sendfile()`` (where available) and the permissions are set to ``0755`` for
+programs and scripts or ``0644`` for data. `InstallPlan` installs many
+files at once, copying them on a pool of threads, and with
+`InstallManifest` skips files unchanged since the previous installation.
+
+The external program is used only if the user has explicitly set
+``$INSTALL`` (or one of ``$INSTALL_DATA``, ``$INSTALL_PROGRAM``,
+``$INSTALL_SCRIPT``) to a command, on the command line or in the
+environment; programs found by `SConsGnuArguments.AltPrograms.Detect()`
+don't count.
+
+**Example**
+
+.. python::
+
+    # SConstruct
+    import SConsGnuArguments.Install
+    env = Environment()
+    # ... declare and commit InstallDirs arguments ...
+    prog = env.Program('foo', ['foo.c'])
+    SConsGnuArguments.Install.InstallInto(env, 'bindir', prog)
+    SConsGnuArguments.Install.InstallInto(env, 'pkgdatadir', ['foo.dat'])
+"""
+
+#
+# Copyright (c) 2012-2015 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = 'restructuredText'
+
+import os
+import sys
+import errno
+import shutil
+import hashlib
+import threading
+import timeit
+import collections
+import SConsGnuArguments.Util
+import SCons.Util
+import SCons.Action
+
+try:
+    import queue as _queue
+except ImportError:
+    # python 2
+    import Queue as _queue
+
+#############################################################################
+_std_modes = {
+    'INSTALL'           : 0o755,
+    'INSTALL_PROGRAM'   : 0o755,
+    'INSTALL_SCRIPT'    : 0o755,
+    'INSTALL_DATA'      : 0o644,
+}
+"""Permissions of installed files, by kind of installation. This is for
+internal use, it IS **NOT a part of public API**"""
+
+_std_dir_kinds = {
+    'bindir'        : 'INSTALL_PROGRAM',
+    'sbindir'       : 'INSTALL_PROGRAM',
+    'libexecdir'    : 'INSTALL_PROGRAM',
+}
+"""Kind of installation used by default for particular destinations, other
+destinations use ``INSTALL_DATA``. This is for internal use, it IS **NOT a
+part of public API**"""
+
+_fast_copy_errors = (errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EBADF,
+                     getattr(errno, 'ENOTSUP', errno.EINVAL),
+                     getattr(errno, 'EOPNOTSUPP', errno.EINVAL))
+"""Errors which make us fall back to plain read/write copy. This is for
+internal use, it IS **NOT a part of public API**"""
+
+_chunk_size = 1 << 30
+"""Maximum number of bytes transferred by a single system call. This is for
+internal use, it IS **NOT a part of public API**"""
+
+#############################################################################
+def _copy_fd(infd, outfd):
+    """Copy contents of file `infd` into `outfd` (both file descriptors
+    positioned at the beginning) using the fastest method available. This is
+    for internal use, it IS **NOT a part of public API**"""
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    sendfile = getattr(os, 'sendfile', None)
+    if copy_file_range is not None:
+        calls = [lambda offset : copy_file_range(infd, outfd, _chunk_size)]
+    else:
+        calls = []
+    if sendfile is not None:
+        calls.append(lambda offset : sendfile(outfd, infd, offset, _chunk_size))
+    for call in calls:
+        offset = 0
+        try:
+            while True:
+                n = call(offset)
+                if n == 0:
+                    return
+                offset += n
+        except OSError as e:
+            if offset > 0 or e.errno not in _fast_copy_errors:
+                raise
+    with os.fdopen(os.dup(infd), 'rb') as fsrc:
+        with os.fdopen(os.dup(outfd), 'wb') as fdst:
+            shutil.copyfileobj(fsrc, fdst, 1 << 20)
+
+#############################################################################
+def _install_file(src, dst, mode):
+    """Copy file `src` to `dst` and set its permissions to `mode`. The file is
+    written under a temporary name and then renamed, so `dst` is replaced
+    atomically. This is for internal use, it IS **NOT a part of public
+    API**"""
+    tmp = os.path.join(os.path.dirname(dst), '.%s.%d.tmp' % (os.path.basename(dst), os.getpid()))
+    infd = os.open(src, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+        outfd = os.open(tmp, flags, mode)
+        try:
+            _copy_fd(infd, outfd)
+        finally:
+            os.close(outfd)
+    finally:
+        os.close(infd)
+    os.chmod(tmp, mode)
+    try:
+        os.rename(tmp, dst)
+    except OSError:
+        # os.rename() doesn't replace existing files on Windows
+        os.remove(dst)
+        os.rename(tmp, dst)
+
+#############################################################################
+def _group_by_dir(pairs):
+    """Return list of ``(directory, [(src, dst), ...])`` preserving the order
+    in which directories first appear in `pairs`. This is for internal use,
+    it IS **NOT a part of public API**"""
+    groups = collections.OrderedDict()
+    for (src, dst) in pairs:
+        groups.setdefault(os.path.dirname(dst), []).append((src, dst))
+    return list(groups.items())
+
+#############################################################################
+def PlanDirs(dirs = (), files = ()):
+    """Compute the minimal list of directories to be created.
+
+    The directories in `dirs` and the parent directories of `files` are
+    checked together with their ancestors; each distinct path is checked at
+    most once and the walk towards the root stops at the first existing
+    directory. Many installation directories share parents (``datarootdir``
+    -> ``mandir`` -> ``man1dir``, ...), so this is much cheaper than checking
+    (or running ``mkdir -p`` for) each of them separately.
+
+    .. python::
+        # SConstruct
+        dirs = SConsGnuArguments.InstallDirs.Staged(env, destdir).values()
+        Install.MakeDirs(Install.PlanDirs(dirs))
+
+    :Parameters:
+        dirs
+            directories to be created,
+        files
+            files to be installed; their parent directories are created.
+    :Returns:
+        the missing directories, parents before children, without
+        duplicates
+    """
+    normpath = os.path.normpath
+    dirname = os.path.dirname
+    wanted = set(normpath(d) for d in dirs)
+    wanted.update(dirname(normpath(f)) for f in files)
+    checked = set()
+    missing = []
+    for path in wanted:
+        while path and path not in checked:
+            checked.add(path)
+            if os.path.isdir(path):
+                break
+            missing.append(path)
+            parent = dirname(path)
+            if parent == path:
+                break
+            path = parent
+    missing.sort(key = lambda p : (p.count(os.sep), p))
+    return missing
+
+#############################################################################
+def MakeDirs(plan, mode = 0o777):
+    """Create directories listed in `plan` (see `PlanDirs()`) in one pass.
+
+    :Parameters:
+        plan : list
+            directories to be created, parents before children,
+        mode : int
+            permissions of the created directories (modified by umask).
+    :Returns:
+        number of directories created
+    """
+    return len(_make_dirs(plan, mode))
+
+#############################################################################
+def _make_dirs(plan, mode = 0o777):
+    """Implementation of `MakeDirs()`, returns list of directories actually
+    created. This is for internal use, it IS **NOT a part of public API**"""
+    created = []
+    for path in plan:
+        try:
+            os.mkdir(path, mode)
+            created.append(path)
+        except OSError as e:
+            if e.errno != errno.EEXIST or not os.path.isdir(path):
+                raise
+    return created
+
+#############################################################################
+def InstallFiles(pairs, mode = 0o644):
+    """Install files in-process.
+
+    The files are processed in batches, one batch per destination directory.
+    The missing directories are created up front, see `PlanDirs()`.
+
+    :Parameters:
+        pairs : list
+            list of ``(source, destination)`` file paths,
+        mode : int
+            permissions of the installed files.
+    :Returns:
+        number of files installed
+    """
+    groups = _group_by_dir(pairs)
+    MakeDirs(PlanDirs([dirname for (dirname, _) in groups if dirname]))
+    count = 0
+    for (dirname, batch) in groups:
+        for (src, dst) in batch:
+            _install_file(src, dst, mode)
+        count += len(batch)
+    return count
+
+#############################################################################
+class InstallStats(object):
+    """Statistics of an installation performed by `InstallParallel()`."""
+    def __init__(self, files = 0, size = 0, seconds = 0.0, skipped = 0):
+        self.files = files
+        self.size = size
+        self.seconds = seconds
+        self.skipped = skipped
+
+    @property
+    def files_per_second(self):
+        """Throughput in files per second."""
+        return self.files / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def mb_per_second(self):
+        """Throughput in megabytes (2**20 bytes) per second."""
+        return self.size / float(1 << 20) / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self):
+        text = 'installed %d files (%.1f MB) in %.3f s: %.1f files/s, %.1f MB/s' % \
+               (self.files, self.size / float(1 << 20), self.seconds,
+                self.files_per_second, self.mb_per_second)
+        if self.skipped:
+            text += ', %d unchanged files skipped' % self.skipped
+        return text
+
+#############################################################################
+def _hash_file(path):
+    """Return hex digest of contents of file `path`. This is for internal use,
+    it IS **NOT a part of public API**"""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(1 << 20)
+            if not chunk:
+                return h.hexdigest()
+            h.update(chunk)
+
+#############################################################################
+def _stat_pair(path):
+    """Return ``[size, mtime]`` of file `path` or ``None``. This is for
+    internal use, it IS **NOT a part of public API**"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime]
+
+#############################################################################
+class InstallManifest(object):
+    """Record of files installed by `InstallParallel()`.
+
+    For every installed file the manifest holds its destination path, size,
+    modification time, permissions and the hash of its contents, together
+    with size and modification time of the source it was installed from. A
+    file is considered unchanged (and is not installed again) if:
+
+        - the destination's size and modification time match the record,
+          and
+        - the source's size and modification time match the record or, if
+          they don't, the hash of its contents does.
+
+    So the sources are hashed only when the cheap ``stat()`` checks fail.
+    The manifest also lists the directories created by the installation.
+    It is stored in a JSON file and drives `Uninstall()`.
+    """
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.__store = SConsGnuArguments.Util._JsonStore.open(self.path)
+        self.files = dict(self.__store.get('files', {}))
+        self.dirs = list(self.__store.get('dirs', []))
+        self.__lock = threading.Lock()
+
+    def unchanged(self, src, dst, mode):
+        """Return ``True`` if `dst` installed from `src` with `mode` is up to
+        date."""
+        entry = self.files.get(dst)
+        if entry is None or entry['mode'] != mode or _stat_pair(dst) != entry['stat']:
+            return False
+        src_stat = _stat_pair(src)
+        if src_stat == entry['src_stat']:
+            return True
+        if src_stat is None or src_stat[0] != entry['stat'][0] or _hash_file(src) != entry['hash']:
+            return False
+        with self.__lock:
+            entry['src_stat'] = src_stat
+        return True
+
+    def record(self, src, dst, mode):
+        """Record `dst` just installed from `src`."""
+        entry = { 'stat' : _stat_pair(dst), 'src_stat' : _stat_pair(src),
+                  'hash' : _hash_file(dst), 'mode' : mode }
+        with self.__lock:
+            self.files[dst] = entry
+
+    def forget(self, dst):
+        """Remove `dst` from the manifest."""
+        with self.__lock:
+            self.files.pop(dst, None)
+
+    def record_dirs(self, dirs):
+        """Record directories just created by the installation."""
+        with self.__lock:
+            self.dirs.extend(d for d in dirs if d not in self.dirs)
+
+    def forget_dir(self, dirname):
+        """Remove directory `dirname` from the manifest."""
+        with self.__lock:
+            if dirname in self.dirs:
+                self.dirs.remove(dirname)
+
+    def save(self):
+        """Write the manifest file."""
+        self.__store.put('files', self.files)
+        self.__store.put('dirs', self.dirs)
+
+#############################################################################
+def InstallParallel(items, jobs = None, depth = None, manifest = None, dirs = ()):
+    """Install files in-process using a pool of worker threads.
+
+    All the destination directories are created up front. Then the files are
+    fed to the workers through a bounded queue, so that at most `depth`
+    files wait for a worker at any time. If `manifest` is given, the files
+    which are unchanged since the previous installation are skipped and
+    the manifest is updated.
+
+    :Parameters:
+        items : list
+            list of ``(source, destination, mode)`` tuples; `mode` are the
+            permissions of the installed file,
+        jobs : int
+            number of worker threads (default: ``8``),
+        depth : int
+            maximum number of queued files (default: ``4 * jobs``),
+        manifest : `InstallManifest` | str
+            manifest (or path to the manifest file) of the previous
+            installation,
+        dirs : list
+            directories created for this installation by someone else
+            (SCons creates the directories of targets before running their
+            actions); they're recorded in the manifest together with the
+            directories created here.
+    :Returns:
+        an `InstallStats` object
+    """
+    timer = timeit.default_timer
+    t0 = timer()
+    items = list(items)
+    skipped = 0
+    if manifest is not None:
+        if not isinstance(manifest, InstallManifest):
+            manifest = InstallManifest(manifest)
+        count = len(items)
+        items = [i for i in items if not manifest.unchanged(*i)]
+        skipped = count - len(items)
+    created = _make_dirs(PlanDirs(files = [i[1] for i in items]))
+    if manifest is not None:
+        manifest.record_dirs(list(dirs) + created)
+    if jobs is None:
+        jobs = 8
+    jobs = max(1, min(jobs, len(items)))
+    if depth is None:
+        depth = 4 * jobs
+    queue = _queue.Queue(max(1, depth))
+    sizes = []
+    errors = []
+    def worker():
+        while True:
+            item = queue.get()
+            if item is None:
+                return
+            if errors:
+                # an error occurred, just drain the queue
+                continue
+            try:
+                _install_file(*item)
+                sizes.append(os.path.getsize(item[1]))
+                if manifest is not None:
+                    manifest.record(*item)
+            except Exception:
+                errors.append(sys.exc_info())
+    threads = [threading.Thread(target = worker) for _ in range(jobs)]
+    for t in threads:
+        t.daemon = True
+        t.start()
+    for item in items:
+        queue.put(item)
+    for _ in threads:
+        queue.put(None)
+    for t in threads:
+        t.join()
+    if manifest is not None:
+        manifest.save()
+    if errors:
+        raise errors[0][1]
+    return InstallStats(len(sizes), sum(sizes), timer() - t0, skipped)
+
+#############################################################################
+def Uninstall(manifest):
+    """Remove all files recorded in `manifest` and the directories created
+    by the installation, if they became empty. Directories which existed
+    before the installation are never removed.
+
+    :Parameters:
+        manifest : `InstallManifest` | str
+            manifest (or path to the manifest file).
+    :Returns:
+        number of files removed
+    """
+    if not isinstance(manifest, InstallManifest):
+        manifest = InstallManifest(manifest)
+    removed = 0
+    for dst in sorted(manifest.files):
+        try:
+            os.remove(dst)
+            removed += 1
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+        manifest.forget(dst)
+    # deepest first, so that parents may become empty as well
+    for dirname in sorted(manifest.dirs, key = lambda p : (p.count(os.sep), p), reverse = True):
+        try:
+            os.rmdir(dirname)
+        except OSError as e:
+            if e.errno == errno.ENOENT:
+                manifest.forget_dir(dirname)
+            # not empty, keep it in the manifest
+            continue
+        manifest.forget_dir(dirname)
+    manifest.save()
+    return removed
+
+#############################################################################
+class InstallPlan(object):
+    """Staged installation into `SConsGnuArguments.InstallDirs` destinations.
+
+    Files are registered per destination variable (``bindir``, ``libdir``,
+    ``pkgdatadir``, ``man1dir``, ...) with `add()`. The plan is then
+    installed as a whole by `Command()` (as a single SCons action) or
+    `run()`, using `InstallParallel()`.
+
+    .. python::
+
+        # SConstruct
+        plan = SConsGnuArguments.Install.InstallPlan()
+        plan.add('bindir', prog)
+        plan.add('man1dir', ['foo.1'])
+        env.Alias('install', plan.Command(env, jobs = 16, manifest = '#install-manifest.json'))
+        SConsGnuArguments.Install.UninstallAlias(env, '#install-manifest.json')
+    """
+    def __init__(self, destdir = None):
+        """Create empty plan; with `destdir`, the files are installed under
+        the staging directory (see `SConsGnuArguments.InstallDirs.Staged()`)."""
+        self.groups = collections.OrderedDict()
+        self.destdir = destdir
+
+    def add(self, dirname, sources, kind = None):
+        """Register `sources` to be installed into the directory given by
+        construction variable `dirname`. The `kind` is as in
+        `InstallInto()`."""
+        if kind is None:
+            kind = _std_dir_kinds.get(dirname, 'INSTALL_DATA')
+        if not SCons.Util.is_List(sources):
+            sources = [sources]
+        self.groups.setdefault((dirname, kind), []).extend(sources)
+
+    def items(self, env):
+        """Return list of ``(source, destination, mode)`` for all the
+        registered files. Each destination variable is substituted (and
+        staged) once."""
+        items = []
+        staged = self.staged(env)
+        for ((dirname, kind), sources) in self.groups.items():
+            destdir = staged.get(dirname)
+            if destdir is None:
+                destdir = env.subst('$' + dirname)
+                if self.destdir:
+                    destdir = self.destdir + os.path.splitdrive(env.Dir(destdir).abspath)[1]
+            destdir = env.Dir(destdir).abspath
+            mode = _std_modes.get(kind, 0o644)
+            for s in env.arg2nodes(sources, env.File):
+                items.append((s.abspath, os.path.join(destdir, os.path.basename(s.abspath)), mode))
+        return items
+
+    def staged(self, env):
+        """Return ``{dirname : staged_path}`` for the destinations used by
+        this plan, computed at once by `SConsGnuArguments.InstallDirs.Staged()`."""
+        if not self.destdir:
+            return {}
+        import SConsGnuArguments.InstallDirs
+        InstallDirs = SConsGnuArguments.InstallDirs
+        names = [d for (d, _) in self.groups if d in InstallDirs._std_arg_registry]
+        return InstallDirs.Staged(env, self.destdir, name_filter = names)
+
+    def run(self, env, jobs = None, depth = None, manifest = None):
+        """Install all the registered files now and return `InstallStats`."""
+        return InstallParallel(self.items(env), jobs, depth, manifest)
+
+    def Command(self, env, jobs = None, depth = None, manifest = None):
+        """Return target nodes of a single SCons command, which installs all
+        the registered files in parallel and reports the throughput. With
+        `manifest` (path to the manifest file) only the changed files are
+        installed, see `InstallManifest`. The targets are marked precious,
+        so that SCons doesn't remove them before the installation."""
+        items = self.items(env)
+        dirs = ()
+        if manifest is not None:
+            manifest = env.File(manifest).abspath
+            # SCons creates the directories of targets before running the
+            # action, so the missing ones are determined now
+            dirs = PlanDirs(files = [i[1] for i in items])
+        def action(target, source, env):
+            sys.stdout.write('%s\n' % InstallParallel(items, jobs, depth, manifest, dirs))
+            return 0
+        def strfunction(target, source, env):
+            return 'Install %d files' % len(items)
+        targets = env.Command([env.File(i[1]) for i in items], [i[0] for i in items],
+                              SCons.Action.Action(action, strfunction = strfunction))
+        # SCons removes out-of-date targets before running the action, which
+        # would make the manifest see every destination as missing.
+        env.Precious(targets)
+        return targets
+
+#############################################################################
+def UninstallAlias(env, manifest, alias = 'uninstall'):
+    """Create `alias` which removes all the files listed in `manifest` (see
+    `InstallPlan.Command()`) with `Uninstall()`.
+
+    :Returns:
+        the alias node(s)
+    """
+    manifest = env.File(manifest).abspath
+    def action(target, source, env):
+        Uninstall(manifest)
+        return 0
+    def strfunction(target, source, env):
+        return 'Uninstall files listed in %s' % manifest
+    node = env.Alias(alias, [], SCons.Action.Action(action, strfunction = strfunction))
+    env.AlwaysBuild(node)
+    return node
+
+#############################################################################
+def _user_program(env, kind):
+    """Return ``True`` if `kind` is a command supplied by the user, either
+    on the command line or set explicitly in `env`. A value found by
+    `SConsGnuArguments.AltPrograms.Detect()` in this process is a default,
+    not a request for the external program. The ``INSTALL`` construction
+    variable set by SCons' ``install`` tool is a python function and doesn't
+    count either. This is for internal use, it IS **NOT a part of public
+    API**"""
+    value = env.get(kind)
+    if not SCons.Util.is_String(value) or value in ('', '${INSTALL}', '$INSTALL'):
+        return False
+    if kind in SConsGnuArguments.Util._command_line_arguments():
+        return True
+    # AltPrograms is not imported just for this check, if nothing was
+    # detected then the value comes from the user
+    AltPrograms = sys.modules.get('SConsGnuArguments.AltPrograms')
+    detected = getattr(AltPrograms, '_detected_programs', {})
+    return value not in detected.get(kind, ())
+
+#############################################################################
+def _external_program(env, kind):
+    """Return ``True`` if the user has set `kind` (or ``INSTALL``) to a
+    command, so the external program has to be used, see `_user_program()`.
+    This is for internal use, it IS **NOT a part of public API**"""
+    return _user_program(env, kind) or _user_program(env, 'INSTALL')
+
+#############################################################################
+def _external_command(env, kind, mode):
+    """Return the command line which installs ``$SOURCE`` as ``$TARGET``
+    with external program. Unless the user has set their own `kind` command,
+    ``$INSTALL`` is run with explicit `mode`, as autoconf's
+    ``INSTALL_DATA='${INSTALL} -m 644'`` does. This is for internal use, it
+    IS **NOT a part of public API**"""
+    if kind != 'INSTALL' and _user_program(env, kind):
+        return '$%s $SOURCE $TARGET' % kind
+    return '$INSTALL -m %o $SOURCE $TARGET' % mode
+
+#############################################################################
+def _install_action(target, source, env, kind):
+    """Body of the action returned by `InstallAction()`. This is for internal
+    use, it IS **NOT a part of public API**"""
+    pairs = [(str(s), str(t)) for (t, s) in zip(target, source)]
+    mode = _std_modes.get(kind, 0o644)
+    if _external_program(env, kind):
+        # the command is already shown by InstallAction's strfunction
+        action = SCons.Action.Action(_external_command(env, kind, mode))
+        for (t, s) in zip(target, source):
+            status = action([t], [s], env, show = False)
+            if status:
+                return status
+        return 0
+    InstallFiles(pairs, mode)
+    return 0
+
+#############################################################################
+def InstallAction(kind = 'INSTALL_DATA'):
+    """Return SCons action which installs its sources as its targets (the
+    i-th source to the i-th target).
+
+    :Parameters:
+        kind : str
+            one of ``'INSTALL_DATA'``, ``'INSTALL_PROGRAM'``,
+            ``'INSTALL_SCRIPT'`` or ``'INSTALL'``; selects permissions of the
+            installed files and the construction variable used when the user
+            requested an external program.
+    :Returns:
+        an `SCons.Action.Action` object
+    """
+    def action(target, source, env):
+        return _install_action(target, source, env, kind)
+    def strfunction(target, source, env):
+        return '\n'.join('%s %s %s' % (kind, s, t) for (t, s) in zip(target, source))
+    return SCons.Action.Action(action, strfunction = strfunction)
+
+#############################################################################
+def InstallInto(env, dirname, sources, kind = None):
+    """Install `sources` into one of `SConsGnuArguments.InstallDirs`
+    destinations.
+
+    All the sources are installed by a single action, so they're copied in
+    one batch.
+
+    :Parameters:
+        env
+            SCons environment with the installation directories committed,
+        dirname : str
+            construction variable holding the destination directory, e.g.
+            ``'bindir'``,
+        sources
+            list of files (nodes or paths) to be installed,
+        kind : str
+            kind of installation (see `InstallAction()`); by default
+            ``'INSTALL_PROGRAM'`` for ``bindir``, ``sbindir`` and
+            ``libexecdir`` and ``'INSTALL_DATA'`` for others.
+    :Returns:
+        list of target nodes
+    """
+    if kind is None:
+        kind = _std_dir_kinds.get(dirname, 'INSTALL_DATA')
+    destdir = env.Dir(env.subst('$' + dirname))
+    sources = env.arg2nodes(sources, env.File)
+    targets = [destdir.File(os.path.basename(str(s))) for s in sources]
+    return env.Command(targets, sources, InstallAction(kind))
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -97,9 +97,9 @@ Running examples::
   mandir
       The top-level directory for installing the man pages (if any) for this
       package.
-  man1dir .. man9dir
+  man1dir .. man9dir, manndir, manldir
       Simmilar to mandir
-  man1ext .. man9ext
+  man1ext .. man9ext, mannext, manlext
       Extensions for manpage files.
   pkgdatadir
       The directory for installing idiosyncratic read-only
@@ -113,6 +113,9 @@ Running examples::
       The directory for installing executable programs to be run by other
       programs rather than by users.
 
+The man sections may be selected with ``man_sections`` parameter of
+`Names()` and `Declarations()`, e.g. ``man_sections = ['1', '8']``.
+
 .. _GNU directory variables: http://www.gnu.org/prep/standards/html_node/Directory-Variables.html
 .. _GNU Coding Standards: http://www.gnu.org/prep/standards/html_node/
 """
@@ -142,7 +145,6 @@ Running examples::
 __docformat__ = 'restructuredText'
 
 import os
-import SConsArguments
 import SConsGnuArguments.Util
 
 #############################################################################
@@ -248,30 +250,82 @@ _std_arg_triples = [
 attribute and IS **NOT a part of public API**"""
 
 #############################################################################
-def __init_module_vars(**kw):
-    """Initializes some module-level variables. This is an internal function
-    and IS **NOT a part of public API**."""
-    man_sections = kw.get('man_sections', map(lambda x : str(x), range(1,10)) + ['n','l'])
+_std_man_sections = ('1', '2', '3', '4', '5', '6', '7', '8', '9', 'n', 'l')
+"""Default man sections, for which ``man%sdir`` and ``man%sext`` arguments
+are provided. This is internal attribute and IS **NOT a part of public API**"""
+
+#############################################################################
+def _man_triples(man_sections):
+    """Return ``man%sdir`` and ``man%sext`` triples for `man_sections`. This
+    is an internal function and IS **NOT a part of public API**."""
+    triples = []
     for sec in man_sections:
         dir_help = 'The directory for installing section %s man pages.' % sec
         ext_help = 'The file name extension for installed section %s man pages.' % sec
-        _std_arg_triples.append( ('man%sdir' % sec, dir_help, '${mandir}/man%s' %sec) )
-        _std_arg_triples.append( ('man%sext' % sec, ext_help, '.%s' %sec) )
-__init_module_vars()
+        triples.append( ('man%sdir' % sec, dir_help, '${mandir}/man%s' %sec) )
+        triples.append( ('man%sext' % sec, ext_help, '.%s' %sec) )
+    return triples
+
+_registries = {}
+"""Registries of arguments, by man sections. This is internal attribute and
+IS **NOT a part of public API**"""
+
+#############################################################################
+def _arg_registry(man_sections = None):
+    """Return registry of arguments including man pages `man_sections` (all
+    the standard ones by default). The registries are created when first
+    requested and filled in when first used. This is an internal function
+    and IS **NOT a part of public API**."""
+    if man_sections is None:
+        man_sections = _std_man_sections
+    key = tuple(str(sec) for sec in man_sections)
+    try:
+        return _registries[key]
+    except KeyError:
+        # the triples are generated when the registry is first used
+        registry = SConsGnuArguments.Util._ArgumentRegistry(lambda : _std_arg_triples + _man_triples(key))
+        return _registries.setdefault(key, registry)
 
 #############################################################################
-def Names(name_filter = lambda x : True):
+def _registry_from_kw(kw):
+    """Pop ``man_sections`` from `kw` and return the corresponding registry.
+    This is an internal function and IS **NOT a part of public API**."""
+    return _arg_registry(kw.pop('man_sections', None))
+
+_std_arg_registry = _arg_registry()
+"""Predefined arguments (including all standard man sections) indexed by
+name. This is for internal use, it IS **NOT a part of public API**"""
+
+#############################################################################
+_schema_kw = { 'opt_key_transform' : False }
+"""Keywords of `Declarations()` the frozen schema is generated for. This is
+internal attribute and IS **NOT a part of public API**"""
+
+#############################################################################
+def _schema_table():
+    """Return the frozen schema table for ``bin/gen_schema.py``. This is an
+    internal function and IS **NOT a part of public API**."""
+    registry = _std_arg_registry
+    return SConsGnuArguments.Util.schema_table(registry, registry.digest(), _schema_kw)
+
+#############################################################################
+def Names(name_filter = lambda x : True, man_sections = None):
     """Return list of standard GNU directory argument names.
 
     :Parameters:
-        name_filter : callable
+        name_filter : callable | list | tuple | set | frozenset
             callable object (e.g. lambda) of type ``name_filter(name) ->
             boolean`` used to filter-out unwanted variables; only these
-            variables are processed, for which name_filter returns ``True``
+            variables are processed, for which name_filter returns ``True``;
+            alternativelly a collection of names of variables to be processed
+        man_sections : list
+            man sections for which ``man%sdir`` and ``man%sext`` are provided,
+            e.g. ``['1', '3', '8']`` (default: ``1`` to ``9``, ``n`` and
+            ``l``).
     :Returns:
         the list of standard GNU directory variable names
     """
-    return SConsGnuArguments.Util.names_from_triples(_std_arg_triples, name_filter)
+    return list(SConsGnuArguments.Util.names_from_triples(_arg_registry(man_sections), name_filter))
 
 ###############################################################################
 def Declarations(**kw):
@@ -281,10 +335,19 @@ def Declarations(**kw):
     :Keywords:
         defaults : dict
             user-specified default values for the Arguments being declared,
-        name_filter : callable
+        name_filter : callable | list | tuple | set | frozenset
             callable object (e.g. lambda) of type ``name_filter(name) ->
             boolean`` used to filter-out unwanted variables; only these
-            variables are processed, for which name_filter returns ``True``
+            variables are processed, for which name_filter returns ``True``;
+            alternativelly a collection of names of variables to be processed
+        man_sections : list
+            man sections for which ``man%sdir`` and ``man%sext`` are declared,
+            e.g. ``['1']`` (default: ``1`` to ``9``, ``n`` and ``l``),
+        lazy : boolean
+            if ``True``, the declaration of each argument is built when it's
+            accessed for the first time (or at ``Commit()``), this saves time
+            when only few of the arguments are actually used (ignored with
+            python 2, see `SConsGnuArguments.Util.arguments_from_triples()`),
         nameconv : `SConsArguments._ArgumentNameConv`
             a `SConsArguments._ArgumentNameConv` object used to transform
             *argument* names to *endpoint* (construction variable, command-line
@@ -317,12 +380,173 @@ def Declarations(**kw):
         option_transform
             passed to `SConsArguments._ArgumentNameConv.__init__()`.
 
+    When called with default keywords, the declarations are taken from the
+    frozen schema module generated by ``bin/gen_schema.py`` (if present and
+    up to date).
+
     :Returns:
         an instance of `SConsArguments._ArgumentDeclarations`
     """
     if not 'opt_key_transform' in kw:
         kw['opt_key_transform'] = False
-    return SConsGnuArguments.Util.arguments_from_triples(_std_arg_triples, **kw)
+    if kw == _schema_kw:
+        decls = SConsGnuArguments.Util.frozen_declarations('InstallDirs', _std_arg_registry.digest(), kw)
+        if decls is not None:
+            return decls
+    return SConsGnuArguments.Util.arguments_from_triples(_registry_from_kw(kw), **kw)
+
+###############################################################################
+def Resolve(env, **kw):
+    """Return final values of GNU installation directory variables.
+
+    The references between directory variables (e.g. ``prefix ->
+    exec_prefix -> libdir -> pkglibdir``) are ordered topologically once and
+    every variable is expanded exactly once, so the result is same as
+    calling ``env.subst('${name}')`` for each of them, but much cheaper.
+
+    .. python::
+        # SConstruct
+        decls = SConsGnuArguments.InstallDirs.Declarations()
+        args = decls.Commit(env, var, True)
+        args.Postprocess(env, var, True)
+        dirs = SConsGnuArguments.InstallDirs.Resolve(env)
+        print dirs['pkglibdir']
+
+    :Parameters:
+        env
+            SCons environment with the arguments already committed and
+            postprocessed.
+    :Keywords:
+        name_filter : callable | list | tuple | set | frozenset
+            selects variables to be resolved,
+        man_sections : list
+            man sections taken into account (see `Declarations()`),
+        nameconv : `SConsArguments._ArgumentNameConv`
+            the name convention used when declaring the arguments,
+        env_key_prefix
+            passed to `SConsArguments._ArgumentNameConv.__init__()`,
+        env_key_suffix
+            passed to `SConsArguments._ArgumentNameConv.__init__()`,
+        env_key_transform
+            passed to `SConsArguments._ArgumentNameConv.__init__()`,
+        cache_file : str | boolean
+            persist resolved values in this file (``True`` selects
+            ``.sconsign-gnu-arguments.json`` in the top-level directory) and
+            skip the resolution in subsequent runs if nothing has changed,
+        arguments : dict
+            command-line variables which invalidate cached values (default:
+            SCons ``ARGUMENTS``),
+        environ : list
+            names of OS environment variables which invalidate cached values.
+
+    :Returns:
+        a plain dict ``{name : value}`` with argument names as keys
+    """
+    return SConsGnuArguments.Util.resolve_triples(_registry_from_kw(kw), env, **kw)
+
+###############################################################################
+def Staged(env, destdir = None, **kw):
+    """Return GNU installation directories re-rooted under ``DESTDIR``.
+
+    The directories are resolved once (see `Resolve()`) and each of them is
+    prefixed with `destdir`, as ``$(DESTDIR)$(bindir)`` in GNU makefiles:
+
+    .. python::
+        # SConstruct
+        staged = SConsGnuArguments.InstallDirs.Staged(env, '/tmp/stage')
+        print staged['bindir']  # /tmp/stage/usr/local/bin
+
+    The resolved values are cached per environment (as in `Dirs()`), so the
+    subsequent calls resolve them again only if the construction variables
+    involved have changed. To get both the final values and the staged paths
+    from one resolution, use `Resolver()`:
+
+    .. python::
+        # SConstruct
+        dirs = SConsGnuArguments.InstallDirs.Resolver(env)
+        print dirs['bindir']                      # /usr/local/bin
+        print dirs.staged('/tmp/stage')['bindir'] # /tmp/stage/usr/local/bin
+
+    :Parameters:
+        env
+            SCons environment with the arguments already committed and
+            postprocessed,
+        destdir : str
+            the staging directory; if ``None``, ``$DESTDIR`` from `env` or
+            ``DESTDIR`` from OS environment is used (empty if neither is
+            set).
+    :Keywords:
+        name_filter, nameconv, env_key_prefix, env_key_suffix, env_key_transform
+            see `Resolve()`.
+    :Returns:
+        a plain dict ``{name : staged_value}`` for directory variables (the
+        ``*ext`` variables are omitted); with empty `destdir` it contains
+        the final values returned by `Resolve()`
+    """
+    if destdir is None:
+        if 'DESTDIR' in env:
+            destdir = env.subst('$DESTDIR')
+        else:
+            destdir = os.environ.get('DESTDIR', '')
+    return SConsGnuArguments.Util.staged_from_triples(_registry_from_kw(kw), env, destdir, **kw)
+
+###############################################################################
+def Dirs(env, name = None, **kw):
+    """Return SCons ``Dir`` nodes of GNU installation directories.
+
+    The nodes are cached per environment, so that builders may take them
+    directly instead of substituting ``'${pkglibdir}'`` and looking up the
+    node again on every call. The cache is invalidated when any of the
+    construction variables involved (e.g. ``prefix``) or the current
+    directory of SCons file system changes.
+
+    .. python::
+        # SConstruct
+        dirs = SConsGnuArguments.InstallDirs.Dirs(env)
+        env.Install(dirs['pkglibdir'], plugins)
+        env.Install(SConsGnuArguments.InstallDirs.Dirs(env, 'bindir'), prog)
+
+    :Parameters:
+        env
+            SCons environment with the arguments already committed and
+            postprocessed,
+        name : str
+            if given, only the node of this directory is returned, which
+            is cheaper than copying the whole dict.
+    :Keywords:
+        name_filter, nameconv, env_key_prefix, env_key_suffix, env_key_transform
+            see `Resolve()`.
+    :Returns:
+        a plain dict ``{name : node}`` with argument names as keys (or the
+        single node, if `name` is given)
+    """
+    return SConsGnuArguments.Util.dir_nodes_from_triples(_registry_from_kw(kw), env, name, **kw)
+
+###############################################################################
+def Resolver(env, **kw):
+    """Return a dependency-tracking view of GNU installation directories.
+
+    Works as `Resolve()`, but the returned object remembers which variables
+    refer to which. When some of the variables get new raw values, only
+    these variables and their transitive dependents are expanded again.
+
+    .. python::
+        # SConstruct
+        dirs = SConsGnuArguments.InstallDirs.Resolver(env)
+        print dirs['docdir']
+        dirs.update_names({'libdir' : '${exec_prefix}/lib64'})
+        print dirs.recomputed_names  # ['libdir', 'pkglibdir']
+
+    :Parameters:
+        env
+            SCons environment with the arguments already committed and
+            postprocessed.
+    :Keywords:
+        see `Resolve()`.
+    :Returns:
+        an instance of `SConsGnuArguments.Util._NamedResolver`
+    """
+    return SConsGnuArguments.Util.resolver_from_triples(_registry_from_kw(kw), env, **kw)
 
 # Local Variables:
 # # tab-width:4
@@ -26,8 +26,339 @@ Utility functions used by SConsGnuArguments
 
 __docformat__ = 'restructuredText'
 
-import SConsArguments
-import SCons.Util
+import collections
+import operator
+import sys
+import timeit
+import os
+import re
+
+# NOTE: SConsArguments, SCons and the heavier standard modules (threading,
+#       hashlib, ...) are imported by the functions which use them, so that
+#       importing the submodules stays cheap.
+
+#############################################################################
+_profile_hooks = []
+"""Profiling hooks installed with `add_profile_hook()`. This is an internal
+attribute and IS **NOT a part of public API**"""
+
+_timer = timeit.default_timer
+
+#############################################################################
+def add_profile_hook(hook):
+    """Install a profiling hook for this process.
+
+    The hook is called after each of the instrumented phases with three
+    arguments: ``hook(phase, seconds, triples)``, where ``phase`` is one of
+    ``'map_triples'``, ``'arguments_from_triples'`` or ``'nameconv'``
+    (look-up of the name convention, including construction of
+    `SConsArguments._ArgumentNameConv` if it's used for the first time,
+    see `endpoint_names()`), ``seconds`` is the
+    wall time spent in this call (phases may be nested, the time is
+    inclusive) and ``triples`` is the number of triples processed. When no
+    hook is installed, the instrumentation costs a single test per call.
+
+    :Parameters:
+        hook : callable
+            the hook to install, e.g. a `ProfileStats` instance.
+    """
+    if hook not in _profile_hooks:
+        _profile_hooks.append(hook)
+
+#############################################################################
+def remove_profile_hook(hook):
+    """Uninstall profiling `hook` installed with `add_profile_hook()`."""
+    try:
+        _profile_hooks.remove(hook)
+    except ValueError:
+        pass
+
+#############################################################################
+def _profile(phase, seconds, triples):
+    for hook in list(_profile_hooks):
+        hook(phase, seconds, triples)
+
+#############################################################################
+class ProfileStats(object):
+    """Profiling hook which accumulates per-phase statistics.
+
+    .. python::
+        # SConstruct
+        import SConsGnuArguments.Util
+        stats = SConsGnuArguments.Util.ProfileStats()
+        SConsGnuArguments.Util.add_profile_hook(stats)
+        # ... declare, commit, etc.
+        print stats.table()
+    """
+    def __init__(self):
+        self.phases = collections.OrderedDict()
+
+    def __call__(self, phase, seconds, triples):
+        try:
+            rec = self.phases[phase]
+        except KeyError:
+            rec = self.phases[phase] = { 'calls' : 0, 'seconds' : 0.0, 'triples' : 0 }
+        rec['calls'] += 1
+        rec['seconds'] += seconds
+        rec['triples'] += triples
+
+    def clear(self):
+        """Forget all collected data."""
+        self.phases.clear()
+
+    def json(self, **kw):
+        """Return collected data as JSON string; `kw` are passed to
+        ``json.dumps()``."""
+        import json
+        return json.dumps(self.phases, **kw)
+
+    def table(self):
+        """Return collected data as text table."""
+        lines = ['%-24s %8s %12s %10s' % ('phase', 'calls', 'time [ms]', 'triples')]
+        for (phase, rec) in self.phases.items():
+            lines.append('%-24s %8d %12.3f %10d' % (phase, rec['calls'], rec['seconds'] * 1e3, rec['triples']))
+        return '\n'.join(lines)
+
+#############################################################################
+def _is_name_collection(obj):
+    """Return ``True`` if `obj` is a collection of names (list, tuple, set or
+    frozenset) rather than a predicate. This is an internal function and IS
+    **NOT a part of public API**."""
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return True
+    elif callable(obj):
+        # the common case, no need to load SCons for it
+        return False
+    import SCons.Util
+    return SCons.Util.is_Sequence(obj)
+
+#############################################################################
+try:
+    _intern = sys.intern
+except AttributeError:
+    # python 2
+    _intern = intern
+
+#############################################################################
+def _guess_category(name):
+    """Guess category of argument `name`. This is an internal function and IS
+    **NOT a part of public API**."""
+    if name == 'prefix' or name == 'exec_prefix':
+        return 'prefix'
+    elif name.endswith('dir'):
+        return 'dir'
+    elif name.endswith('ext'):
+        return 'ext'
+    return None
+
+_metavars = { 'prefix' : 'DIR', 'dir' : 'DIR', 'ext' : 'EXT' }
+"""Default metavars for argument categories. This is an internal attribute
+and IS **NOT a part of public API**"""
+
+#############################################################################
+_spec_types = {}
+"""Subclasses of `ArgumentSpec` indexed by ``(category, metavar)``, see
+`ArgumentSpec.__new__()`. This is an internal attribute and IS **NOT a part
+of public API**"""
+
+#############################################################################
+class ArgumentSpec(tuple):
+    """Immutable specification of a predefined argument.
+
+    The spec is a triple ``(name, help, default)`` (a tuple subclass, like
+    ``collections.namedtuple``), so it may be used wherever an argument
+    triple is expected, at the speed of a plain tuple. The help string is
+    interned, such that all the specs (and declarations created from them)
+    share a single copy of each distinct help message. The ``category`` and
+    ``metavar`` are attributes of the spec's class: specs are instances of
+    (cached) subclasses of `ArgumentSpec`, one per distinct pair
+    ``(category, metavar)``, so they need no per-instance storage.
+
+    :Ivariables:
+        name
+            argument name,
+        help
+            help message,
+        default
+            default value,
+        category
+            one of ``'prefix'``, ``'dir'``, ``'ext'`` or ``None``,
+        metavar
+            the metavar used in command-line help.
+    """
+    __slots__ = ()
+
+    category = None
+    metavar = 'X'
+
+    def __new__(cls, name, help, default, category = None, metavar = None):
+        if category is None:
+            category = _guess_category(name)
+        if metavar is None:
+            metavar = _metavars.get(category, 'X')
+        if type(help) is str:
+            help = _intern(help)
+        key = (category, metavar)
+        try:
+            spec_type = _spec_types[key]
+        except KeyError:
+            attrs = { '__slots__' : (), 'category' : category, 'metavar' : metavar }
+            spec_type = type(ArgumentSpec)('ArgumentSpec', (ArgumentSpec,), attrs)
+            spec_type = _spec_types.setdefault(key, spec_type)
+        return tuple.__new__(spec_type, (name, help, default))
+
+    name = property(operator.itemgetter(0), doc = 'argument name')
+    help = property(operator.itemgetter(1), doc = 'help message')
+    default = property(operator.itemgetter(2), doc = 'default value')
+
+    @classmethod
+    def from_triple(cls, triple):
+        """Return `triple` converted to `ArgumentSpec` (or the `triple`
+        itself, if it's already an `ArgumentSpec`)."""
+        if isinstance(triple, cls):
+            return triple
+        return cls(*triple)
+
+    def __eq__(self, other):
+        if isinstance(other, ArgumentSpec):
+            return tuple.__eq__(self, other) and \
+                   (self.category, self.metavar) == (other.category, other.metavar)
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        if eq is NotImplemented:
+            return eq
+        return not eq
+
+    __hash__ = tuple.__hash__
+
+    def __repr__(self):
+        return 'ArgumentSpec(%r, %r, %r, %r, %r)' % (self + (self.category, self.metavar))
+
+    def __getnewargs__(self):
+        return tuple(self) + (self.category, self.metavar)
+
+    def __reduce__(self):
+        return (ArgumentSpec, self.__getnewargs__())
+
+#############################################################################
+class _ArgumentRegistry(object):
+    """Argument triples indexed by argument name.
+
+    The registry keeps the triples (converted to `ArgumentSpec`) in their
+    original order and maintains an index ``name -> position``, such that
+    a triple may be found in constant time. Selecting triples with a
+    collection of names costs time proportional to the number of names being
+    selected, not to the size of the whole table.
+
+    This is an internal class and IS **NOT a part of public API**.
+    """
+    def __init__(self, triples = ()):
+        """Initialize the registry.
+
+        :Parameters:
+            triples : list | callable
+                initial list of triples ``(name, desc, default)``, or a
+                function returning such a list; the function is called (and
+                the specs are created) when the registry is first used.
+        """
+        self.__triples = []
+        self.__index = {}
+        # bumped on every modification, invalidates memoized declarations
+        self.generation = 0
+        if callable(triples):
+            self.__factory = triples
+        else:
+            self.__factory = None
+            self.extend(triples)
+        self.__digest = None
+
+    def __load(self):
+        factory = self.__factory
+        if factory is not None:
+            self.__factory = None
+            generation = self.generation
+            self.extend(factory())
+            self.generation = generation
+
+    def __len__(self):
+        self.__load()
+        return len(self.__triples)
+
+    def __iter__(self):
+        self.__load()
+        return iter(self.__triples)
+
+    def __contains__(self, name):
+        self.__load()
+        return name in self.__index
+
+    def __getitem__(self, name):
+        """Return the triple for argument `name`; raise `KeyError` if there is
+        no such argument."""
+        self.__load()
+        return self.__triples[self.__index[name]]
+
+    def get(self, name, default = None):
+        """Return the triple for argument `name` or `default`."""
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def append(self, triple):
+        """Add new `triple` at the end of the registry. If an argument with
+        the same name is already registered, its triple gets replaced."""
+        self.__load()
+        triple = ArgumentSpec.from_triple(triple)
+        name = triple.name
+        self.generation += 1
+        try:
+            self.__triples[self.__index[name]] = triple
+        except KeyError:
+            self.__index[name] = len(self.__triples)
+            self.__triples.append(triple)
+
+    def extend(self, triples):
+        """Append all the `triples` to the registry."""
+        for triple in triples:
+            self.append(triple)
+
+    def select(self, name_filter = None):
+        """Return the list of triples accepted by `name_filter`.
+
+        :Parameters:
+            name_filter : callable | list | tuple | set | frozenset
+                either a predicate of type ``name_filter(name) -> boolean``
+                or a collection of argument names to be selected; names which
+                are not in registry are silently ignored. If ``None``, all the
+                triples are returned.
+        :Returns:
+            list of selected triples, in registry order
+        """
+        return list(self.iterselect(name_filter))
+
+    def iterselect(self, name_filter = None):
+        """Same as `select()`, but return an iterator over selected triples
+        instead of list."""
+        self.__load()
+        triples = self.__triples
+        if name_filter is None:
+            return iter(triples)
+        if _is_name_collection(name_filter):
+            index = self.__index
+            positions = sorted(set(index[n] for n in name_filter if n in index))
+            return (triples[i] for i in positions)
+        return (t for t in triples if name_filter(t[0]))
+
+    def digest(self):
+        """Return `schema_digest()` of the registered triples. The digest is
+        recomputed only after the registry was modified."""
+        self.__load()
+        if self.__digest is None or self.__digest[0] != self.generation:
+            self.__digest = (self.generation, schema_digest(self.__triples))
+        return self.__digest[1]
 
 #############################################################################
 def map_triples(callback, triples, name_filter = lambda x : True):
@@ -41,31 +372,74 @@ def map_triples(callback, triples, name_filter = lambda x : True):
                 - ``name:`` is the name of variable being processed,
                 - ``desc:`` is short description,
                 - ``default:`` is the default value for the variable.
-        triples : list
+        triples : list | `_ArgumentRegistry`
             a list of 3-element tuples with, each entry of the list should
             be a tuple of the form ``(name, desc, default)``, where ``name``
             is the name of argument, ``desc`` is description (used as help
-            message) and ``default`` is default value.
-        name_filter : callable
+            message) and ``default`` is default value; may also be an
+            `_ArgumentRegistry` in which case the triples are looked up by
+            name,
+        name_filter : callable | list | tuple | set | frozenset
             callable object (e.g. lambda) of type ``name_filter(name) ->
             boolean`` used to filter-out unwanted variables; only these
-            variables are processed, for which name_filter returns ``True``
+            variables are processed, for which name_filter returns ``True``;
+            alternativelly a collection of names of variables to be processed
 
     :Returns:
-        returns result of mapping through `callback`
+        an iterator over results of mapping through `callback`; the triples
+        are processed one by one, as the iterator is consumed
     """
-    if SCons.Util.is_Sequence(name_filter):
-        seq = name_filter
-        name_filter = lambda x : x in seq
-    triples = filter(lambda t : name_filter(t[0]), triples)
-    return map(lambda x : callback(*x), triples)
+    if not _profile_hooks:
+        return _map_triples(callback, triples, name_filter)
+    return _profiled_map_triples(callback, triples, name_filter)
+
+#############################################################################
+def _select_triples(triples, name_filter):
+    """Return an iterator over triples accepted by `name_filter`. This is an
+    internal function and IS **NOT a part of public API**."""
+    if isinstance(triples, _ArgumentRegistry):
+        return triples.iterselect(name_filter)
+    if _is_name_collection(name_filter):
+        names = frozenset(name_filter)
+        return (t for t in triples if t[0] in names)
+    return (t for t in triples if name_filter(t[0]))
+
+#############################################################################
+def _map_triples(callback, triples, name_filter):
+    """Implementation of `map_triples()`. This is an internal function and IS
+    **NOT a part of public API**."""
+    return (callback(*t) for t in _select_triples(triples, name_filter))
+
+#############################################################################
+def _profiled_map_triples(callback, triples, name_filter):
+    """`_map_triples()` reporting to profiling hooks. Only the time spent in
+    producing items is measured, the hooks are called when the iterator is
+    exhausted (or closed). This is an internal function and IS **NOT a part
+    of public API**."""
+    items = _map_triples(callback, triples, name_filter)
+    seconds = 0.0
+    count = 0
+    try:
+        while True:
+            t0 = _timer()
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            finally:
+                seconds += _timer() - t0
+            count += 1
+            yield item
+    finally:
+        _profile('map_triples', seconds, count)
 
 #############################################################################
 def names_from_triples(triples, name_filter = lambda x : True):
-    """Return list of argument names extracted from argument triples.
+    """Return an iterator over argument names extracted from argument
+    triples.
 
     :Parameters:
-        triples : list
+        triples : list | `_ArgumentRegistry`
             a list of 3-element tuples with, each entry of the list should
             be a tuple of the form ``(name, desc, default)``, where ``name``
             is the name of argument, ``desc`` is description (used as help
@@ -75,7 +449,7 @@ def names_from_triples(triples, name_filter = lambda x : True):
             boolean`` used to filter-out unwanted variables; only these
             variables are processed, for which name_filter returns ``True``
     :Returns:
-        the list of standard GNU directory variable names
+        an iterator over names of selected arguments
     """
     return map_triples(lambda *x : x[0], triples, name_filter)
 
@@ -84,7 +458,7 @@ def arguments_from_triples(triples, **kw):
     """Convert triples to argument declarations.
 
     :Parameters:
-        triples : list
+        triples : list | `_ArgumentRegistry`
             a list of 3-element tuples with, each entry of the list should
             be a tuple of the form ``(name, desc, default)``, where ``name``
             is the name of argument, ``desc`` is description (used as help
@@ -105,6 +479,9 @@ def arguments_from_triples(triples, **kw):
             create argument of given type (default: 'string')
         metavar
             use as command-line metavar
+        lazy : boolean
+            if ``True``, build declarations of arguments on first access
+            (default: ``False``),
         env_key_prefix
             passed to `SConsArguments._ArgumentNameConv.__init__()`,
         env_key_suffix
@@ -132,9 +509,67 @@ def arguments_from_triples(triples, **kw):
         option_transform
             passed to `SConsArguments._ArgumentNameConv.__init__()`.
 
+    If memoization is enabled (see `enable_declarations_cache()`) and
+    `triples` is an `_ArgumentRegistry`, the declarations are computed once
+    per distinct set of keyword arguments.
+
+    With ``lazy=True`` a `_LazyArgumentDeclarations` object is returned,
+    which builds the declaration of each argument on first access (or at
+    ``Commit()``); lazy declarations are never memoized. With python 2 the
+    ``lazy`` keyword is ignored, see `_lazy_supported`.
+
     :Returns:
         an instance of `SConsArguments._ArgumentDeclarations`
     """
+    if not _profile_hooks:
+        return _arguments_from_triples(triples, kw)
+    t0 = _timer()
+    decls = _arguments_from_triples(triples, kw)
+    _profile('arguments_from_triples', _timer() - t0, len(decls))
+    return decls
+
+###############################################################################
+def _arguments_from_triples(triples, kw):
+    """Implementation of `arguments_from_triples()`. This is an internal
+    function and IS **NOT a part of public API**."""
+    if kw.pop('lazy', False) and _lazy_supported:
+        selected = _select_triples(triples, kw.get('name_filter', lambda s : True))
+        return _lazy_declarations_type()(selected, _declaration_callback(kw, triples))
+    import SConsArguments
+    cache = _declarations_cache
+    if cache is not None and isinstance(triples, _ArgumentRegistry):
+        try:
+            key = (triples, triples.generation, _fingerprint_kw(kw))
+        except TypeError:
+            # some of the keyword arguments are not hashable
+            key = None
+        if key is not None:
+            pairs = cache.get(key)
+            if pairs is None:
+                pairs = tuple(_declaration_pairs(triples, kw))
+                cache.put(key, pairs)
+            # The cached dicts are never handed out, each call gets its own
+            # copies, so the declarations may be freely modified by caller.
+            return SConsArguments.DeclareArguments([(n, dict(d)) for (n, d) in pairs])
+    return SConsArguments.DeclareArguments(_declaration_pairs(triples, kw))
+
+###############################################################################
+def _declaration_pairs(triples, kw):
+    """Convert triples to a list of ``(name, decl)`` pairs, where ``decl`` is
+    a dict with argument declaration. See `arguments_from_triples()` for the
+    meaning of keywords in `kw`. This is an internal function and IS **NOT
+    a part of public API**."""
+    name_filter = kw.get('name_filter', lambda s : True)
+    return map_triples(_declaration_callback(kw, triples), triples, name_filter)
+
+###############################################################################
+def _declaration_callback(kw, triples = None):
+    """Return a function of type ``callback(name, desc, default) -> (name,
+    decl)`` which converts single triple into declaration dict ``decl``. See
+    `arguments_from_triples()` for the meaning of keywords in `kw`. If
+    `triples` is an `_ArgumentRegistry`, metavars are taken from its
+    `ArgumentSpec` records. This is an internal function and IS **NOT a part
+    of public API**."""
     # TODO: This is quite unorganized, I should get back here and elaborate
     def _callback(name, desc, default):
         try:
@@ -143,17 +578,11 @@ def arguments_from_triples(triples, **kw):
             pass
         if metavar:
             _metavar = metavar
+        elif specs is not None and name in specs:
+            _metavar = specs[name].metavar
         else:
-            # FIXME: especially this, how do we know in general what the
-            # metavar should we generate for a given variable, do we have any
-            # idea? This should be probably job for _ArgumentNameConv.
-            if name.endswith('ext'):
-                _metavar = 'EXT'
-            elif name.endswith('dir') or name == 'prefix' or name == 'exec_prefix':
-                _metavar = 'DIR'
-            else:
-                _metavar = 'X'
-        decl = nameconv.name2dict(name)
+            _metavar = _metavars.get(_guess_category(name), 'X')
+        decl = dict(endpoints.get(name))
         decl.update({'default'  : default,
                      'help'     : desc,
                      'type'     : _type,
@@ -161,14 +590,1379 @@ def arguments_from_triples(triples, **kw):
                      'metavar'  : _metavar })
         return name, decl
 
+    specs = triples if isinstance(triples, _ArgumentRegistry) else None
     defaults = kw.get('defaults', dict())
-    name_filter = kw.get('name_filter', lambda s : True)
     _type = kw.get('type', 'string')
     metavar = kw.get('metavar')
+    endpoints = _endpoint_table(kw)
+    return _callback
+
+###############################################################################
+def _nameconv_kw(kw):
+    """Return these keywords from `kw` which are passed to
+    `SConsArguments._ArgumentNameConv`. This is an internal function and IS
+    **NOT a part of public API**."""
+    skip = ['defaults', 'name_filter', 'nameconv', 'type', 'metavar', 'lazy',
+            'cache_file', 'arguments', 'environ']
+    return { k:v for (k,v) in kw.items() if k not in skip }
+
+###############################################################################
+class _EndpointTable(object):
+    """Endpoint names (construction variable, command-line variable and
+    command-line option names) computed by one name convention.
+
+    Each argument name is converted by ``nameconv.name2dict()`` only once,
+    the results are remembered and shared by all the argument sets declared
+    with the same name convention.
+
+    This is an internal class and IS **NOT a part of public API**.
+    """
+    def __init__(self, nameconv):
+        self.nameconv = nameconv
+        self.__dicts = {}
+
+    def get(self, name):
+        """Return the dict of endpoint names for argument `name`. The dict
+        is shared, the caller must not modify it."""
+        try:
+            return self.__dicts[name]
+        except KeyError:
+            return self.__dicts.setdefault(name, self.nameconv.name2dict(name))
+
+    def batch(self, names):
+        """Return dict ``{name : endpoints}`` for all argument `names`. The
+        inner dicts are shared, the caller must not modify them."""
+        dicts = self.__dicts
+        name2dict = self.nameconv.name2dict
+        result = {}
+        for name in names:
+            try:
+                result[name] = dicts[name]
+            except KeyError:
+                result[name] = dicts.setdefault(name, name2dict(name))
+        return result
+
+_endpoint_tables = {}
+"""Endpoint tables of name conventions created from keywords, indexed by
+fingerprint of the keywords. This is an internal attribute and IS **NOT
+a part of public API**"""
+
+_nameconv_endpoint_tables = None
+"""Endpoint tables of name convention objects given by user (a
+``weakref.WeakKeyDictionary`` created when first needed). This is an
+internal attribute and IS **NOT a part of public API**"""
+
+###############################################################################
+def _endpoint_table(kw):
+    """Return `_EndpointTable` for the name convention described by `kw`
+    (either ``kw['nameconv']`` or keywords of
+    `SConsArguments._ArgumentNameConv`). This is an internal function and IS
+    **NOT a part of public API**."""
+    if not _profile_hooks:
+        return _get_endpoint_table(kw)
+    t0 = _timer()
+    table = _get_endpoint_table(kw)
+    _profile('nameconv', _timer() - t0, 0)
+    return table
+
+###############################################################################
+def _get_endpoint_table(kw):
+    """Implementation of `_endpoint_table()`. This is an internal function
+    and IS **NOT a part of public API**."""
+    global _nameconv_endpoint_tables
     try:
         nameconv = kw['nameconv']
     except KeyError:
-        skip = ['defaults', 'name_filter', 'nameconv', 'type', 'metavar']
-        kw2 = { k:v for (k,v) in kw.iteritems() if k not in skip }
-        nameconv = SConsArguments._ArgumentNameConv(**kw2)
-    return SConsArguments.DeclareArguments(map_triples(_callback, triples, name_filter))
+        import SConsArguments
+        nameconv_kw = _nameconv_kw(kw)
+        try:
+            key = _fingerprint(nameconv_kw)
+        except TypeError:
+            # some of the keywords are not hashable
+            return _EndpointTable(SConsArguments._ArgumentNameConv(**nameconv_kw))
+        try:
+            return _endpoint_tables[key]
+        except KeyError:
+            table = _EndpointTable(SConsArguments._ArgumentNameConv(**nameconv_kw))
+            return _endpoint_tables.setdefault(key, table)
+    if _nameconv_endpoint_tables is None:
+        import weakref
+        _nameconv_endpoint_tables = weakref.WeakKeyDictionary()
+    try:
+        return _nameconv_endpoint_tables[nameconv]
+    except KeyError:
+        return _nameconv_endpoint_tables.setdefault(nameconv, _EndpointTable(nameconv))
+    except TypeError:
+        # nameconv does not support weak references
+        return _EndpointTable(nameconv)
+
+###############################################################################
+def endpoint_names(names, **kw):
+    """Compute endpoint names for several arguments at once.
+
+    The endpoint names (construction variable, command-line variable and
+    command-line option names) are computed once per argument name and name
+    convention, and remembered for subsequent calls.
+
+    .. python::
+        endpoints = SConsGnuArguments.Util.endpoint_names(['prefix', 'bindir'], env_key_prefix = 'GNU_')
+        print endpoints['bindir']['env_key'] # GNU_bindir
+
+    :Parameters:
+        names : iterable
+            argument names.
+    :Keywords:
+        nameconv : `SConsArguments._ArgumentNameConv`
+            the name convention to be used; if not given, it's created from
+            the remaining keywords,
+        env_key_prefix, env_key_suffix, env_key_transform, var_key_prefix, ...
+            passed to `SConsArguments._ArgumentNameConv.__init__()`.
+    :Returns:
+        dict ``{name : endpoints}``, where ``endpoints`` is a dict returned by
+        `SConsArguments._ArgumentNameConv.name2dict()`
+    """
+    endpoints = _endpoint_table(kw).batch(names)
+    return dict((name, dict(d)) for (name, d) in endpoints.items())
+
+###############################################################################
+_lazy_supported = sys.version_info >= (3,)
+"""Whether `_LazyArgumentDeclarations` may be used. With python 2,
+``dict(decls)`` and ``other.update(decls)`` read the storage of dict
+subclasses directly, bypassing the overridden ``keys()``, ``items()`` and
+``__iter__()``, so the declarations not yet built would be silently lost;
+there the declarations are always built at once. This is an internal
+attribute and IS **NOT a part of public API**"""
+
+_LazyArgumentDeclarations = None
+"""Class of lazy argument declarations, defined by `_lazy_declarations_type()`
+when first needed. This is an internal attribute and IS **NOT a part of
+public API**"""
+
+def _lazy_declarations_type():
+    """Return the `_LazyArgumentDeclarations` class. The class derives from
+    `SConsArguments._ArgumentDeclarations`, so it's defined when first used,
+    not when this module is imported. This is an internal function and IS
+    **NOT a part of public API**."""
+    global _LazyArgumentDeclarations
+    if _LazyArgumentDeclarations is not None:
+        return _LazyArgumentDeclarations
+    import SConsArguments
+    class _LazyArgumentDeclarations(SConsArguments._ArgumentDeclarations):
+        """Argument declarations built on demand.
+
+        The object behaves as `SConsArguments._ArgumentDeclarations`, but it
+        keeps the triples of not yet used arguments aside and converts a triple
+        into an actual declaration when the argument is accessed for the first
+        time. All the remaining declarations are built just before ``Commit()``.
+
+        The class is defined by `_lazy_declarations_type()`. This is an
+        internal class and IS **NOT a part of public API**.
+        """
+        def __init__(self, triples, callback):
+            """Initialize the object.
+
+            :Parameters:
+                triples : list
+                    the triples ``(name, desc, default)`` of the arguments to be
+                    declared,
+                callback : callable
+                    function of type ``callback(name, desc, default) -> (name,
+                    decl)`` used to create declaration dict ``decl`` from triple.
+            """
+            self.__pending = collections.OrderedDict()
+            self.__callback = callback
+            super(_LazyArgumentDeclarations, self).__init__()
+            self.__pending.update((t[0], t) for t in triples)
+
+        def __build(self, name):
+            triple = self.__pending.pop(name)
+            pair = self.__callback(*triple)
+            super(_LazyArgumentDeclarations, self).update([pair])
+
+        def __build_all(self):
+            while self.__pending:
+                self.__build(next(iter(self.__pending)))
+
+        def is_built(self, name):
+            """Return ``True`` if declaration of argument `name` is already
+            built (or the argument is not declared at all)."""
+            return name not in self.__pending
+
+        def __getitem__(self, name):
+            if name in self.__pending:
+                self.__build(name)
+            return super(_LazyArgumentDeclarations, self).__getitem__(name)
+
+        def __setitem__(self, name, decl):
+            self.__pending.pop(name, None)
+            super(_LazyArgumentDeclarations, self).__setitem__(name, decl)
+
+        def __delitem__(self, name):
+            if self.__pending.pop(name, None) is None:
+                super(_LazyArgumentDeclarations, self).__delitem__(name)
+
+        def __contains__(self, name):
+            return name in self.__pending or super(_LazyArgumentDeclarations, self).__contains__(name)
+
+        def __len__(self):
+            return len(self.__pending) + super(_LazyArgumentDeclarations, self).__len__()
+
+        def __iter__(self):
+            self.__build_all()
+            return super(_LazyArgumentDeclarations, self).__iter__()
+
+        def get(self, name, default = None):
+            if name in self:
+                return self[name]
+            return default
+
+        def pop(self, name, *args):
+            if name in self.__pending:
+                self.__build(name)
+            return super(_LazyArgumentDeclarations, self).pop(name, *args)
+
+        def setdefault(self, name, *args):
+            if name in self.__pending:
+                self.__build(name)
+            return super(_LazyArgumentDeclarations, self).setdefault(name, *args)
+
+        def update(self, *args, **kw):
+            self.__build_all()
+            return super(_LazyArgumentDeclarations, self).update(*args, **kw)
+
+        def keys(self):
+            self.__build_all()
+            return super(_LazyArgumentDeclarations, self).keys()
+
+        def values(self):
+            self.__build_all()
+            return super(_LazyArgumentDeclarations, self).values()
+
+        def items(self):
+            self.__build_all()
+            return super(_LazyArgumentDeclarations, self).items()
+
+        def iterkeys(self):
+            self.__build_all()
+            return super(_LazyArgumentDeclarations, self).iterkeys()
+
+        def itervalues(self):
+            self.__build_all()
+            return super(_LazyArgumentDeclarations, self).itervalues()
+
+        def iteritems(self):
+            self.__build_all()
+            return super(_LazyArgumentDeclarations, self).iteritems()
+
+        def copy(self):
+            self.__build_all()
+            return SConsArguments.DeclareArguments(super(_LazyArgumentDeclarations, self).items())
+
+        def Commit(self, *args, **kw):
+            """Build all the pending declarations and commit them. See
+            `SConsArguments._ArgumentDeclarations.Commit()`."""
+            self.__build_all()
+            return super(_LazyArgumentDeclarations, self).Commit(*args, **kw)
+    return _LazyArgumentDeclarations
+
+###############################################################################
+class _DeclarationsCache(object):
+    """Least-recently-used cache for argument declarations.
+
+    Maps keys (see `_fingerprint_kw()`) onto tuples of ``(name, decl)`` pairs
+    produced by `_declaration_pairs()`. When the cache grows above `maxsize`
+    entries, the least recently used entry is discarded.
+
+    This is an internal class and IS **NOT a part of public API**.
+    """
+    def __init__(self, maxsize = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, key):
+        """Return value cached under `key` or ``None``; the entry becomes the
+        most recently used one."""
+        try:
+            value = self.__entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        self.__entries[key] = value
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store `value` under `key`, evict least recently used entries if
+        necessary."""
+        self.__entries.pop(key, None)
+        self.__entries[key] = value
+        while len(self.__entries) > self.maxsize:
+            self.__entries.popitem(last = False)
+
+    def clear(self):
+        """Remove all entries and reset statistics."""
+        self.__entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+_declarations_cache = None
+"""The cache used by `arguments_from_triples()`, ``None`` if memoization is
+disabled. This is an internal attribute and IS **NOT a part of public API**"""
+
+###############################################################################
+def _fingerprint(obj):
+    """Return a hashable, canonical representation of `obj`. Dicts, lists,
+    tuples and sets are converted recursivelly, other objects must be
+    hashable, otherwise `TypeError` is raised. This is an internal function
+    and IS **NOT a part of public API**."""
+    if isinstance(obj, dict):
+        items = [(k, _fingerprint(v)) for (k, v) in obj.items()]
+        return (dict, tuple(sorted(items, key = lambda i : repr(i[0]))))
+    elif isinstance(obj, (list, tuple)):
+        return (tuple, tuple(_fingerprint(x) for x in obj))
+    elif isinstance(obj, (set, frozenset)):
+        return (frozenset, frozenset(_fingerprint(x) for x in obj))
+    hash(obj)
+    return obj
+
+###############################################################################
+def _fingerprint_kw(kw):
+    """Return a canonical fingerprint of keyword arguments accepted by
+    `arguments_from_triples()`. A collection of names given as ``name_filter``
+    is order-insensitive. Raises `TypeError` if some of the arguments are not
+    hashable. This is an internal function and IS **NOT a part of public
+    API**."""
+    kw = dict(kw)
+    if _is_name_collection(kw.get('name_filter')):
+        kw['name_filter'] = frozenset(kw['name_filter'])
+    return _fingerprint(kw)
+
+###############################################################################
+def enable_declarations_cache(maxsize = 128):
+    """Enable memoization of argument declarations.
+
+    When enabled, `arguments_from_triples()` (and thus ``Declarations()``
+    functions of `SConsGnuArguments.InstallDirs` and
+    `SConsGnuArguments.AltPrograms`) remembers results computed for given
+    keyword arguments. Each call still returns new, independent
+    `SConsArguments._ArgumentDeclarations` object, so modifying the returned
+    declarations does not affect other results. Note, that callable filters
+    are compared by identity, so a lambda created anew in each call never
+    hits the cache.
+
+    :Parameters:
+        maxsize : int
+            maximum number of entries in cache; least recently used entries
+            are discarded first.
+    """
+    global _declarations_cache
+    if _declarations_cache is None:
+        _declarations_cache = _DeclarationsCache(maxsize)
+    else:
+        _declarations_cache.maxsize = maxsize
+
+###############################################################################
+def disable_declarations_cache():
+    """Disable memoization of argument declarations and drop the cache."""
+    global _declarations_cache
+    _declarations_cache = None
+
+###############################################################################
+_reference_re = re.compile(r'\$\$|\$\{(?P<braced>[A-Za-z_]\w*)\}|\$(?P<bare>[A-Za-z_]\w*)')
+"""Matches ``$$``, ``${name}`` and ``$name``. This is an internal attribute
+and IS **NOT a part of public API**"""
+
+###############################################################################
+def references(value):
+    """Return the list of variable names referenced by `value`.
+
+    Both ``${name}`` and ``$name`` forms are recognized, the escaped dollar
+    ``$$`` is skipped. Non-string values have no references.
+
+    :Parameters:
+        value
+            the value to be scanned, typically the default value of an
+            argument, e.g. ``'${datarootdir}/doc/${install_package}'``.
+    :Returns:
+        list of names in order of appearance, e.g.
+        ``['datarootdir', 'install_package']``
+    """
+    import SCons.Util
+    if not SCons.Util.is_String(value):
+        return []
+    refs = []
+    for m in _reference_re.finditer(value):
+        name = m.group('braced') or m.group('bare')
+        if name and name not in refs:
+            refs.append(name)
+    return refs
+
+###############################################################################
+def toposort(depends):
+    """Order keys of `depends` topologically.
+
+    :Parameters:
+        depends : list | dict
+            list of pairs (or dict) ``(key, deps)``, where ``deps`` lists keys
+            which ``key`` depends on; only the dependencies which are keys of
+            `depends` are taken into account.
+    :Returns:
+        list of keys such that every key comes after all its dependencies;
+        independent keys are kept in their original order
+    """
+    if isinstance(depends, dict):
+        depends = depends.items()
+    keys = [k for (k, _) in depends]
+    known = set(keys)
+    pending = {}
+    dependents = dict((k, []) for k in keys)
+    for (key, deps) in depends:
+        deps = set(d for d in deps if d in known)
+        pending[key] = len(deps)
+        for dep in deps:
+            dependents[dep].append(key)
+    ready = collections.deque(k for k in keys if not pending[k])
+    order = []
+    while ready:
+        key = ready.popleft()
+        order.append(key)
+        for dependent in dependents[key]:
+            pending[dependent] -= 1
+            if not pending[dependent]:
+                ready.append(dependent)
+    if len(order) < len(keys):
+        import SCons.Errors
+        cycle = sorted(k for k in keys if pending[k])
+        raise SCons.Errors.UserError('cyclic references between variables: %s' % ', '.join(cycle))
+    return order
+
+###############################################################################
+_space_sep = re.compile(r'[\t ]+(?![^{]*})')
+"""Whitespace compressed by ``env.subst()`` (same as in `SCons.Subst`). This
+is an internal attribute and IS **NOT a part of public API**"""
+
+###############################################################################
+def _inserted(match, values):
+    """Return the replacement of reference `match` (see `_reference_re`): the
+    string from `values` or the reference itself, if there is no string to
+    insert. References left in place are always braced, so that the inserted
+    text can't be glued with the text that follows. This is an internal
+    function and IS **NOT a part of public API**."""
+    name = match.group('braced') or match.group('bare')
+    if name is None:
+        # the escaped dollar $$
+        return match.group(0)
+    import SCons.Util
+    value = values.get(name)
+    if not SCons.Util.is_String(value):
+        # let subst() deal with anything else
+        return '${%s}' % name
+    return value
+
+###############################################################################
+class _Resolver(object):
+    """Resolves a set of interdependent variables in a single pass.
+
+    The references between variables are extracted once, the variables are
+    ordered topologically and then each variable is expanded exactly once,
+    with the already expanded values of the variables it refers to. Anything
+    that still contains ``$`` afterwards (references to variables outside of
+    the set, escapes, etc.) is passed to the ``subst`` function, typically
+    ``env.subst``. With ``subst``, the keys must be names of the construction
+    variables and the results are same as ``env.subst('${key}')``: the raw
+    texts of the referred variables are inserted (with their own references
+    already inlined), so every text is substituted once and the whitespace
+    is compressed once, and non-string values (e.g. lists) are left to
+    ``subst``.
+
+    The resolver remembers the dependencies and the values computed by last
+    `resolve()`, so after `update()` only the changed variables and their
+    transitive dependents are expanded again. The keys expanded by the most
+    recent `resolve()` or `update()` are listed in `recomputed`.
+
+    This is an internal class and IS **NOT a part of public API**.
+    """
+    def __init__(self, templates):
+        """Initialize the resolver.
+
+        :Parameters:
+            templates : list | dict
+                list of pairs (or dict) ``(key, value)``, where ``value`` is
+                the raw (not substituted) value of variable ``key``.
+        """
+        if isinstance(templates, dict):
+            templates = templates.items()
+        self.templates = collections.OrderedDict(templates)
+        self.values = None
+        self.recomputed = []
+        self.__subst = None
+        self.__texts = {}
+        self.__refs = dict((k, references(v)) for (k, v) in self.templates.items())
+        self.__build_graph()
+
+    def __build_graph(self):
+        templates = self.templates
+        self.depends = dict((k, [r for r in self.__refs[k] if r in templates]) for k in templates)
+        self.order = toposort([(k, self.depends[k]) for k in templates])
+
+    def _expand(self, key, values, subst):
+        import SCons.Util
+        template = self.templates[key]
+        if subst is None:
+            if not SCons.Util.is_String(template) or '$' not in template:
+                return template
+            return _reference_re.sub(lambda m : _inserted(m, values), template)
+        texts = self.__texts
+        if not SCons.Util.is_String(template):
+            # lists, numbers, None, ... are converted by subst() exactly as
+            # ${key} would be
+            texts[key] = None
+            return subst('${%s}' % key)
+        # insert the raw (inlined) texts, not the final values, so the escapes
+        # are unescaped and the whitespace is compressed only once, as it is
+        # done by subst() for nested references
+        text = _reference_re.sub(lambda m : _inserted(m, texts), template)
+        texts[key] = text
+        if '$' in text:
+            return subst(text)
+        # subst() returns strings without $ untouched, but ${key} would be
+        # normalized
+        return _space_sep.sub(' ', text).strip()
+
+    def resolve(self, subst = None):
+        """Expand all the variables.
+
+        :Parameters:
+            subst : callable
+                function of type ``subst(string) -> string`` used to expand
+                references which can't be resolved within the set.
+        :Returns:
+            a plain dict ``{key : value}`` with final values
+        """
+        values = {}
+        self.__texts = {}
+        for key in self.order:
+            values[key] = self._expand(key, values, subst)
+        self.values = values
+        self.recomputed = list(self.order)
+        self.__subst = subst
+        return dict(values)
+
+    def update(self, changes):
+        """Change raw values of some variables and re-expand only what's
+        affected.
+
+        A variable is expanded again if its raw value has changed or if the
+        final value of any variable it refers to has changed. The ``subst``
+        function given to the last `resolve()` is reused. Note, that changes
+        of variables outside of the set are not tracked.
+
+        :Parameters:
+            changes : list | dict
+                list of pairs (or dict) ``(key, value)`` with new raw values.
+        :Returns:
+            the list of keys that were expanded again, in expansion order
+        """
+        if isinstance(changes, dict):
+            changes = changes.items()
+        changes = collections.OrderedDict(changes)
+        if self.values is None:
+            self.templates.update(changes)
+            self.__refs.update((k, references(v)) for (k, v) in changes.items())
+            self.__build_graph()
+            self.resolve()
+            return self.recomputed
+        grow = any(k not in self.templates for k in changes)
+        rewire = grow
+        for (key, value) in changes.items():
+            refs = references(value)
+            if refs != self.__refs.get(key):
+                self.__refs[key] = refs
+                rewire = True
+            self.templates[key] = value
+        if rewire:
+            self.__build_graph()
+        values = self.values
+        changed = set()
+        recomputed = []
+        for key in self.order:
+            if key in changes or any(d in changed for d in self.depends[key]):
+                text = self.__texts.get(key)
+                value = self._expand(key, values, self.__subst)
+                recomputed.append(key)
+                if key not in values or values[key] != value or self.__texts.get(key) != text:
+                    values[key] = value
+                    changed.add(key)
+        self.recomputed = recomputed
+        return recomputed
+
+###############################################################################
+def resolve_triples(triples, env, **kw):
+    """Resolve final values of arguments in a single pass.
+
+    Raw values of construction variables corresponding to the arguments are
+    read from `env`, ordered topologically by their mutual references and
+    expanded once each. This is equivalent to calling
+    ``env.subst('${name}')`` for every argument, but the chains of
+    references (e.g. ``prefix -> exec_prefix -> libdir -> pkglibdir``) are
+    walked only once.
+
+    :Parameters:
+        triples : list | `_ArgumentRegistry`
+            the argument triples ``(name, desc, default)``,
+        env
+            SCons environment with arguments already committed and
+            postprocessed.
+    :Keywords:
+        name_filter : callable | list | tuple | set | frozenset
+            selects the arguments to be resolved,
+        nameconv : `SConsArguments._ArgumentNameConv`
+            a name convention used to map argument names onto construction
+            variables; other keywords are passed to
+            `SConsArguments._ArgumentNameConv.__init__()` as in
+            `arguments_from_triples()`,
+        cache_file : str | boolean
+            if given, the resolved values are stored in this file and reused
+            by subsequent runs as long as the inputs don't change; ``True``
+            selects ``.sconsign-gnu-arguments.json`` in the top-level
+            directory,
+        arguments : dict
+            command-line variables taken into account when validating cached
+            values (default: SCons ``ARGUMENTS``),
+        environ : list
+            names of OS environment variables taken into account when
+            validating cached values.
+
+    The cached values are keyed by a hash of the command-line variables, the
+    listed OS environment variables, the selected arguments and the raw
+    (unsubstituted) values of their construction variables together with
+    everything they refer to. Any mismatch discards the cached entry.
+
+    :Returns:
+        a plain dict ``{name : value}``; arguments not present in `env` are
+        omitted
+    """
+    cache_file = kw.pop('cache_file', None)
+    arguments = kw.pop('arguments', None)
+    environ = kw.pop('environ', ())
+    if not cache_file:
+        return dict(_resolver_from_triples(triples, env, kw).resolve_names(env.subst))
+    if cache_file is True:
+        cache_file = env.File('#' + _default_cache_file).abspath
+    if arguments is None:
+        arguments = _command_line_arguments()
+    keys = _keys_from_triples(triples, env, kw)
+    slot = _digest(keys)
+    digest = _digest([keys, _raw_closure(keys, env), sorted(arguments.items()),
+                      [(n, os.environ.get(n)) for n in environ]])
+    store = _JsonStore.open(cache_file)
+    entry = store.get(slot)
+    if entry is not None and entry.get('digest') == digest:
+        return dict(entry['values'])
+    values = dict(_NamedResolver(keys, [(k, env[k]) for (_, k) in keys]).resolve_names(env.subst))
+    try:
+        store.put(slot, { 'digest' : digest, 'values' : values })
+    except TypeError:
+        # some values can't be stored as JSON, don't cache them
+        pass
+    return values
+
+###############################################################################
+def dir_nodes_from_triples(triples, env, name = None, **kw):
+    """Return SCons ``Dir`` nodes for the final values of the arguments.
+
+    The nodes are cached per environment (and per registry and keyword
+    arguments; plain lists of triples are not cached). A
+    cached result is returned as long as the raw values of the construction
+    variables involved (including everything they refer to) and the current
+    directory of SCons file system are unchanged; otherwise the values are
+    resolved again (see `resolve_triples()`) and new nodes are looked up.
+
+    :Parameters:
+        triples
+            argument triples (or `_ArgumentRegistry`),
+        env
+            SCons environment with the arguments committed,
+        name : str
+            if given, only the node of this argument is returned (without
+            copying the whole dict); `KeyError` is raised if there is no
+            such argument in `env`.
+    :Keywords:
+        name_filter, nameconv, env_key_prefix, ...
+            as in `resolve_triples()`.
+    :Returns:
+        dict ``{name : node}``; arguments not present in `env` are omitted
+    """
+    entry = _cached_resolution(triples, env, kw)
+    cwd = env.fs.getcwd()
+    if entry['nodes'] is None or entry['cwd'] != cwd:
+        values = entry['resolver'].as_dict()
+        entry['nodes'] = dict((n, env.Dir(v)) for (n, v) in values.items())
+        entry['cwd'] = cwd
+    if name is not None:
+        return entry['nodes'][name]
+    return dict(entry['nodes'])
+
+###############################################################################
+def staged_from_triples(triples, env, destdir, **kw):
+    """Return the final values of directory arguments re-rooted under
+    `destdir` (see `stage_values()`).
+
+    The values are resolved once and cached per environment, as in
+    `dir_nodes_from_triples()`, and the staged paths are computed once per
+    resolution and `destdir`.
+
+    :Parameters:
+        triples
+            argument triples (or `_ArgumentRegistry`),
+        env
+            SCons environment with the arguments committed,
+        destdir : str
+            the staging directory.
+    :Keywords:
+        name_filter, nameconv, env_key_prefix, ...
+            as in `resolve_triples()`.
+    :Returns:
+        dict ``{name : staged_value}``
+    """
+    return _cached_resolution(triples, env, kw)['resolver'].staged(destdir)
+
+###############################################################################
+def _cached_resolution(triples, env, kw):
+    """Return cache entry (a dict) with resolved `_NamedResolver` for the
+    arguments `triples` found in `env` under ``'resolver'``. The entries are
+    kept per environment (and per registry and keyword arguments; plain
+    lists of triples are not cached) and the values are resolved again only
+    if the raw values of the construction variables involved (including
+    everything they refer to) have changed. This is an internal function and
+    IS **NOT a part of public API**."""
+    slot = None
+    if isinstance(triples, _ArgumentRegistry):
+        try:
+            slot = (triples, triples.generation, _fingerprint_kw(kw) if kw else ())
+        except TypeError:
+            pass
+    cache = _env_cache(env) if slot is not None else {}
+    entry = cache.get(slot)
+    if entry is None:
+        entry = cache[slot] = { 'keys' : _keys_from_triples(triples, None, kw),
+                                'closure' : (), 'raw' : None, 'reprs' : (),
+                                'resolver' : None, 'nodes' : None, 'cwd' : None }
+    get = env.get
+    raw = tuple(get(k, _absent) for k in entry['closure'])
+    if raw != entry['raw'] or any(_stable_repr(get(k)) != r for (k, r) in entry['reprs']):
+        import SCons.Util
+        keys = [(n, k) for (n, k) in entry['keys'] if k in env]
+        closure = _closure_keys([k for (_, k) in entry['keys']], env)
+        raw = tuple(get(k, _absent) for k in closure)
+        resolver = _NamedResolver(keys, [(k, env[k]) for (_, k) in keys], triples)
+        resolver.resolve_names(env.subst)
+        entry['resolver'] = resolver
+        entry['closure'] = closure
+        entry['raw'] = raw
+        # values other than strings may be modified in place, so these are
+        # compared by their representations
+        entry['reprs'] = tuple((k, _stable_repr(v)) for (k, v) in zip(closure, raw)
+                               if v is not _absent and not SCons.Util.is_String(v))
+        entry['nodes'] = None
+    return entry
+
+###############################################################################
+_absent = object()
+"""Marks construction variables missing in environment, see
+`_cached_resolution()`. This is an internal attribute and IS **NOT a part of
+public API**"""
+
+###############################################################################
+_env_caches = {}
+"""Per-environment caches, see `_env_cache()`. This is an internal attribute
+and IS **NOT a part of public API**"""
+
+def _env_cache(env):
+    """Return a dict private to SCons environment `env`. SCons environments
+    are not hashable, so the dicts are keyed by ``id(env)`` and dropped when
+    the environment is garbage-collected. This is an internal function and
+    IS **NOT a part of public API**."""
+    ident = id(env)
+    item = _env_caches.get(ident)
+    if item is not None and item[0]() is env:
+        return item[1]
+    def drop(ref):
+        if _env_caches.get(ident, (None,))[0] is ref:
+            del _env_caches[ident]
+    import weakref
+    item = _env_caches[ident] = (weakref.ref(env, drop), {})
+    return item[1]
+
+###############################################################################
+def stage_values(values, destdir, triples = None):
+    """Re-root directory values under `destdir` (``DESTDIR`` staging).
+
+    The staged path is ``destdir + value``, as in ``$(DESTDIR)$(bindir)`` of
+    GNU makefiles (on Windows the drive of ``value`` is dropped). Only the
+    variables of category ``'prefix'`` or ``'dir'`` are staged.
+
+    :Parameters:
+        values : dict
+            ``{name : value}``, as returned by `resolve_triples()`,
+        destdir : str
+            the staging directory; if empty, values are returned unchanged,
+        triples
+            argument triples (or `_ArgumentRegistry`) used to determine
+            categories of the arguments; if ``None``, categories are
+            guessed from names.
+    :Returns:
+        dict ``{name : staged_value}`` for directory variables found in
+        `values`
+    """
+    if isinstance(triples, _ArgumentRegistry):
+        def category(name):
+            spec = triples.get(name)
+            return spec.category if spec is not None else _guess_category(name)
+    else:
+        category = _guess_category
+    import SCons.Util
+    staged = {}
+    splitdrive = os.path.splitdrive
+    for (name, value) in values.items():
+        if category(name) in ('prefix', 'dir') and SCons.Util.is_String(value):
+            staged[name] = destdir + splitdrive(value)[1] if destdir else value
+    return staged
+
+###############################################################################
+def resolver_from_triples(triples, env, **kw):
+    """Same as `resolve_triples()`, but returns the resolver object, which
+    tracks dependencies between arguments and may be used to re-resolve
+    the values incrementally.
+
+    :Returns:
+        a resolved `_NamedResolver`; use ``resolver[name]`` or
+        ``resolver.as_dict()`` to read the values and
+        ``resolver.update_names({name : raw_value})`` to change some of them
+    """
+    resolver = _resolver_from_triples(triples, env, kw)
+    resolver.resolve_names(env.subst)
+    return resolver
+
+###############################################################################
+def _resolver_from_triples(triples, env, kw):
+    """Create `_NamedResolver` for arguments described by `triples` and the
+    construction variables found in `env`. This is an internal function and
+    IS **NOT a part of public API**."""
+    keys = _keys_from_triples(triples, env, kw)
+    return _NamedResolver(keys, [(k, env[k]) for (_, k) in keys], triples)
+
+###############################################################################
+def _keys_from_triples(triples, env, kw):
+    """Return list of pairs ``(name, key)``, where ``name`` is an argument
+    name and ``key`` is the name of corresponding construction variable
+    present in `env` (all of them, if `env` is ``None``). This is an
+    internal function and IS **NOT a part of public API**."""
+    name_filter = kw.get('name_filter', lambda s : True)
+    names = list(names_from_triples(triples, name_filter))
+    endpoints = _endpoint_table(kw).batch(names)
+    keys = []
+    for name in names:
+        key = endpoints[name].get('env_key')
+        if key is not None and (env is None or key in env):
+            keys.append((name, key))
+    return keys
+
+###############################################################################
+_default_cache_file = '.sconsign-gnu-arguments.json'
+"""Default name of the persistent cache file, relative to the top-level
+directory. This is an internal attribute and IS **NOT a part of public API**"""
+
+###############################################################################
+def _command_line_arguments():
+    """Return SCons command-line variables (``ARGUMENTS``) or an empty dict
+    outside of SCons. This is an internal function and IS **NOT a part of
+    public API**."""
+    try:
+        import SCons.Script
+        return SCons.Script.ARGUMENTS
+    except (ImportError, AttributeError):
+        return {}
+
+###############################################################################
+def _raw_closure(keys, env):
+    """Return sorted list of ``(key, raw_value)`` for construction variables
+    listed in `keys` and all the variables they (transitivelly) refer to.
+    No substitution is performed. This is an internal function and IS **NOT
+    a part of public API**."""
+    closure = _closure_keys([k for (_, k) in keys], env)
+    return sorted((key, _stable_repr(env.get(key))) for key in closure)
+
+###############################################################################
+def _closure_keys(keys, env):
+    """Return tuple of construction variable names: `keys` and all the
+    variables they (transitivelly) refer to in `env`. This is an internal
+    function and IS **NOT a part of public API**."""
+    seen = set()
+    stack = list(keys)
+    closure = []
+    while stack:
+        key = stack.pop()
+        if key in seen:
+            continue
+        seen.add(key)
+        closure.append(key)
+        stack.extend(_cached_references(env.get(key)))
+    return tuple(closure)
+
+###############################################################################
+_references_cache = {}
+"""Memoized results of `references()`, see `_cached_references()`. This is
+an internal attribute and IS **NOT a part of public API**"""
+
+def _cached_references(value):
+    """Same as `references()`, but the results are memoized per raw string
+    (the cache is dropped when it grows above 4096 entries). The returned
+    list must not be modified. This is an internal function and IS **NOT a
+    part of public API**."""
+    try:
+        return _references_cache[value]
+    except KeyError:
+        if len(_references_cache) >= 4096:
+            _references_cache.clear()
+        refs = _references_cache[value] = references(value)
+        return refs
+    except TypeError:
+        # unhashable, e.g. a list
+        return references(value)
+
+###############################################################################
+def _stable_repr(obj):
+    """Return a representation of `obj` which does not change between
+    processes (no object addresses). This is an internal function and IS
+    **NOT a part of public API**."""
+    import SCons.Util
+    if obj is None or isinstance(obj, (bool, int, float)) or SCons.Util.is_String(obj):
+        return repr(obj)
+    elif isinstance(obj, (list, tuple)):
+        return '[%s]' % ', '.join(_stable_repr(x) for x in obj)
+    elif isinstance(obj, dict):
+        return '{%s}' % ', '.join(sorted('%s: %s' % (_stable_repr(k), _stable_repr(v)) for (k, v) in obj.items()))
+    elif isinstance(obj, (set, frozenset)):
+        return '{%s}' % ', '.join(sorted(_stable_repr(x) for x in obj))
+    return '<%s>' % type(obj).__name__
+
+###############################################################################
+def _digest(obj):
+    """Return hex digest of `obj`'s stable representation. This is an
+    internal function and IS **NOT a part of public API**."""
+    import hashlib
+    return hashlib.sha1(_stable_repr(obj).encode('utf-8')).hexdigest()
+
+###############################################################################
+class _JsonStore(object):
+    """Persistent dictionary stored as a JSON file.
+
+    The file is read on first access and rewritten (atomically) on every
+    `put()`. A broken or unreadable file is treated as empty. Stores are
+    shared within the process, use `_JsonStore.open()` to get one.
+
+    This is an internal class and IS **NOT a part of public API**.
+    """
+    _stores = {}
+
+    @classmethod
+    def open(cls, path):
+        """Return the store for file `path`."""
+        path = os.path.abspath(path)
+        try:
+            return cls._stores[path]
+        except KeyError:
+            store = cls._stores[path] = cls(path)
+            return store
+
+    def __init__(self, path):
+        self.path = path
+        self.__data = None
+
+    def __load(self):
+        if self.__data is None:
+            import json
+            try:
+                with open(self.path) as f:
+                    data = json.load(f, object_hook = _native_strings)
+                if not isinstance(data, dict):
+                    data = {}
+            except (IOError, OSError, ValueError):
+                data = {}
+            self.__data = data
+        return self.__data
+
+    def get(self, slot, default = None):
+        """Return entry stored under `slot`."""
+        return self.__load().get(slot, default)
+
+    def put(self, slot, value):
+        """Store `value` under `slot` and write the file. Raises `TypeError`
+        if the value can't be represented in JSON."""
+        import json
+        text = json.dumps(value)
+        data = self.__load()
+        data[slot] = json.loads(text, object_hook = _native_strings)
+        self.save()
+
+    def update(self, entries):
+        """Store all ``(slot, value)`` pairs from `entries` and write the file
+        once. Raises `TypeError` if a value can't be represented in JSON, in
+        which case nothing is stored."""
+        import json
+        items = [(slot, json.loads(json.dumps(value), object_hook = _native_strings))
+                 for (slot, value) in entries]
+        if items:
+            self.__load().update(items)
+            self.save()
+
+    def remove(self, slot):
+        """Remove entry stored under `slot` (if any) and write the file."""
+        if self.__load().pop(slot, None) is not None:
+            self.save()
+
+    def save(self):
+        """Write the file."""
+        data = self.__load()
+        dirname = os.path.dirname(self.path)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        import json
+        tmp = '%s.%d.tmp' % (self.path, os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump(data, f, sort_keys = True)
+        try:
+            os.rename(tmp, self.path)
+        except OSError:
+            # os.rename() doesn't replace existing files on Windows
+            os.remove(self.path)
+            os.rename(tmp, self.path)
+
+###############################################################################
+def _native_strings(obj):
+    """JSON object hook which converts unicode strings to native strings on
+    python 2. This is an internal function and IS **NOT a part of public
+    API**."""
+    if str is bytes:
+        def conv(x):
+            if isinstance(x, unicode):
+                return x.encode('utf-8')
+            elif isinstance(x, list):
+                return [conv(y) for y in x]
+            return x
+        return dict((conv(k), conv(v)) for (k, v) in obj.items())
+    return obj
+
+###############################################################################
+class _NamedResolver(_Resolver):
+    """`_Resolver` which knows the mapping between argument names and
+    construction variables. This is an internal class and IS **NOT a part of
+    public API**."""
+    def __init__(self, keys, templates, triples = None):
+        super(_NamedResolver, self).__init__(templates)
+        self.keys = keys
+        self.triples = triples
+        self.__key_of = dict(keys)
+        self.__name_of = dict((k, n) for (n, k) in keys)
+        self.__staged = {}
+
+    def resolve(self, subst = None):
+        self.__staged.clear()
+        return super(_NamedResolver, self).resolve(subst)
+
+    def update(self, changes):
+        recomputed = super(_NamedResolver, self).update(changes)
+        self.__staged.clear()
+        return recomputed
+
+    def __getitem__(self, name):
+        """Return final value of argument `name`."""
+        return self.values[self.__key_of[name]]
+
+    def resolve_names(self, subst = None):
+        """Same as `resolve()`, but returns list of pairs ``(name, value)``
+        where ``name`` is an argument name."""
+        values = self.resolve(subst)
+        return [(name, values[key]) for (name, key) in self.keys]
+
+    def as_dict(self):
+        """Return a plain dict ``{name : value}`` with current values."""
+        return dict((name, self.values[key]) for (name, key) in self.keys)
+
+    def staged(self, destdir):
+        """Return ``{name : staged_value}`` with current values of directory
+        arguments re-rooted under `destdir`, see `stage_values()`. The
+        staged paths are computed once per `destdir` and are discarded when
+        the values change."""
+        try:
+            staged = self.__staged[destdir]
+        except KeyError:
+            staged = self.__staged[destdir] = stage_values(self.as_dict(), destdir, self.triples)
+        return dict(staged)
+
+    def update_names(self, changes):
+        """Same as `update()`, but `changes` and the returned list use
+        argument names instead of construction variable names."""
+        if isinstance(changes, dict):
+            changes = changes.items()
+        self.update([(self.__key_of[n], v) for (n, v) in changes])
+        return self.recomputed_names
+
+    @property
+    def recomputed_names(self):
+        """Names of arguments expanded by the most recent `resolve_names()`
+        or `update_names()`."""
+        return [self.__name_of[k] for k in self.recomputed if k in self.__name_of]
+
+###############################################################################
+def thread_map(func, items, jobs = None):
+    """Call `func` for each of `items` using a pool of threads.
+
+    :Parameters:
+        func : callable
+            function of type ``func(item) -> result``; it should be I/O bound
+            (stat, subprocess, etc.) to benefit from threads,
+        items : list
+            the items to be processed,
+        jobs : int
+            maximum number of worker threads (default: ``8``).
+    :Returns:
+        list of results, in the order of `items`; if `func` raised for any
+        item, the first such exception is re-raised after all workers finish
+    """
+    items = list(items)
+    if jobs is None:
+        jobs = 8
+    jobs = max(1, min(jobs, len(items)))
+    if jobs <= 1:
+        return [func(item) for item in items]
+    import threading
+    try:
+        import queue as _queue
+    except ImportError:
+        # python 2
+        import Queue as _queue
+    results = [None] * len(items)
+    errors = []
+    queue = _queue.Queue()
+    for i in range(len(items)):
+        queue.put(i)
+    def worker():
+        while True:
+            try:
+                i = queue.get_nowait()
+            except _queue.Empty:
+                return
+            try:
+                results[i] = func(items[i])
+            except Exception:
+                errors.append((i, sys.exc_info()))
+    threads = [threading.Thread(target = worker) for _ in range(jobs)]
+    for t in threads:
+        t.daemon = True
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        (_, (etype, evalue, etb)) = min(errors, key = lambda e : e[0])
+        raise evalue
+    return results
+
+###############################################################################
+_schema_version = 2
+"""Version of the frozen schema layout, see `schema_source()`. This is an
+internal attribute and IS **NOT a part of public API**"""
+
+_schema_module = None
+"""The imported ``SConsGnuArguments._schema`` module, ``False`` if it's not
+available. This is an internal attribute and IS **NOT a part of public
+API**"""
+
+###############################################################################
+def schema_digest(*tables):
+    """Return digest of argument `tables` as seen by the frozen schema.
+
+    The digest changes whenever any of the tables (their names, help strings
+    or default values) changes, or the layout of the schema module changes.
+
+    :Parameters:
+        tables
+            argument triples (or other data the frozen declarations are
+            computed from).
+    :Returns:
+        hex digest string
+    """
+    def fields(item):
+        if isinstance(item, ArgumentSpec):
+            return [item.name, item.help, item.default, item.category, item.metavar]
+        return item
+    return _digest([_schema_version] + [[fields(x) for x in t] for t in tables])
+
+###############################################################################
+_schema_sample = 'schema_sample'
+"""Argument name, whose endpoints are included in `_scons_arguments_digest()`.
+This is an internal attribute and IS **NOT a part of public API**"""
+
+_scons_arguments_digests = {}
+"""Results of `_scons_arguments_digest()` indexed by fingerprint of the
+keywords. This is an internal attribute and IS **NOT a part of public API**"""
+
+def _scons_arguments_digest(kw):
+    """Return digest of SConsArguments version and of the endpoints (see
+    `endpoint_names()`) it computes for a sample argument with keywords `kw`.
+    The frozen declarations are used only with SConsArguments having the
+    same digest. This is an internal function and IS **NOT a part of public
+    API**."""
+    try:
+        key = _fingerprint(kw)
+    except TypeError:
+        # some of the keywords are not hashable
+        key = None
+    digest = _scons_arguments_digests.get(key) if key is not None else None
+    if digest is None:
+        import SConsArguments
+        endpoints = _endpoint_table(dict(kw)).get(_schema_sample)
+        digest = _digest([getattr(SConsArguments, '__version__', None), endpoints])
+        if key is not None:
+            _scons_arguments_digests[key] = digest
+    return digest
+
+###############################################################################
+def schema_table(triples, digest, kw):
+    """Compute a frozen schema table for `triples`.
+
+    :Parameters:
+        triples
+            argument triples (or `_ArgumentRegistry`),
+        digest : str
+            digest of the source tables, see `schema_digest()`,
+        kw : dict
+            keywords of `arguments_from_triples()` the declarations are
+            computed with.
+    :Returns:
+        dict with ``'digest'``, ``'kw'``, ``'scons_arguments'`` (digest of
+        SConsArguments the declarations are computed by) and
+        ``'declarations'`` (list of ``(name, decl)`` pairs).
+    """
+    pairs = list(_declaration_pairs(triples, dict(kw)))
+    return { 'digest' : digest, 'kw' : dict(kw), 'scons_arguments' : _scons_arguments_digest(kw),
+             'declarations' : pairs }
+
+###############################################################################
+def _schema_repr(obj):
+    """Return python source representing `obj` in the schema module. This is
+    an internal function and IS **NOT a part of public API**."""
+    import SConsArguments
+    import SCons.Util
+    if obj is SConsArguments.UNDEFINED:
+        return 'UNDEFINED'
+    elif isinstance(obj, dict):
+        return '{%s}' % ', '.join('%s : %s' % (repr(k), _schema_repr(obj[k])) for k in sorted(obj))
+    elif isinstance(obj, list):
+        return '[%s]' % ', '.join(_schema_repr(x) for x in obj)
+    elif isinstance(obj, tuple):
+        items = [_schema_repr(x) for x in obj]
+        return '(%s)' % (', '.join(items) if len(items) != 1 else items[0] + ',')
+    elif obj is None or isinstance(obj, (bool, int, float)) or SCons.Util.is_String(obj):
+        return repr(obj)
+    raise TypeError('%r can not be written to the schema module' % obj)
+
+###############################################################################
+def schema_source(tables):
+    """Return source code of the frozen schema module.
+
+    :Parameters:
+        tables : dict
+            tables computed by `schema_table()`, keyed by the name of module
+            they come from (e.g. ``'InstallDirs'``).
+    :Returns:
+        string with python source code
+    """
+    lines = ['"""Frozen argument declarations.',
+             '',
+             'Generated by ``bin/gen_schema.py``, do not edit.',
+             '"""',
+             '',
+             'from SConsArguments import UNDEFINED',
+             '',
+             'VERSION = %d' % _schema_version,
+             '',
+             'TABLES = {']
+    for name in sorted(tables):
+        table = tables[name]
+        lines.append('    %r : {' % name)
+        lines.append('        %r : %r,' % ('digest', str(table['digest'])))
+        lines.append('        %r : %s,' % ('kw', _schema_repr(table['kw'])))
+        lines.append('        %r : %r,' % ('scons_arguments', str(table['scons_arguments'])))
+        lines.append('        %r : [' % 'declarations')
+        for pair in table['declarations']:
+            lines.append('            %s,' % _schema_repr(tuple(pair)))
+        lines.append('        ],')
+        lines.append('    },')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+###############################################################################
+def _load_schema():
+    """Return the frozen schema module or ``None`` if it's not generated or
+    is incompatible. This is an internal function and IS **NOT a part of
+    public API**."""
+    global _schema_module
+    if _schema_module is None:
+        try:
+            from SConsGnuArguments import _schema as module
+        except ImportError:
+            module = False
+        if getattr(module, 'VERSION', None) != _schema_version:
+            module = False
+        _schema_module = module
+    return _schema_module or None
+
+###############################################################################
+def frozen_table(name, digest, kw):
+    """Return frozen schema table `name` or ``None``.
+
+    The table is returned only if the schema module exists and the table was
+    generated from the same source tables (`digest`) with same keywords `kw`
+    and with the same SConsArguments (same version, same endpoint names).
+
+    :Parameters:
+        name : str
+            name of the table, e.g. ``'InstallDirs'``,
+        digest : str
+            current digest of the source tables, see `schema_digest()`,
+        kw : dict
+            keywords the declarations are requested with.
+    :Returns:
+        the table (see `schema_table()`) or ``None``
+    """
+    schema = _load_schema()
+    if schema is None:
+        return None
+    table = schema.TABLES.get(name)
+    if table is None or table['digest'] != digest or table['kw'] != kw:
+        return None
+    if table['scons_arguments'] != _scons_arguments_digest(kw):
+        return None
+    return table
+
+###############################################################################
+def frozen_declarations(name, digest, kw):
+    """Return declarations from frozen schema table `name` or ``None``, see
+    `frozen_table()`.
+
+    :Returns:
+        an instance of `SConsArguments._ArgumentDeclarations` or ``None``
+    """
+    table = frozen_table(name, digest, kw)
+    if table is None:
+        return None
+    import SConsArguments
+    # The frozen dicts are never handed out, the caller may modify its copies.
+    return SConsArguments.DeclareArguments([(n, dict(d)) for (n, d) in table['declarations']])
@@ -10,6 +10,10 @@ more predefined *arguments*
     - `SConsGnuArguments.AltPrograms` - GNU alternative programs, i.e.
       ``$AWK``, ``$GREP``, and such.
 
+The `SConsGnuArguments.Install` submodule installs files into the
+`SConsGnuArguments.InstallDirs` destinations without spawning external
+``install`` processes.
+
 Each module provides at least two functions:
 
     - ``Names()``, to list names of SCons *arguments* being provided by module,
@@ -25,6 +29,10 @@ The typical usage pattern is (taking `InstallDirs` as example):
     # ...
     decls.update(SConsGnuArguments.InstallDirs.Declarations())
     # ...
+
+The submodules are cheap to import: the argument tables are built when
+first used. With python 3.7 and later ``import SConsGnuArguments`` alone is
+enough, the submodules are imported on first access.
 """
 
 #
@@ -50,8 +58,19 @@ The typical usage pattern is (taking `InstallDirs` as example):
 
 __docformat__ = "restructuredText"
 
+_submodules = ('AltPrograms', 'Install', 'InstallDirs', 'Util')
+"""Submodules loaded on first access to ``SConsGnuArguments.<name>``. This is
+internal attribute and IS **NOT a part of public API**"""
 
-## TODO: Place your code here
+def __getattr__(name):
+    """Import submodule `name` when it's first accessed as an attribute of
+    the package (python 3.7 and later; with older versions the submodules
+    have to be imported explicitly). This is an internal function and IS
+    **NOT a part of public API**."""
+    if name in _submodules:
+        import importlib
+        return importlib.import_module('%s.%s' % (__name__, name))
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
 
 # Local Variables:
 # # tab-width:4
@@ -0,0 +1,219 @@
+"""`bench.benchmarks`
+
+Timing benchmarks for SConsGnuArguments.
+
+Measures ``Names()``, ``Declarations()``, ``Commit()``, ``Postprocess()``,
+repeated ``Dirs()`` and ``Staged()`` lookups and bulk substitution of the
+predefined argument sets (`SConsGnuArguments.InstallDirs`,
+`SConsGnuArguments.AltPrograms`) and of synthetic argument tables of growing
+size. Results are written as JSON, such
+that two runs may be compared with ``--compare``.
+
+Usage (from the top-level directory, SConsArguments in ``site_scons/``)::
+
+    scons bench
+    python -m bench.benchmarks --output build/bench/benchmarks.json
+    python -m bench.benchmarks --sizes 1000 --compare old.json
+"""
+
+#
+# Copyright (c) 2016 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+from __future__ import print_function
+
+__docformat__ = "restructuredText"
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import timeit
+
+import SConsGnuArguments.Util
+import SConsGnuArguments.InstallDirs
+import SConsGnuArguments.AltPrograms
+import SCons.Environment
+import SCons.Variables
+
+#############################################################################
+def synthetic_triples(size):
+    """Return `size` argument triples forming a binary tree of references,
+    i.e. ``v1 -> v0``, ``v2 -> v0``, ``v3 -> v1``, and so on."""
+    triples = [ ('v0', 'Synthetic variable 0', '/root') ]
+    for i in range(1, size):
+        triples.append(('v%d' % i, 'Synthetic variable %d' % i, '${v%d}/d%d' % ((i - 1) // 2, i)))
+    return triples
+
+#############################################################################
+def measure(func, repeat):
+    """Run `func` `repeat` times and return dict with the best and mean
+    wall time in seconds."""
+    timer = timeit.default_timer
+    times = []
+    for _ in range(repeat):
+        t0 = timer()
+        func()
+        times.append(timer() - t0)
+    return { 'best' : min(times), 'mean' : sum(times) / len(times), 'repeat' : repeat }
+
+#############################################################################
+def bench_triples(suite, triples, repeat):
+    """Benchmark all phases for argument `triples` and return list of result
+    records."""
+    Util = SConsGnuArguments.Util
+    results = []
+    size = len(triples)
+
+    def record(case, func):
+        res = measure(func, repeat)
+        res.update({ 'suite' : suite, 'case' : case, 'size' : size })
+        results.append(res)
+        return res
+
+    record('Names', lambda : list(Util.names_from_triples(triples)))
+    record('Declarations', lambda : Util.arguments_from_triples(triples, opt_key_transform = False))
+    record('Declarations(lazy)', lambda : Util.arguments_from_triples(triples, opt_key_transform = False, lazy = True))
+
+    # Commit() and Postprocess() consume the declarations and the
+    # environment, so each repetition prepares fresh ones outside the timer.
+    def phases():
+        env = SCons.Environment.Environment(tools = [])
+        var = SCons.Variables.Variables(args = {})
+        decls = Util.arguments_from_triples(triples, opt_key_transform = False)
+        return env, var, decls
+    commit = []
+    post = []
+    timer = timeit.default_timer
+    for _ in range(repeat):
+        env, var, decls = phases()
+        t0 = timer()
+        args = decls.Commit(env, var, False)
+        t1 = timer()
+        args.Postprocess(env, var, False)
+        t2 = timer()
+        commit.append(t1 - t0)
+        post.append(t2 - t1)
+    for (case, times) in (('Commit', commit), ('Postprocess', post)):
+        results.append({ 'suite' : suite, 'case' : case, 'size' : size, 'repeat' : repeat,
+                         'best' : min(times), 'mean' : sum(times) / len(times) })
+
+    names = Util.names_from_triples(triples)
+    exprs = ['${%s}' % name for name in names]
+    record('subst', lambda : [env.subst(e) for e in exprs])
+    record('Resolve', lambda : Util.resolve_triples(triples, env))
+    # repeated lookups in unchanged environment hit the per-environment cache
+    # (after the first call), so these measure the cost of the cache check
+    calls = range(100)
+    record('Dirs(x100)', lambda : [Util.dir_nodes_from_triples(triples, env) for _ in calls])
+    record('Staged(x100)', lambda : [Util.staged_from_triples(triples, env, '/stage') for _ in calls])
+    return results
+
+#############################################################################
+def run(sizes, repeat):
+    """Run all the benchmarks and return the JSON-serializable report."""
+    results = []
+    install_dirs = SConsGnuArguments.InstallDirs
+    alt_programs = SConsGnuArguments.AltPrograms
+    results.extend(bench_triples('InstallDirs', install_dirs._std_arg_registry, repeat))
+    results.extend(bench_triples('AltPrograms', alt_programs._std_arg_registry, repeat))
+    for size in sizes:
+        registry = SConsGnuArguments.Util._ArgumentRegistry(synthetic_triples(size))
+        results.extend(bench_triples('synthetic', registry, max(1, repeat // 10) if size >= 10000 else repeat))
+    return { 'meta' : { 'python' : platform.python_version(),
+                        'implementation' : platform.python_implementation(),
+                        'platform' : platform.platform(),
+                        'time' : time.strftime('%Y-%m-%dT%H:%M:%S'),
+                        'sizes' : sizes },
+             'results' : results }
+
+#############################################################################
+def compare(old, new, tolerance):
+    """Compare two reports and return list of ``(key, old, new)`` tuples for
+    cases that became slower by more than `tolerance` (relative)."""
+    def index(report):
+        return dict(((r['suite'], r['case'], r['size']), r['best']) for r in report['results'])
+    old = index(old)
+    regressions = []
+    for (key, best) in sorted(index(new).items()):
+        if key in old and best > old[key] * (1.0 + tolerance):
+            regressions.append((key, old[key], best))
+    return regressions
+
+#############################################################################
+def write_report(report, output):
+    """Write `report` as JSON to file `output` (``'-'`` means stdout)."""
+    if output == '-':
+        json.dump(report, sys.stdout, indent = 2, sort_keys = True)
+        print()
+        return
+    outdir = os.path.dirname(output)
+    if outdir and not os.path.isdir(outdir):
+        os.makedirs(outdir)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent = 2, sort_keys = True)
+
+#############################################################################
+def print_table(report):
+    """Print human-readable summary of `report`."""
+    print('%-12s %-20s %8s %12s %12s' % ('suite', 'case', 'size', 'best [ms]', 'mean [ms]'))
+    for r in report['results']:
+        print('%-12s %-20s %8d %12.3f %12.3f' % (r['suite'], r['case'], r['size'],
+                                                r['best'] * 1e3, r['mean'] * 1e3))
+
+#############################################################################
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Run SConsGnuArguments benchmarks')
+    parser.add_argument('--output', '-o', default = 'build/bench/benchmarks.json',
+                        help = "write JSON report to this file ('-' for stdout)")
+    parser.add_argument('--sizes', default = '1000,10000,100000',
+                        help = 'comma-separated sizes of synthetic argument tables')
+    parser.add_argument('--repeat', type = int, default = 10,
+                        help = 'number of repetitions of each measurement')
+    parser.add_argument('--compare', metavar = 'FILE',
+                        help = 'compare with previous JSON report, fail on regressions')
+    parser.add_argument('--tolerance', type = float, default = 0.25,
+                        help = 'relative slowdown tolerated by --compare')
+    opts = parser.parse_args(argv)
+
+    sizes = [int(s) for s in opts.sizes.split(',') if s]
+    report = run(sizes, max(1, opts.repeat))
+    write_report(report, opts.output)
+    print_table(report)
+
+    if opts.compare:
+        with open(opts.compare) as f:
+            regressions = compare(json.load(f), report, opts.tolerance)
+        for ((suite, case, size), old, new) in regressions:
+            print('REGRESSION: %s %s [%d]: %.3f ms -> %.3f ms' % (suite, case, size, old * 1e3, new * 1e3))
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,160 @@
+"""`bench.importtime`
+
+Import-time benchmarks for SConsGnuArguments.
+
+Every module is imported in a fresh interpreter, so the measurement
+includes everything the import pulls in. Two scenarios are measured:
+``cold`` (nothing imported beforehand) and ``scons`` (SCons modules already
+imported, as in a SConscript). The time of the first use of the module
+(e.g. ``InstallDirs.Names()``, which builds the deferred argument table) is
+reported separately. With python 3.7 and later the report also contains the
+``-X importtime`` breakdown of SConsGnuArguments modules.
+
+Usage (from the top-level directory, SConsArguments in ``site_scons/``)::
+
+    python -m bench.importtime --output build/bench/importtime.json
+"""
+
+#
+# Copyright (c) 2016 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+from __future__ import print_function
+
+__docformat__ = "restructuredText"
+
+import os
+import sys
+import platform
+import argparse
+import subprocess
+
+from bench.benchmarks import write_report
+
+#############################################################################
+_modules = [
+    ('SConsGnuArguments', None),
+    ('SConsGnuArguments.Util', None),
+    ('SConsGnuArguments.InstallDirs', 'Names()'),
+    ('SConsGnuArguments.AltPrograms', 'Names()'),
+    ('SConsGnuArguments.Install', None),
+]
+"""Modules being measured and the expression evaluated as their first use."""
+
+_preload = {
+    'cold'  : '',
+    'scons' : 'import SCons.Util, SCons.Errors, SCons.Environment, SCons.Variables',
+}
+"""Statements executed before the measurement, per scenario."""
+
+_snippet = """
+%(preload)s
+import sys, timeit
+t0 = timeit.default_timer()
+import %(module)s as m
+t1 = timeit.default_timer()
+%(use)s
+t2 = timeit.default_timer()
+sys.stdout.write('%%r %%r' %% (t1 - t0, t2 - t1))
+"""
+
+#############################################################################
+def _environ():
+    """Return OS environment for child interpreters, with current sys.path
+    in PYTHONPATH."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in sys.path if p)
+    return env
+
+#############################################################################
+def measure(module, use, scenario, repeat):
+    """Import `module` in `repeat` fresh interpreters and return dict with
+    the best import and first-use times in seconds."""
+    code = _snippet % { 'preload' : _preload[scenario], 'module' : module,
+                        'use' : ('m.%s' % use) if use else 'pass' }
+    imports = []
+    uses = []
+    for _ in range(repeat):
+        out = subprocess.check_output([sys.executable, '-c', code], env = _environ())
+        (t_import, t_use) = [float(x) for x in out.decode('ascii').split()]
+        imports.append(t_import)
+        uses.append(t_use)
+    return { 'module' : module, 'scenario' : scenario, 'repeat' : repeat,
+             'import' : min(imports), 'first_use' : min(uses) }
+
+#############################################################################
+def importtime(module):
+    """Return ``-X importtime`` breakdown (``{module : [self_us,
+    cumulative_us]}``) of SConsGnuArguments modules imported by `module`, or
+    ``None`` if not supported by the interpreter."""
+    if sys.version_info < (3, 7):
+        return None
+    proc = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', 'import %s' % module],
+                            stderr = subprocess.PIPE, env = _environ())
+    err = proc.communicate()[1].decode('utf-8', 'replace')
+    breakdown = {}
+    for line in err.splitlines():
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[2].strip().startswith('SConsGnuArguments'):
+            breakdown[parts[2].strip()] = [int(parts[0].split()[-1]), int(parts[1])]
+    return breakdown
+
+#############################################################################
+def run(repeat):
+    """Run all the benchmarks and return the JSON-serializable report."""
+    results = []
+    for (module, use) in _modules:
+        for scenario in sorted(_preload):
+            results.append(measure(module, use, scenario, repeat))
+    return { 'meta' : { 'python' : platform.python_version(),
+                        'implementation' : platform.python_implementation(),
+                        'platform' : platform.platform() },
+             'results' : results,
+             'importtime' : importtime('SConsGnuArguments.InstallDirs') }
+
+#############################################################################
+def print_table(report):
+    """Print human-readable summary of `report`."""
+    print('%-32s %-8s %12s %14s' % ('module', 'scenario', 'import [ms]', 'first use [ms]'))
+    for r in report['results']:
+        print('%-32s %-8s %12.3f %14.3f' % (r['module'], r['scenario'],
+                                           r['import'] * 1e3, r['first_use'] * 1e3))
+
+#############################################################################
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Run SConsGnuArguments import-time benchmarks')
+    parser.add_argument('--output', '-o', default = 'build/bench/importtime.json',
+                        help = "write JSON report to this file ('-' for stdout)")
+    parser.add_argument('--repeat', type = int, default = 5,
+                        help = 'number of interpreters started for each measurement')
+    opts = parser.parse_args(argv)
+    report = run(max(1, opts.repeat))
+    write_report(report, opts.output)
+    print_table(report)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,152 @@
+"""`bench.memory`
+
+Memory benchmarks for SConsGnuArguments.
+
+Measures, with ``tracemalloc``, the memory retained by argument registries
+and by declarations created per component (as when every component of a
+large build declares its own set of GNU arguments). Requires python 3.4 or
+later; on older interpreters the report only says the measurement is not
+available.
+
+Usage (from the top-level directory, SConsArguments in ``site_scons/``)::
+
+    python -m bench.memory --output build/bench/memory.json
+"""
+
+#
+# Copyright (c) 2016 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+from __future__ import print_function
+
+__docformat__ = "restructuredText"
+
+import sys
+import gc
+import platform
+import argparse
+
+import SConsGnuArguments.Util
+import SConsGnuArguments.InstallDirs
+import SConsGnuArguments.AltPrograms
+from bench.benchmarks import write_report
+
+try:
+    import tracemalloc
+except ImportError:
+    # python < 3.4
+    tracemalloc = None
+
+#############################################################################
+def retained(func):
+    """Call `func` and return ``(result, bytes)``, where ``bytes`` is the
+    memory allocated by `func` and still retained after it returns."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+#############################################################################
+def bench_module(suite, module, components):
+    """Measure memory retained by the registry of `module` and by
+    `components` sets of its declarations."""
+    Util = SConsGnuArguments.Util
+    # plain tuples, as the argument tables were before ArgumentSpec
+    triples = [tuple(t) for t in module._std_arg_registry]
+    results = []
+
+    def record(case, nbytes, count):
+        results.append({ 'suite' : suite, 'case' : case, 'count' : count,
+                         'bytes' : nbytes, 'bytes_per_item' : float(nbytes) / max(1, count) })
+
+    _, nbytes = retained(lambda : [(n, h, d) for (n, h, d) in triples])
+    record('tuples', nbytes, len(triples))
+    # the registry loads its specs lazily, len() converts the tuples
+    _, nbytes = retained(lambda : [r for r in [Util._ArgumentRegistry(triples)] if len(r)])
+    record('registry', nbytes, len(triples))
+
+    # declarations created per component from plain tuples and from the
+    # registry, their bytes_per_item differ by the per-declaration saving
+    _, nbytes = retained(lambda : [Util.arguments_from_triples(triples, opt_key_transform = False)
+                                   for _ in range(components)])
+    record('declarations(tuples)', nbytes, components * len(triples))
+    registry = Util._ArgumentRegistry(triples)
+    len(registry)
+    _, nbytes = retained(lambda : [Util.arguments_from_triples(registry, opt_key_transform = False)
+                                   for _ in range(components)])
+    record('declarations', nbytes, components * len(registry))
+    _, nbytes = retained(lambda : [Util.arguments_from_triples(registry, opt_key_transform = False, lazy = True)
+                                   for _ in range(components)])
+    record('declarations(lazy)', nbytes, components * len(registry))
+    return results
+
+#############################################################################
+def run(components):
+    """Run all the benchmarks and return the JSON-serializable report."""
+    meta = { 'python' : platform.python_version(),
+             'implementation' : platform.python_implementation(),
+             'components' : components }
+    if tracemalloc is None:
+        meta['available'] = False
+        return { 'meta' : meta, 'results' : [] }
+    meta['available'] = True
+    results = []
+    results.extend(bench_module('InstallDirs', SConsGnuArguments.InstallDirs, components))
+    results.extend(bench_module('AltPrograms', SConsGnuArguments.AltPrograms, components))
+    return { 'meta' : meta, 'results' : results }
+
+#############################################################################
+def print_table(report):
+    """Print human-readable summary of `report`."""
+    if not report['meta']['available']:
+        print('tracemalloc is not available in python %s' % report['meta']['python'])
+        return
+    print('%-12s %-22s %8s %12s %14s' % ('suite', 'case', 'items', 'bytes', 'bytes/item'))
+    for r in report['results']:
+        print('%-12s %-22s %8d %12d %14.1f' % (r['suite'], r['case'], r['count'],
+                                              r['bytes'], r['bytes_per_item']))
+
+#############################################################################
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Run SConsGnuArguments memory benchmarks')
+    parser.add_argument('--output', '-o', default = 'build/bench/memory.json',
+                        help = "write JSON report to this file ('-' for stdout)")
+    parser.add_argument('--components', type = int, default = 100,
+                        help = 'number of declaration sets created (one per component)')
+    opts = parser.parse_args(argv)
+    report = run(max(1, opts.components))
+    write_report(report, opts.output)
+    print_table(report)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
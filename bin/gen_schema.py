@@ -0,0 +1,80 @@
+#! /usr/bin/env python
+
+#
+# Copyright (c) 2016 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+# Generate SConsGnuArguments/_schema.py with frozen argument declarations
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+
+_topdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [_topdir, os.path.join(_topdir, 'site_scons')]
+
+import SConsGnuArguments.Util
+import SConsGnuArguments.InstallDirs
+import SConsGnuArguments.AltPrograms
+
+_default_output = os.path.join(_topdir, 'SConsGnuArguments', '_schema.py')
+
+def schema_tables():
+    return { 'InstallDirs' : SConsGnuArguments.InstallDirs._schema_table(),
+             'AltPrograms' : SConsGnuArguments.AltPrograms._schema_table() }
+
+def read_file(path):
+    try:
+        with open(path) as f:
+            return f.read()
+    except (IOError, OSError):
+        return None
+
+_parser = argparse.ArgumentParser(description = 'Generate frozen argument declarations')
+_parser.add_argument('--output', '-o', default = _default_output,
+                     help = 'write the schema module to this file')
+_parser.add_argument('--check', action = 'store_true',
+                     help = 'do not write anything, exit with status 1 if the schema module is outdated')
+
+_args = _parser.parse_args()
+
+source = SConsGnuArguments.Util.schema_source(schema_tables())
+current = read_file(_args.output)
+
+if _args.check:
+    if current != source:
+        print('%s is outdated, please run %s' % (_args.output, sys.argv[0]))
+        sys.exit(1)
+    sys.exit(0)
+
+if current != source:
+    tmp = '%s.tmp' % _args.output
+    with open(tmp, 'w') as f:
+        f.write(source)
+    os.rename(tmp, _args.output)
+    print('%s written' % _args.output)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -29,6 +29,8 @@ __docformat__ = "restructuredText"
 import SConsGnuArguments.AltPrograms
 import SConsArguments
 import unittest
+import sys
+import os
 
 # The mock module does not come as a part of python 2.x stdlib, it has to be
 # installed separatelly. Here we detect whether mock is present and if not,
@@ -303,6 +305,183 @@ class Test_Declarations(unittest.TestCase):
             self.assertEqual(decls[key].get_opt_key(), 'opt_' + key.lower() + '_pto')
             self.assertEqual(decls[key].get_opt_decl()[0], ('-on-' + key.lower().replace('_','-') + '-no',))
 
+#############################################################################
+class Test_Detect(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.tmpdir = tempfile.mkdtemp()
+        self.bindir1 = os.path.join(self.tmpdir, 'bin1')
+        self.bindir2 = os.path.join(self.tmpdir, 'bin2')
+        os.mkdir(self.bindir1)
+        os.mkdir(self.bindir2)
+        self.mkprog(self.bindir1, 'awk')
+        self.mkprog(self.bindir2, 'mawk')
+        self.mkprog(self.bindir2, 'bison')
+        self.mkprog(self.bindir1, 'myprog')
+        self.path = os.pathsep.join([self.bindir1, self.bindir2])
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmpdir)
+
+    @staticmethod
+    def mkprog(dirname, name, script = ''):
+        if sys.platform == 'win32':
+            name = name + '.exe'
+        path = os.path.join(dirname, name)
+        with open(path, 'w') as f:
+            f.write('#!/bin/sh\n' + script)
+        os.chmod(path, 0o755)
+        return path
+
+    def test_Detect_1(self):
+        """AltPrograms.Detect(path=...) should pick first candidate found"""
+        progs = SConsGnuArguments.AltPrograms.Detect(path = self.path)
+        self.assertTrue(progs['AWK'].startswith(os.path.join(self.bindir2, 'mawk')))
+        self.assertTrue(progs['YACC'].startswith(os.path.join(self.bindir2, 'bison')))
+        self.assertTrue(progs['YACC'].endswith(' -y'))
+        self.assertFalse('SED' in progs)
+
+    def test_Detect_2(self):
+        """AltPrograms.Detect(names, candidates=...) should support user-defined programs"""
+        progs = SConsGnuArguments.AltPrograms.Detect(names = ['AWK', 'MYPROG'], path = self.path,
+                                                     candidates = { 'MYPROG' : ['inexistent', 'myprog'] })
+        self.assertEqual(sorted(progs.keys()), ['AWK', 'MYPROG'])
+        self.assertTrue(progs['MYPROG'].startswith(os.path.join(self.bindir1, 'myprog')))
+
+    def test_WhereIs_1(self):
+        """AltPrograms.WhereIs() should notice new programs in modified directories"""
+        import time
+        self.assertIsNone(SConsGnuArguments.AltPrograms.WhereIs('newprog', path = self.path))
+        # make sure the directory mtime changes
+        time.sleep(0.01)
+        prog = self.mkprog(self.bindir2, 'newprog')
+        st = os.stat(self.bindir2)
+        os.utime(self.bindir2, (st.st_atime, st.st_mtime + 10))
+        self.assertEqual(SConsGnuArguments.AltPrograms.WhereIs('newprog', path = self.path), prog)
+        self.assertEqual(SConsGnuArguments.AltPrograms.WhereIs('awk', path = self.path),
+                         SConsGnuArguments.AltPrograms.WhereIs(os.path.join(self.bindir1, 'awk')))
+
+    @unittest.skipIf(sys.platform == 'win32', "requires POSIX permissions")
+    def test_WhereIs_2(self):
+        """AltPrograms.WhereIs() should skip non-executable files and check only names looked up"""
+        with open(os.path.join(self.bindir1, 'mawk'), 'w') as f:
+            f.write('not a program\n')
+        os.mkdir(os.path.join(self.bindir1, 'bison'))
+        index = SConsGnuArguments.AltPrograms._PathIndex(self.path)
+        index.refresh()
+        self.assertEqual(index._PathIndex__executable, {})
+        self.assertEqual(index.lookup('mawk'), os.path.join(self.bindir2, 'mawk'))
+        self.assertEqual(index.lookup('bison'), os.path.join(self.bindir2, 'bison'))
+        self.assertEqual(sorted(index._PathIndex__executable.keys()),
+                         sorted(os.path.join(d, n) for d in (self.bindir1, self.bindir2) for n in ('mawk', 'bison')))
+
+    @unittest.skipIf(sys.platform == 'win32', "requires POSIX shell")
+    def test__run_1(self):
+        """AltPrograms._run() should close inherited descriptors and avoid preexec_fn"""
+        import subprocess
+        calls = []
+        Popen = subprocess.Popen
+        def popen(argv, **kw):
+            calls.append((argv, kw))
+            return Popen(argv, **kw)
+        subprocess.Popen = popen
+        try:
+            prog = self.mkprog(self.bindir1, 'fast', 'echo fast\n')
+            self.assertEqual(SConsGnuArguments.AltPrograms._run([prog]), (0, 'fast\n'))
+        finally:
+            subprocess.Popen = Popen
+        (argv, kw) = calls[0]
+        self.assertTrue(kw.get('close_fds'))
+        self.assertFalse('preexec_fn' in kw)
+        self.assertEqual(argv[-1], prog)
+
+    @unittest.skipIf(sys.platform == 'win32', "requires POSIX shell")
+    def test_Probe_1(self):
+        """AltPrograms.Probe(cache_file=...) should reuse results of unchanged programs"""
+        cache = os.path.join(self.tmpdir, 'cache.json')
+        log = os.path.join(self.tmpdir, 'log')
+        self.mkprog(self.bindir1, 'gawk', 'echo run >> %s\necho "GNU Awk 4.1"\n' % log)
+        self.mkprog(self.bindir1, 'gsed', 'echo run >> %s\necho "sed (GNU sed) 4.2"\n' % log)
+
+        recs = SConsGnuArguments.AltPrograms.Probe(names = ['AWK', 'SED'], path = self.path, cache_file = cache)
+        self.assertEqual(recs['AWK']['flavor'], 'GNU Awk 4.1')
+        self.assertEqual(recs['SED']['flavor'], 'sed (GNU sed) 4.2')
+        # --version and a behavioral check for each program
+        with open(log) as f:
+            self.assertEqual(len(f.readlines()), 4)
+
+        # the store is shared within process, force reading the file
+        SConsGnuArguments.Util._JsonStore._stores.clear()
+        self.mkprog(self.bindir1, 'gsed', 'echo run >> %s\necho "sed (GNU sed) 4.8.1"\n' % log)
+        recs = SConsGnuArguments.AltPrograms.Probe(names = ['AWK', 'SED'], path = self.path, cache_file = cache)
+        self.assertEqual(recs['AWK']['flavor'], 'GNU Awk 4.1')
+        self.assertEqual(recs['SED']['flavor'], 'sed (GNU sed) 4.8.1')
+        with open(log) as f:
+            self.assertEqual(len(f.readlines()), 6)
+
+        progs = SConsGnuArguments.AltPrograms.Detect(names = ['AWK', 'YACC'], path = self.path, cache_file = cache)
+        self.assertEqual(progs['AWK'], os.path.join(self.bindir1, 'gawk'))
+        self.assertTrue(progs['YACC'].endswith(' -y'))
+
+    @unittest.skipIf(sys.platform == 'win32', "requires POSIX shell")
+    def test_Probe_2(self):
+        """AltPrograms.Probe() should resolve EGREP and FGREP to grep options when supported"""
+        self.mkprog(self.bindir1, 'grep', 'exec %s "$@"\n' % SConsGnuArguments.AltPrograms.WhereIs('grep'))
+        self.mkprog(self.bindir1, 'fgrep')
+        recs = SConsGnuArguments.AltPrograms.Probe(names = ['EGREP', 'FGREP'], path = self.path)
+        grep = os.path.join(self.bindir1, 'grep')
+        self.assertEqual(recs['EGREP']['program'], grep + ' -E')
+        self.assertEqual(recs['FGREP']['program'], grep + ' -F')
+        self.assertFalse('GREP' in recs)
+
+    @unittest.skipIf(sys.platform == 'win32', "requires POSIX shell")
+    def test_Probe_3(self):
+        """AltPrograms.Probe() should kill probes which don't complete in time"""
+        import time
+        self.mkprog(self.bindir1, 'grep', 'sleep 5\n')
+        self.mkprog(self.bindir1, 'egrep')
+        t0 = time.time()
+        recs = SConsGnuArguments.AltPrograms.Probe(names = ['EGREP'], path = self.path, timeout = 0.5)
+        self.assertLess(time.time() - t0, 4.0)
+        self.assertEqual(recs['EGREP']['program'], os.path.join(self.bindir1, 'egrep'))
+
+    @unittest.skipIf(sys.platform == 'win32', "requires POSIX shell")
+    def test_DetectLex_1(self):
+        """AltPrograms.DetectLex() should determine LEX_OUTPUT_ROOT and LEXLIB and cache them"""
+        cache = os.path.join(self.tmpdir, 'cache.json')
+        log = os.path.join(self.tmpdir, 'log')
+        self.mkprog(self.bindir1, 'flex', 'test "$1" = conftest.l || exit 1\necho lex >> %s\ntouch lexyy.c\n' % log)
+        self.mkprog(self.bindir1, 'mycc', 'for a in "$@"; do test "$a" = "-ll" && exit 0; done\nexit 1\n')
+        res = SConsGnuArguments.AltPrograms.DetectLex(path = self.path, cc = 'mycc', cache_file = cache)
+        self.assertEqual(res, { 'LEX_OUTPUT_ROOT' : 'lexyy', 'LEXLIB' : '-ll' })
+        res = SConsGnuArguments.AltPrograms.DetectLex(path = self.path, cc = 'mycc', cache_file = cache)
+        self.assertEqual(res, { 'LEX_OUTPUT_ROOT' : 'lexyy', 'LEXLIB' : '-ll' })
+        with open(log) as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+    @unittest.skipIf(sys.platform == 'win32', "requires POSIX shell")
+    def test_DetectLex_3(self):
+        """AltPrograms.Detect(probe=True) should determine LEX_OUTPUT_ROOT and LEXLIB"""
+        self.mkprog(self.bindir1, 'flex', 'test "$1" = conftest.l || exit 1\ntouch lex.yy.c\n')
+        self.mkprog(self.bindir1, 'mycc')
+        progs = SConsGnuArguments.AltPrograms.Detect(names = ['LEX', 'LEX_OUTPUT_ROOT', 'LEXLIB'],
+                                                     path = self.path, cc = 'mycc', probe = True)
+        self.assertEqual(progs['LEX'], os.path.join(self.bindir1, 'flex'))
+        self.assertEqual(progs['LEX_OUTPUT_ROOT'], 'lex.yy')
+        self.assertEqual(progs['LEXLIB'], '')
+
+    @unittest.skipIf(sys.platform == 'win32', "requires POSIX shell")
+    def test_DetectLex_2(self):
+        """AltPrograms.DetectLex() should return empty dict when lex fails"""
+        self.mkprog(self.bindir1, 'flex', 'exit 1\n')
+        self.assertEqual(SConsGnuArguments.AltPrograms.DetectLex(path = self.path), {})
+
+    def test_Candidates_1(self):
+        """AltPrograms.Candidates('AWK') should return autoconf's candidates"""
+        self.assertListEqual(SConsGnuArguments.AltPrograms.Candidates('AWK'), ['gawk', 'mawk', 'nawk', 'awk'])
+        self.assertListEqual(SConsGnuArguments.AltPrograms.Candidates('FOO'), [])
+
 #############################################################################
 if __name__ == "__main__":
     ldr = unittest.TestLoader()
@@ -311,6 +490,7 @@ if __name__ == "__main__":
     tclasses = [ Test__std_arg_triples
                , Test_Names
                , Test_Declarations
+               , Test_Detect
                ]
 
     for tclass in tclasses:
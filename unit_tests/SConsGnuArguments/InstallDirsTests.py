@@ -174,7 +174,7 @@ _test_arg_names = [
 
 #############################################################################
 def __init_module_vars(**kw):
-    man_sections = kw.get('man_sections', map(lambda x : str(x), range(1,10)) + ['n','l'])
+    man_sections = kw.get('man_sections', [str(x) for x in range(1,10)] + ['n','l'])
     for sec in man_sections:
         dir_help = 'The directory for installing section %s man pages.' % sec
         ext_help = 'The file name extension for installed section %s man pages.' % sec
@@ -195,9 +195,9 @@ class Test__std_arg_triples(unittest.TestCase):
         return None
 
     def chck_triple(self,name):
-        t1 = Test__std_arg_triples.find_triple(SConsGnuArguments.InstallDirs._std_arg_triples, name)
+        t1 = Test__std_arg_triples.find_triple(SConsGnuArguments.InstallDirs._std_arg_registry, name)
         t2 = Test__std_arg_triples.find_triple(_test_arg_triples, name)
-        self.assertTrue(t1, "triple '%s' not found in InstallDirs._std_arg_triples" % name)
+        self.assertTrue(t1, "triple '%s' not found in InstallDirs._std_arg_registry" % name)
         self.assertTrue(t2, "triple '%s' not found in InstallDirsTests._test_arg_triples" % name)
         self.assertEqual(t1[0], t2[0]) # name
         self.assertEqual(t1[1], t2[1]) # help message
@@ -444,6 +444,175 @@ class Test_Declarations(unittest.TestCase):
             self.assertEqual(decls[key].get_opt_key(), 'opt_' + key.lower() + '_pto')
             self.assertEqual(decls[key].get_opt_decl()[0], ('-on-' + key.lower().replace('_','-') + '-no',))
 
+    def test_Declarations_8(self):
+        """InstallDirs.Declarations(lazy=True) should return lazy declarations"""
+        decls = SConsGnuArguments.InstallDirs.Declarations(lazy = True)
+        self.assertIsInstance(decls, SConsArguments._ArgumentDeclarations)
+        self.assertEqual(len(decls), len(_test_arg_triples))
+        for (key, hlp, default) in _test_arg_triples:
+            self.assertEqual(type(decls[key]), SConsArguments._ArgumentDeclaration)
+            self.assertEqual(decls[key].get_env_key(), key)
+            self.assertEqual(decls[key].get_env_default(), default)
+
+    def test_Declarations_9(self):
+        """InstallDirs.Declarations() should use up to date frozen schema"""
+        import types
+        Util = SConsGnuArguments.Util
+        table = SConsGnuArguments.InstallDirs._schema_table()
+        table['declarations'][0][1]['default'] = '/frozen'
+        saved = Util._schema_module
+        try:
+            module = types.ModuleType('_schema')
+            exec(Util.schema_source({ 'InstallDirs' : table }), module.__dict__)
+            Util._schema_module = module
+            decls = SConsGnuArguments.InstallDirs.Declarations()
+            self.assertEqual(decls['prefix'].get_env_default(), '/frozen')
+            self.assertEqual(len(decls), len(_test_arg_triples))
+            decls = SConsGnuArguments.InstallDirs.Declarations(env_key_prefix = 'X_')
+            self.assertEqual(decls['prefix'].get_env_default(), '/usr/local')
+            module.TABLES['InstallDirs']['digest'] = 'stale'
+            decls = SConsGnuArguments.InstallDirs.Declarations()
+            self.assertEqual(decls['prefix'].get_env_default(), '/usr/local')
+        finally:
+            Util._schema_module = saved
+
+class Test_man_sections(unittest.TestCase):
+    def test_Names_1(self):
+        """InstallDirs.Names(man_sections=['1','8']) should only provide requested man sections"""
+        names = SConsGnuArguments.InstallDirs.Names(man_sections = ['1', '8'])
+        mans = [n for n in names if n.startswith('man') and n != 'mandir']
+        self.assertEqual(sorted(mans), ['man1dir', 'man1ext', 'man8dir', 'man8ext'])
+        self.assertTrue('mandir' in names)
+        self.assertEqual(len(SConsGnuArguments.InstallDirs.Names()), len(_test_arg_names))
+
+    def test_Names_2(self):
+        """InstallDirs.Names(man_sections=...) should not modify module state"""
+        before = list(SConsGnuArguments.InstallDirs._std_arg_triples)
+        SConsGnuArguments.InstallDirs.Names(man_sections = ['x'])
+        self.assertEqual(SConsGnuArguments.InstallDirs._std_arg_triples, before)
+        self.assertFalse('manxdir' in SConsGnuArguments.InstallDirs.Names())
+
+    def test_Declarations_1(self):
+        """InstallDirs.Declarations(man_sections=['1']) should only declare section 1"""
+        decls = SConsGnuArguments.InstallDirs.Declarations(man_sections = ['1'])
+        self.assertTrue('man1dir' in decls)
+        self.assertFalse('man2dir' in decls)
+        self.assertEqual(len(decls), len(_test_arg_names) - 20)
+
+class Test_Resolve(unittest.TestCase):
+    def test_Resolve_1(self):
+        """InstallDirs.Resolve(env) should return same values as env.subst()"""
+        import SCons.Environment
+        env = SCons.Environment.Environment(tools = [], package = 'pkg', install_package = 'ipkg')
+        env.Replace(**dict((t[0], t[2]) for t in _test_arg_triples))
+        env.Replace(prefix = '/usr', libdir = '/usr/lib64')
+        dirs = SConsGnuArguments.InstallDirs.Resolve(env)
+        self.assertEqual(sorted(dirs.keys()), sorted(_test_arg_names))
+        self.assertEqual(dirs['pkglibdir'], '/usr/lib64/pkg')
+        self.assertEqual(dirs['htmldir'], '/usr/share/doc/ipkg')
+        for name in _test_arg_names:
+            self.assertEqual(dirs[name], env.subst('${%s}' % name))
+
+    def test_Resolve_2(self):
+        """InstallDirs.Resolve(env, name_filter, env_key_prefix) should respect name convention"""
+        import SCons.Environment
+        env = SCons.Environment.Environment(tools = [], ENV_prefix = '/opt', ENV_exec_prefix = '${ENV_prefix}',
+                                            ENV_bindir = '${ENV_exec_prefix}/bin')
+        dirs = SConsGnuArguments.InstallDirs.Resolve(env, name_filter = ['bindir', 'sbindir'],
+                                                     env_key_prefix = 'ENV_')
+        self.assertEqual(dirs, { 'bindir' : '/opt/bin' })
+
+class Test_Staged(unittest.TestCase):
+    def test_Staged_1(self):
+        """InstallDirs.Staged(env, destdir) should re-root directories under destdir"""
+        import SCons.Environment
+        env = SCons.Environment.Environment(tools = [], package = 'pkg', install_package = 'ipkg')
+        env.Replace(**dict((t[0], t[2]) for t in _test_arg_triples))
+        staged = SConsGnuArguments.InstallDirs.Staged(env, '/tmp/stage')
+        self.assertEqual(staged['bindir'], '/tmp/stage/usr/local/bin')
+        self.assertEqual(staged['pkglibdir'], '/tmp/stage/usr/local/lib/pkg')
+        self.assertFalse('man1ext' in staged)
+
+    def test_Staged_2(self):
+        """InstallDirs.Staged(env) should use $DESTDIR"""
+        import SCons.Environment
+        env = SCons.Environment.Environment(tools = [], DESTDIR = '/stage', prefix = '/usr',
+                                            exec_prefix = '${prefix}', bindir = '${exec_prefix}/bin')
+        self.assertEqual(SConsGnuArguments.InstallDirs.Staged(env),
+                         { 'prefix' : '/stage/usr', 'exec_prefix' : '/stage/usr', 'bindir' : '/stage/usr/bin' })
+        env['DESTDIR'] = ''
+        self.assertEqual(SConsGnuArguments.InstallDirs.Staged(env)['bindir'], '/usr/bin')
+
+    def test_Staged_3(self):
+        """InstallDirs.Staged(env) should not resolve values again until they change"""
+        import SCons.Environment
+        env = SCons.Environment.Environment(tools = [], prefix = '/usr', exec_prefix = '${prefix}',
+                                            bindir = '${exec_prefix}/bin')
+        self.assertEqual(SConsGnuArguments.InstallDirs.Staged(env, '/stage')['bindir'], '/stage/usr/bin')
+        calls = []
+        def subst(s, *args, **kw):
+            calls.append(s)
+            return s
+        env.subst = subst
+        self.assertEqual(SConsGnuArguments.InstallDirs.Staged(env, '/stage')['bindir'], '/stage/usr/bin')
+        self.assertEqual(SConsGnuArguments.InstallDirs.Staged(env, '/other')['bindir'], '/other/usr/bin')
+        self.assertListEqual(calls, [])
+        del env.subst
+        env['prefix'] = '/opt'
+        self.assertEqual(SConsGnuArguments.InstallDirs.Staged(env, '/stage')['bindir'], '/stage/opt/bin')
+
+class Test_Dirs(unittest.TestCase):
+    def test_Dirs_1(self):
+        """InstallDirs.Dirs(env) should return Dir nodes of resolved directories"""
+        import SCons.Environment
+        env = SCons.Environment.Environment(tools = [], package = 'pkg', install_package = 'ipkg')
+        env.Replace(**dict((t[0], t[2]) for t in _test_arg_triples))
+        dirs = SConsGnuArguments.InstallDirs.Dirs(env)
+        self.assertIs(dirs['pkglibdir'], env.Dir('/usr/local/lib/pkg'))
+        env['prefix'] = '/usr'
+        self.assertIs(SConsGnuArguments.InstallDirs.Dirs(env)['pkglibdir'], env.Dir('/usr/lib/pkg'))
+
+    def test_Dirs_2(self):
+        """InstallDirs.Dirs(env, name) should return single Dir node"""
+        import SCons.Environment
+        env = SCons.Environment.Environment(tools = [], package = 'pkg', install_package = 'ipkg')
+        env.Replace(**dict((t[0], t[2]) for t in _test_arg_triples))
+        self.assertIs(SConsGnuArguments.InstallDirs.Dirs(env, 'bindir'), env.Dir('/usr/local/bin'))
+        env['package'] = 'pkg2'
+        self.assertIs(SConsGnuArguments.InstallDirs.Dirs(env, 'pkglibdir'), env.Dir('/usr/local/lib/pkg2'))
+
+class Test_Resolver(unittest.TestCase):
+    def test_Resolver_1(self):
+        """InstallDirs.Resolver(env).update_names() should only recompute dependents"""
+        import SCons.Environment
+        env = SCons.Environment.Environment(tools = [], package = 'pkg', install_package = 'ipkg')
+        env.Replace(**dict((t[0], t[2]) for t in _test_arg_triples))
+        dirs = SConsGnuArguments.InstallDirs.Resolver(env)
+        self.assertEqual(dirs['docdir'], '/usr/local/share/doc/ipkg')
+        recomputed = dirs.update_names({'libdir' : '${exec_prefix}/lib64'})
+        self.assertListEqual(recomputed, ['libdir', 'pkglibdir'])
+        self.assertEqual(dirs['pkglibdir'], '/usr/local/lib64/pkg')
+        recomputed = dirs.update_names({'datarootdir' : '/usr/share'})
+        self.assertTrue('docdir' in recomputed)
+        self.assertTrue('man1dir' in recomputed)
+        self.assertFalse('libdir' in recomputed)
+        self.assertEqual(dirs.as_dict()['man1dir'], '/usr/share/man/man1')
+
+    def test_Resolver_2(self):
+        """InstallDirs.Resolver(env).staged() should stage current values"""
+        import SCons.Environment
+        env = SCons.Environment.Environment(tools = [], package = 'pkg', install_package = 'ipkg')
+        env.Replace(**dict((t[0], t[2]) for t in _test_arg_triples))
+        dirs = SConsGnuArguments.InstallDirs.Resolver(env)
+        staged = dirs.staged('/stage')
+        self.assertEqual(dirs['libdir'], '/usr/local/lib')
+        self.assertEqual(staged['libdir'], '/stage/usr/local/lib')
+        self.assertFalse('man1ext' in staged)
+        staged['libdir'] = 'modified'
+        self.assertEqual(dirs.staged('/stage')['libdir'], '/stage/usr/local/lib')
+        dirs.update_names({'libdir' : '${exec_prefix}/lib64'})
+        self.assertEqual(dirs.staged('/stage')['libdir'], '/stage/usr/local/lib64')
+
 #############################################################################
 if __name__ == "__main__":
     ldr = unittest.TestLoader()
@@ -452,6 +621,11 @@ if __name__ == "__main__":
     tclasses = [ Test__std_arg_triples
                , Test_Names
                , Test_Declarations
+               , Test_man_sections
+               , Test_Resolve
+               , Test_Staged
+               , Test_Dirs
+               , Test_Resolver
                ]
 
     for tclass in tclasses:
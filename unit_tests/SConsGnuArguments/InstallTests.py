@@ -0,0 +1,376 @@
+""" SConsGnuArguments.InstallTests
+
+Unit tests for SConsGnuArguments.Install
+"""
+
+__docformat__ = "restructuredText"
+
+#
+# Copyright (c) 2015-2016 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import SConsGnuArguments.Install
+import SConsGnuArguments.Util
+import unittest
+import sys
+import os
+
+#############################################################################
+class _TmpDirTestCase(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.tmpdir = tempfile.mkdtemp()
+        self.srcdir = os.path.join(self.tmpdir, 'src')
+        os.mkdir(self.srcdir)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmpdir)
+
+    def mkfile(self, name, content):
+        path = os.path.join(self.srcdir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+#############################################################################
+class Test_InstallFiles(_TmpDirTestCase):
+    """Test SConsGnuArguments.Install.InstallFiles()"""
+    def test_InstallFiles_1(self):
+        """InstallFiles() should copy files into (new) directories"""
+        foo = self.mkfile('foo', b'foo contents')
+        bar = self.mkfile('bar', b'x' * (3 << 20))
+        dst = os.path.join(self.tmpdir, 'a', 'b')
+        pairs = [ (foo, os.path.join(dst, 'foo')),
+                  (bar, os.path.join(dst, 'bar')),
+                  (foo, os.path.join(self.tmpdir, 'c', 'foo')) ]
+        self.assertEqual(SConsGnuArguments.Install.InstallFiles(pairs), 3)
+        self.assertEqual(self.read(os.path.join(dst, 'foo')), b'foo contents')
+        self.assertEqual(self.read(os.path.join(dst, 'bar')), b'x' * (3 << 20))
+        self.assertEqual(self.read(os.path.join(self.tmpdir, 'c', 'foo')), b'foo contents')
+        self.assertEqual(sorted(os.listdir(dst)), ['bar', 'foo'])
+
+    def test_InstallFiles_2(self):
+        """InstallFiles() should replace existing files and set modes"""
+        foo = self.mkfile('foo', b'new')
+        dst = os.path.join(self.tmpdir, 'foo')
+        with open(dst, 'wb') as f:
+            f.write(b'old contents')
+        SConsGnuArguments.Install.InstallFiles([(foo, dst)], 0o755)
+        self.assertEqual(self.read(dst), b'new')
+        if sys.platform != 'win32':
+            self.assertEqual(os.stat(dst).st_mode & 0o777, 0o755)
+
+    def test_InstallFiles_3(self):
+        """InstallFiles() should install empty files"""
+        foo = self.mkfile('foo', b'')
+        dst = os.path.join(self.tmpdir, 'foo')
+        SConsGnuArguments.Install.InstallFiles([(foo, dst)])
+        self.assertEqual(self.read(dst), b'')
+
+#############################################################################
+class Test_InstallAction(_TmpDirTestCase):
+    """Test SConsGnuArguments.Install.InstallAction()"""
+    def env(self, **kw):
+        import SCons.Environment
+        return SCons.Environment.Environment(tools = [], **kw)
+
+    def test_InstallAction_1(self):
+        """InstallAction('INSTALL_PROGRAM') should install files with mode 0755"""
+        foo = self.mkfile('foo', b'#!/bin/sh\n')
+        env = self.env()
+        dst = os.path.join(self.tmpdir, 'bin', 'foo')
+        action = SConsGnuArguments.Install.InstallAction('INSTALL_PROGRAM')
+        self.assertEqual(action([env.File(dst)], [env.File(foo)], env, show = False), 0)
+        self.assertEqual(self.read(dst), b'#!/bin/sh\n')
+        if sys.platform != 'win32':
+            self.assertEqual(os.stat(dst).st_mode & 0o777, 0o755)
+
+    def test__external_program_1(self):
+        """_external_program() should be True only if the user set INSTALL command"""
+        _external_program = SConsGnuArguments.Install._external_program
+        self.assertFalse(_external_program(self.env(), 'INSTALL_DATA'))
+        self.assertFalse(_external_program(self.env(INSTALL = lambda *args : 0), 'INSTALL_DATA'))
+        self.assertFalse(_external_program(self.env(INSTALL_DATA = '${INSTALL}'), 'INSTALL_DATA'))
+        self.assertTrue(_external_program(self.env(INSTALL = 'install -c'), 'INSTALL_DATA'))
+        self.assertTrue(_external_program(self.env(INSTALL_DATA = 'install -m 644'), 'INSTALL_DATA'))
+
+    def test__external_program_2(self):
+        """_external_program() should ignore programs found by AltPrograms.Detect()"""
+        import SConsGnuArguments.AltPrograms
+        _external_program = SConsGnuArguments.Install._external_program
+        detected = SConsGnuArguments.AltPrograms._detected_programs
+        saved = dict(detected)
+        try:
+            SConsGnuArguments.AltPrograms._remember_detected({ 'INSTALL' : '/x/bin/install -c' })
+            self.assertFalse(_external_program(self.env(INSTALL = '/x/bin/install -c'), 'INSTALL_DATA'))
+            self.assertTrue(_external_program(self.env(INSTALL = '/y/bin/install'), 'INSTALL_DATA'))
+            _command_line_arguments = SConsGnuArguments.Util._command_line_arguments
+            SConsGnuArguments.Util._command_line_arguments = lambda : { 'INSTALL' : '/x/bin/install -c' }
+            try:
+                self.assertTrue(_external_program(self.env(INSTALL = '/x/bin/install -c'), 'INSTALL_DATA'))
+            finally:
+                SConsGnuArguments.Util._command_line_arguments = _command_line_arguments
+        finally:
+            detected.clear()
+            detected.update(saved)
+
+    def test__external_command_1(self):
+        """_external_command() should pass mode to $INSTALL"""
+        _external_command = SConsGnuArguments.Install._external_command
+        env = self.env(INSTALL = 'install', INSTALL_DATA = '${INSTALL}')
+        self.assertEqual(_external_command(env, 'INSTALL_DATA', 0o644), '$INSTALL -m 644 $SOURCE $TARGET')
+        self.assertEqual(_external_command(env, 'INSTALL', 0o755), '$INSTALL -m 755 $SOURCE $TARGET')
+        env = self.env(INSTALL = 'install', INSTALL_DATA = 'install -m 600')
+        self.assertEqual(_external_command(env, 'INSTALL_DATA', 0o644), '$INSTALL_DATA $SOURCE $TARGET')
+
+    @unittest.skipIf(sys.platform == 'win32', "requires POSIX install")
+    def test_InstallAction_2(self):
+        """InstallAction() should run external program if the user set INSTALL"""
+        foo = self.mkfile('foo', b'foo')
+        os.chmod(foo, 0o755)
+        env = self.env(INSTALL = 'install', INSTALL_DATA = '${INSTALL}')
+        dst = os.path.join(self.tmpdir, 'foo')
+        action = SConsGnuArguments.Install.InstallAction('INSTALL_DATA')
+        self.assertEqual(action([env.File(dst)], [env.File(foo)], env, show = False), 0)
+        self.assertEqual(self.read(dst), b'foo')
+        self.assertEqual(os.stat(dst).st_mode & 0o777, 0o644)
+
+#############################################################################
+class Test_PlanDirs(_TmpDirTestCase):
+    """Test SConsGnuArguments.Install.PlanDirs() and MakeDirs()"""
+    def test_PlanDirs_1(self):
+        """PlanDirs() should list missing directories once, parents first"""
+        share = os.path.join(self.tmpdir, 'usr', 'share')
+        dirs = [ os.path.join(share, 'man', 'man1'), os.path.join(share, 'man', 'man2'),
+                 os.path.join(share, 'doc'), self.srcdir ]
+        files = [ os.path.join(share, 'man', 'man1', 'foo.1'), os.path.join(share, 'locale', 'x.mo') ]
+        plan = SConsGnuArguments.Install.PlanDirs(dirs, files)
+        self.assertEqual(plan, [ os.path.join(self.tmpdir, 'usr'), share,
+                                 os.path.join(share, 'doc'), os.path.join(share, 'locale'),
+                                 os.path.join(share, 'man'), os.path.join(share, 'man', 'man1'),
+                                 os.path.join(share, 'man', 'man2') ])
+        self.assertEqual(SConsGnuArguments.Install.MakeDirs(plan), 7)
+        for d in plan:
+            self.assertTrue(os.path.isdir(d))
+        self.assertEqual(SConsGnuArguments.Install.PlanDirs(dirs, files), [])
+
+#############################################################################
+class Test_InstallParallel(_TmpDirTestCase):
+    """Test SConsGnuArguments.Install.InstallParallel()"""
+    def test_InstallParallel_1(self):
+        """InstallParallel() should install all files and count them"""
+        items = []
+        for i in range(50):
+            src = self.mkfile('f%d' % i, b'x' * i)
+            items.append((src, os.path.join(self.tmpdir, 'd%d' % (i % 3), 'f%d' % i), 0o644))
+        stats = SConsGnuArguments.Install.InstallParallel(items, jobs = 4, depth = 2)
+        self.assertEqual(stats.files, 50)
+        self.assertEqual(stats.size, sum(range(50)))
+        for (_, dst, _) in items:
+            self.assertEqual(len(self.read(dst)), int(os.path.basename(dst)[1:]))
+        self.assertIn('installed 50 files', str(stats))
+
+    def test_InstallParallel_2(self):
+        """InstallParallel() should re-raise errors of workers"""
+        items = [(os.path.join(self.srcdir, 'missing'), os.path.join(self.tmpdir, 'missing'), 0o644)]
+        with self.assertRaises(EnvironmentError):
+            SConsGnuArguments.Install.InstallParallel(items)
+
+#############################################################################
+class Test_InstallManifest(_TmpDirTestCase):
+    """Test SConsGnuArguments.Install.InstallManifest and Uninstall()"""
+    def setUp(self):
+        super(Test_InstallManifest, self).setUp()
+        SConsGnuArguments.Util._JsonStore._stores.clear()
+        self.manifest = os.path.join(self.tmpdir, 'manifest.json')
+        self.items = []
+        for name in ('foo', 'bar'):
+            src = self.mkfile(name, name.encode('ascii'))
+            self.items.append((src, os.path.join(self.tmpdir, 'usr', 'share', 'x', name), 0o644))
+
+    def test_InstallParallel_1(self):
+        """InstallParallel(manifest=...) should skip unchanged files"""
+        InstallParallel = SConsGnuArguments.Install.InstallParallel
+        self.assertEqual(InstallParallel(self.items, manifest = self.manifest).files, 2)
+        stats = InstallParallel(self.items, manifest = self.manifest)
+        self.assertEqual((stats.files, stats.skipped), (0, 2))
+        # touched but not modified source
+        st = os.stat(self.items[0][0])
+        os.utime(self.items[0][0], (st.st_atime, st.st_mtime + 10))
+        stats = InstallParallel(self.items, manifest = self.manifest)
+        self.assertEqual((stats.files, stats.skipped), (0, 2))
+        # modified source
+        self.mkfile('bar', b'new bar')
+        stats = InstallParallel(self.items, manifest = self.manifest)
+        self.assertEqual((stats.files, stats.skipped), (1, 1))
+        self.assertEqual(self.read(self.items[1][1]), b'new bar')
+        # removed destination
+        os.remove(self.items[0][1])
+        stats = InstallParallel(self.items, manifest = self.manifest)
+        self.assertEqual((stats.files, stats.skipped), (1, 1))
+        self.assertEqual(self.read(self.items[0][1]), b'foo')
+
+    def test_Uninstall_1(self):
+        """Uninstall() should remove installed files and empty directories"""
+        SConsGnuArguments.Install.InstallParallel(self.items, manifest = self.manifest)
+        with open(os.path.join(self.tmpdir, 'usr', 'keep'), 'w') as f:
+            f.write('keep')
+        self.assertEqual(SConsGnuArguments.Install.Uninstall(self.manifest), 2)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, 'usr', 'share')))
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir, 'usr', 'keep')))
+        self.assertEqual(SConsGnuArguments.Install.InstallManifest(self.manifest).files, {})
+
+    def test_Uninstall_2(self):
+        """Uninstall() should not remove directories which existed before installation"""
+        share = os.path.join(self.tmpdir, 'usr', 'share')
+        os.makedirs(share)
+        SConsGnuArguments.Install.InstallParallel(self.items, manifest = self.manifest)
+        self.assertEqual(SConsGnuArguments.Install.InstallManifest(self.manifest).dirs, [os.path.join(share, 'x')])
+        self.assertEqual(SConsGnuArguments.Install.Uninstall(self.manifest), 2)
+        self.assertFalse(os.path.exists(os.path.join(share, 'x')))
+        self.assertTrue(os.path.isdir(share))
+        self.assertEqual(SConsGnuArguments.Install.InstallManifest(self.manifest).dirs, [])
+
+#############################################################################
+class Test_InstallPlan(_TmpDirTestCase):
+    """Test SConsGnuArguments.Install.InstallPlan"""
+    def test_run_1(self):
+        """InstallPlan.run() should install files into destination variables"""
+        import SCons.Environment
+        prefix = os.path.join(self.tmpdir, 'usr')
+        env = SCons.Environment.Environment(tools = [], prefix = prefix,
+                                            bindir = '${prefix}/bin', man1dir = '${prefix}/man/man1')
+        plan = SConsGnuArguments.Install.InstallPlan()
+        plan.add('bindir', [self.mkfile('foo', b'foo')])
+        plan.add('man1dir', self.mkfile('foo.1', b'.TH'))
+        stats = plan.run(env)
+        self.assertEqual(stats.files, 2)
+        self.assertEqual(self.read(os.path.join(prefix, 'bin', 'foo')), b'foo')
+        self.assertEqual(self.read(os.path.join(prefix, 'man', 'man1', 'foo.1')), b'.TH')
+        if sys.platform != 'win32':
+            self.assertEqual(os.stat(os.path.join(prefix, 'bin', 'foo')).st_mode & 0o777, 0o755)
+            self.assertEqual(os.stat(os.path.join(prefix, 'man', 'man1', 'foo.1')).st_mode & 0o777, 0o644)
+
+    def test_run_2(self):
+        """InstallPlan(destdir).run() should install files under destdir"""
+        import SCons.Environment
+        stage = os.path.join(self.tmpdir, 'stage')
+        env = SCons.Environment.Environment(tools = [], prefix = '/usr', exec_prefix = '${prefix}',
+                                            bindir = '${exec_prefix}/bin', mydir = '/opt/my')
+        plan = SConsGnuArguments.Install.InstallPlan(stage)
+        plan.add('bindir', self.mkfile('foo', b'foo'))
+        plan.add('mydir', self.mkfile('bar', b'bar'))
+        self.assertEqual(plan.run(env).files, 2)
+        self.assertEqual(self.read(os.path.join(stage, 'usr', 'bin', 'foo')), b'foo')
+        self.assertEqual(self.read(os.path.join(stage, 'opt', 'my', 'bar')), b'bar')
+
+    def test_Command_1(self):
+        """InstallPlan.Command(manifest=...) should install only changed files when rebuilt"""
+        import SCons.Environment
+        try:
+            from StringIO import StringIO
+        except ImportError:
+            from io import StringIO
+        SConsGnuArguments.Util._JsonStore._stores.clear()
+        prefix = os.path.join(self.tmpdir, 'usr')
+        env = SCons.Environment.Environment(tools = [], prefix = prefix, pkgdatadir = '${prefix}/share/pkg')
+        plan = SConsGnuArguments.Install.InstallPlan()
+        plan.add('pkgdatadir', [self.mkfile(name, name.encode('ascii')) for name in ('a', 'b', 'c')])
+        targets = plan.Command(env, manifest = os.path.join(self.tmpdir, 'manifest.json'))
+        self.assertTrue(all(t.precious for t in targets))
+        def build():
+            # what SCons does with out-of-date targets
+            for t in targets:
+                t.prepare()
+            stdout = sys.stdout
+            sys.stdout = StringIO()
+            try:
+                targets[0].build()
+                return sys.stdout.getvalue()
+            finally:
+                sys.stdout = stdout
+        self.assertTrue('installed 3 files' in build())
+        self.mkfile('b', b'new b')
+        output = build()
+        self.assertTrue('installed 1 files' in output)
+        self.assertTrue('2 unchanged files skipped' in output)
+        self.assertEqual(self.read(os.path.join(prefix, 'share', 'pkg', 'b')), b'new b')
+
+    def test_Command_2(self):
+        """InstallPlan.Command(manifest=...) should record directories, so Uninstall() removes them"""
+        import SCons.Environment
+        try:
+            from StringIO import StringIO
+        except ImportError:
+            from io import StringIO
+        SConsGnuArguments.Util._JsonStore._stores.clear()
+        prefix = os.path.join(self.tmpdir, 'root')
+        manifest = os.path.join(self.tmpdir, 'manifest.json')
+        env = SCons.Environment.Environment(tools = [], prefix = prefix, bindir = '${prefix}/bin',
+                                            pkgdatadir = '${prefix}/share/pkg')
+        plan = SConsGnuArguments.Install.InstallPlan()
+        plan.add('bindir', self.mkfile('prog', b'prog'))
+        plan.add('pkgdatadir', self.mkfile('data', b'data'))
+        targets = plan.Command(env, manifest = manifest)
+        # SCons creates the target directories before running the action
+        for t in targets:
+            t.prepare()
+        self.assertTrue(os.path.isdir(os.path.join(prefix, 'share', 'pkg')))
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            targets[0].build()
+        finally:
+            sys.stdout = stdout
+        self.assertEqual(self.read(os.path.join(prefix, 'bin', 'prog')), b'prog')
+        SConsGnuArguments.Util._JsonStore._stores.clear()
+        self.assertEqual(SConsGnuArguments.Install.Uninstall(manifest), 2)
+        self.assertFalse(os.path.exists(prefix))
+        self.assertTrue(os.path.isdir(self.tmpdir))
+
+#############################################################################
+if __name__ == "__main__":
+    ldr = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    # Load tests to test suite
+    tclasses = [ Test_InstallFiles
+               , Test_InstallAction
+               , Test_PlanDirs
+               , Test_InstallParallel
+               , Test_InstallManifest
+               , Test_InstallPlan
+               ]
+
+    for tclass in tclasses:
+        suite.addTests(ldr.loadTestsFromTestCase(tclass))
+
+    if not unittest.TextTestRunner(verbosity = 2).run(suite).wasSuccessful():
+        sys.exit(1)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
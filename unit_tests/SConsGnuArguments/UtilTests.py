@@ -0,0 +1,773 @@
+""" SConsGnuArguments.UtilTests
+
+Unit tests for SConsGnuArguments.Util
+"""
+
+__docformat__ = "restructuredText"
+
+#
+# Copyright (c) 2015-2016 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import SConsGnuArguments.Util
+import SConsArguments
+import unittest
+import sys
+
+_test_arg_triples = [
+    ( 'foo', 'Foo argument', 'FOO' ),
+    ( 'bar', 'Bar argument', '${foo}/bar' ),
+    ( 'baz', 'Baz argument', '${bar}/baz' ),
+    ( 'qux', 'Qux argument', '${foo}/qux' ),
+]
+
+#############################################################################
+class Test_ArgumentSpec(unittest.TestCase):
+    """Test SConsGnuArguments.Util.ArgumentSpec"""
+    def test___init___1(self):
+        """ArgumentSpec() should guess category and metavar"""
+        spec = SConsGnuArguments.Util.ArgumentSpec('bindir', 'Bin dir', '${prefix}/bin')
+        self.assertEqual(spec.category, 'dir')
+        self.assertEqual(spec.metavar, 'DIR')
+        spec = SConsGnuArguments.Util.ArgumentSpec('man1ext', 'Ext', '.1')
+        self.assertEqual(spec.category, 'ext')
+        self.assertEqual(spec.metavar, 'EXT')
+        spec = SConsGnuArguments.Util.ArgumentSpec('AWK', 'Awk', None)
+        self.assertIsNone(spec.category)
+        self.assertEqual(spec.metavar, 'X')
+
+    def test_triple_1(self):
+        """ArgumentSpec should behave as triple (name, help, default)"""
+        spec = SConsGnuArguments.Util.ArgumentSpec('foo', 'Foo argument', 'FOO', metavar = 'F')
+        (name, hlp, default) = spec
+        self.assertEqual((name, hlp, default), ('foo', 'Foo argument', 'FOO'))
+        self.assertEqual(spec[0], 'foo')
+        self.assertEqual(spec[2], 'FOO')
+        self.assertEqual(len(spec), 3)
+        self.assertEqual(spec, ('foo', 'Foo argument', 'FOO'))
+        self.assertEqual(('foo', 'Foo argument', 'FOO'), spec)
+
+    def test_immutable_1(self):
+        """ArgumentSpec should be immutable and have no __dict__"""
+        spec = SConsGnuArguments.Util.ArgumentSpec('foo', 'Foo argument', 'FOO')
+        def assign():
+            spec.name = 'bar'
+        self.assertRaises(AttributeError, assign)
+        self.assertFalse(hasattr(spec, '__dict__'))
+        def assign_category():
+            spec.category = 'dir'
+        self.assertRaises(AttributeError, assign_category)
+
+    def test_tuple_1(self):
+        """ArgumentSpec should be a tuple and keep category and metavar when pickled"""
+        import pickle
+        spec = SConsGnuArguments.Util.ArgumentSpec('foo', 'Foo argument', 'FOO', category = 'dir', metavar = 'F')
+        self.assertIsInstance(spec, tuple)
+        self.assertEqual(tuple(spec), ('foo', 'Foo argument', 'FOO'))
+        self.assertEqual(hash(spec), hash(('foo', 'Foo argument', 'FOO')))
+        self.assertNotEqual(spec, SConsGnuArguments.Util.ArgumentSpec('foo', 'Foo argument', 'FOO'))
+        copy = pickle.loads(pickle.dumps(spec, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(copy, spec)
+        self.assertEqual((copy.category, copy.metavar), ('dir', 'F'))
+
+    def test_help_1(self):
+        """ArgumentSpecs should share interned help strings"""
+        help1 = ''.join(['Foo', ' argument'])
+        help2 = ''.join(['Foo', ' argument'])
+        spec1 = SConsGnuArguments.Util.ArgumentSpec('foo', help1, 'FOO')
+        spec2 = SConsGnuArguments.Util.ArgumentSpec('bar', help2, 'BAR')
+        self.assertIs(spec1.help, spec2.help)
+
+    def test_metavar_1(self):
+        """_declaration_pairs(registry) should use metavars from ArgumentSpecs"""
+        reg = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        reg.append(SConsGnuArguments.Util.ArgumentSpec('foo', 'Foo argument', 'FOO', metavar = 'F'))
+        decls = dict(SConsGnuArguments.Util._declaration_pairs(reg, {}))
+        self.assertEqual(decls['foo']['metavar'], 'F')
+        self.assertEqual(decls['bar']['metavar'], 'X')
+
+#############################################################################
+class Test__ArgumentRegistry(unittest.TestCase):
+    """Test SConsGnuArguments.Util._ArgumentRegistry"""
+    def test___init___1(self):
+        """_ArgumentRegistry() should create empty registry"""
+        reg = SConsGnuArguments.Util._ArgumentRegistry()
+        self.assertEqual(len(reg), 0)
+        self.assertListEqual(list(reg), [])
+
+    def test___init___2(self):
+        """_ArgumentRegistry(triples) should keep triples in original order"""
+        reg = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        self.assertEqual(len(reg), 4)
+        self.assertListEqual(list(reg), _test_arg_triples)
+
+    def test___getitem___1(self):
+        """_ArgumentRegistry(triples)[name] should return triple for name"""
+        reg = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        self.assertEqual(reg['baz'], _test_arg_triples[2])
+        self.assertRaises(KeyError, lambda : reg['inexistent'])
+        self.assertIsNone(reg.get('inexistent'))
+        self.assertTrue('foo' in reg)
+        self.assertFalse('inexistent' in reg)
+
+    def test_append_1(self):
+        """_ArgumentRegistry.append() should replace triple with same name"""
+        reg = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        reg.append(('bar', 'New bar', 'BAR'))
+        self.assertEqual(len(reg), 4)
+        self.assertEqual(reg['bar'], ('bar', 'New bar', 'BAR'))
+        self.assertEqual(list(reg)[1], ('bar', 'New bar', 'BAR'))
+
+    def test_select_1(self):
+        """_ArgumentRegistry.select() should return all triples"""
+        reg = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        self.assertListEqual(reg.select(), _test_arg_triples)
+
+    def test_select_2(self):
+        """_ArgumentRegistry.select(callable) should return filtered triples"""
+        reg = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        self.assertListEqual(reg.select(lambda s : s.startswith('ba')), _test_arg_triples[1:3])
+
+    def test_select_3(self):
+        """_ArgumentRegistry.select(collection) should return triples in registry order"""
+        reg = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        expect = [ _test_arg_triples[0], _test_arg_triples[3] ]
+        self.assertListEqual(reg.select(['qux', 'foo', 'inexistent']), expect)
+        self.assertListEqual(reg.select(('qux', 'foo', 'qux')), expect)
+        self.assertListEqual(reg.select(set(['qux', 'foo'])), expect)
+        self.assertListEqual(reg.select(frozenset(['qux', 'foo'])), expect)
+
+    def test_iterselect_1(self):
+        """_ArgumentRegistry.iterselect() should return iterator over selected triples"""
+        reg = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        res = reg.iterselect(['qux', 'foo'])
+        self.assertFalse(isinstance(res, list))
+        self.assertListEqual(list(res), [_test_arg_triples[0], _test_arg_triples[3]])
+        self.assertListEqual(list(reg.iterselect(lambda s : s == 'bar')), [_test_arg_triples[1]])
+
+    def test___init___factory_1(self):
+        """_ArgumentRegistry(factory) should call factory when first used"""
+        calls = []
+        def factory():
+            calls.append(1)
+            return _test_arg_triples
+        registry = SConsGnuArguments.Util._ArgumentRegistry(factory)
+        self.assertEqual(calls, [])
+        self.assertEqual(registry.generation, 0)
+        self.assertTrue('bar' in registry)
+        self.assertEqual(len(registry), 4)
+        self.assertEqual(calls, [1])
+        self.assertEqual(registry.generation, 0)
+
+#############################################################################
+class Test_map_triples(unittest.TestCase):
+    """Test SConsGnuArguments.Util.map_triples()"""
+    def test_map_triples_1(self):
+        """map_triples(callback, triples) should map all triples"""
+        res = SConsGnuArguments.Util.map_triples(lambda *x : x[0], _test_arg_triples)
+        self.assertListEqual(list(res), ['foo', 'bar', 'baz', 'qux'])
+
+    def test_map_triples_2(self):
+        """map_triples(callback, triples, set) should map selected triples"""
+        res = SConsGnuArguments.Util.map_triples(lambda *x : x[0], _test_arg_triples, set(['baz', 'foo']))
+        self.assertListEqual(list(res), ['foo', 'baz'])
+
+    def test_map_triples_3(self):
+        """map_triples(callback, registry, list) should map selected triples"""
+        reg = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        res = SConsGnuArguments.Util.map_triples(lambda *x : x[0], reg, ['baz', 'foo'])
+        self.assertListEqual(list(res), ['foo', 'baz'])
+
+    def test_map_triples_4(self):
+        """map_triples() should call callback only when the result is consumed"""
+        seen = []
+        def callback(*t):
+            seen.append(t[0])
+            return t[0]
+        res = SConsGnuArguments.Util.map_triples(callback, _test_arg_triples)
+        self.assertEqual(seen, [])
+        self.assertEqual(next(res), 'foo')
+        self.assertEqual(seen, ['foo'])
+        self.assertEqual(list(res), ['bar', 'baz', 'qux'])
+        self.assertEqual(seen, ['foo', 'bar', 'baz', 'qux'])
+
+    def test_names_from_triples_1(self):
+        """names_from_triples() should return an iterator over names"""
+        res = SConsGnuArguments.Util.names_from_triples(_test_arg_triples, lambda s : s.startswith('ba'))
+        self.assertEqual(list(res), ['bar', 'baz'])
+
+#############################################################################
+class Test__DeclarationsCache(unittest.TestCase):
+    """Test SConsGnuArguments.Util._DeclarationsCache"""
+    def test_get_1(self):
+        """_DeclarationsCache().get(key) should return None for missing key"""
+        cache = SConsGnuArguments.Util._DeclarationsCache()
+        self.assertIsNone(cache.get('foo'))
+        self.assertEqual(cache.misses, 1)
+
+    def test_put_1(self):
+        """_DeclarationsCache(2) should evict least recently used entry"""
+        cache = SConsGnuArguments.Util._DeclarationsCache(2)
+        cache.put('foo', 'FOO')
+        cache.put('bar', 'BAR')
+        self.assertEqual(cache.get('foo'), 'FOO')
+        cache.put('baz', 'BAZ')
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('bar'))
+        self.assertEqual(cache.get('foo'), 'FOO')
+        self.assertEqual(cache.get('baz'), 'BAZ')
+
+#############################################################################
+class Test__fingerprint_kw(unittest.TestCase):
+    """Test SConsGnuArguments.Util._fingerprint_kw()"""
+    def test__fingerprint_kw_1(self):
+        """_fingerprint_kw() should not depend on order of names in name_filter"""
+        fp1 = SConsGnuArguments.Util._fingerprint_kw({'name_filter' : ['foo', 'bar']})
+        fp2 = SConsGnuArguments.Util._fingerprint_kw({'name_filter' : ('bar', 'foo')})
+        self.assertEqual(fp1, fp2)
+
+    def test__fingerprint_kw_2(self):
+        """_fingerprint_kw() should depend on defaults"""
+        fp1 = SConsGnuArguments.Util._fingerprint_kw({'defaults' : {'foo' : 'x'}})
+        fp2 = SConsGnuArguments.Util._fingerprint_kw({'defaults' : {'foo' : 'y'}})
+        self.assertNotEqual(fp1, fp2)
+
+    def test__fingerprint_kw_3(self):
+        """_fingerprint_kw() should raise TypeError for unhashable arguments"""
+        self.assertRaises(TypeError, SConsGnuArguments.Util._fingerprint_kw, {'foo' : bytearray()})
+
+#############################################################################
+class Test_arguments_from_triples(unittest.TestCase):
+    """Test SConsGnuArguments.Util.arguments_from_triples()"""
+    def setUp(self):
+        SConsGnuArguments.Util.enable_declarations_cache(4)
+
+    def tearDown(self):
+        SConsGnuArguments.Util.disable_declarations_cache()
+
+    def test_arguments_from_triples_1(self):
+        """arguments_from_triples(registry) should reuse memoized declarations"""
+        reg = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        cache = SConsGnuArguments.Util._declarations_cache
+        decls1 = SConsGnuArguments.Util.arguments_from_triples(reg, defaults = {'foo' : 'x'})
+        decls2 = SConsGnuArguments.Util.arguments_from_triples(reg, defaults = {'foo' : 'x'})
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 1)
+        self.assertIsNot(decls1, decls2)
+        self.assertEqual(type(decls2), SConsArguments._ArgumentDeclarations)
+        self.assertEqual(decls2['foo'].get_env_default(), 'x')
+        del decls1['foo']
+        decls3 = SConsGnuArguments.Util.arguments_from_triples(reg, defaults = {'foo' : 'x'})
+        self.assertTrue('foo' in decls3)
+
+    def test_arguments_from_triples_2(self):
+        """arguments_from_triples(registry) should distinguish keyword arguments"""
+        reg = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        decls1 = SConsGnuArguments.Util.arguments_from_triples(reg, env_key_prefix = 'A_')
+        decls2 = SConsGnuArguments.Util.arguments_from_triples(reg, env_key_prefix = 'B_')
+        self.assertEqual(decls1['foo'].get_env_key(), 'A_foo')
+        self.assertEqual(decls2['foo'].get_env_key(), 'B_foo')
+
+    def test_arguments_from_triples_3(self):
+        """arguments_from_triples(registry) should notice registry changes"""
+        reg = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        decls1 = SConsGnuArguments.Util.arguments_from_triples(reg)
+        reg.append(('foo', 'New foo', 'NEWFOO'))
+        decls2 = SConsGnuArguments.Util.arguments_from_triples(reg)
+        self.assertEqual(decls1['foo'].get_env_default(), 'FOO')
+        self.assertEqual(decls2['foo'].get_env_default(), 'NEWFOO')
+
+#############################################################################
+class _CountingNameConv(SConsArguments._ArgumentNameConv):
+    def __init__(self, **kw):
+        super(_CountingNameConv, self).__init__(**kw)
+        self.calls = []
+
+    def name2dict(self, name):
+        self.calls.append(name)
+        return super(_CountingNameConv, self).name2dict(name)
+
+#############################################################################
+class Test_endpoint_names(unittest.TestCase):
+    """Test SConsGnuArguments.Util.endpoint_names()"""
+    def test_endpoint_names_1(self):
+        """endpoint_names() should compute endpoint names for all names"""
+        res = SConsGnuArguments.Util.endpoint_names(['foo', 'bar'], env_key_prefix = 'E_', opt_key_transform = False)
+        self.assertEqual(sorted(res.keys()), ['bar', 'foo'])
+        expect = SConsArguments._ArgumentNameConv(env_key_prefix = 'E_', opt_key_transform = False).name2dict('foo')
+        self.assertEqual(res['foo'], expect)
+        self.assertEqual(res['foo']['env_key'], 'E_foo')
+
+    def test_endpoint_names_2(self):
+        """endpoint_names() should convert each name only once per nameconv"""
+        nameconv = _CountingNameConv()
+        SConsGnuArguments.Util.endpoint_names(['foo', 'bar'], nameconv = nameconv)
+        res = SConsGnuArguments.Util.endpoint_names(['bar', 'baz'], nameconv = nameconv)
+        self.assertEqual(nameconv.calls, ['foo', 'bar', 'baz'])
+        res['bar']['env_key'] = 'XXX'
+        again = SConsGnuArguments.Util.endpoint_names(['bar'], nameconv = nameconv)
+        self.assertEqual(again['bar']['env_key'], 'bar')
+
+    def test__endpoint_table_1(self):
+        """_endpoint_table() should be shared by equal name conventions"""
+        table1 = SConsGnuArguments.Util._endpoint_table({ 'env_key_prefix' : 'T_', 'defaults' : { 'foo' : 'x' } })
+        table2 = SConsGnuArguments.Util._endpoint_table({ 'env_key_prefix' : 'T_', 'name_filter' : ['foo'] })
+        table3 = SConsGnuArguments.Util._endpoint_table({ 'env_key_prefix' : 'U_' })
+        self.assertIs(table1, table2)
+        self.assertIsNot(table1, table3)
+
+    def test_arguments_from_triples_1(self):
+        """arguments_from_triples() should convert names via endpoint table"""
+        nameconv = _CountingNameConv()
+        SConsGnuArguments.Util.arguments_from_triples(_test_arg_triples, nameconv = nameconv)
+        decls = SConsGnuArguments.Util.arguments_from_triples(_test_arg_triples, nameconv = nameconv, defaults = { 'foo' : 'F' })
+        self.assertEqual(nameconv.calls, ['foo', 'bar', 'baz', 'qux'])
+        self.assertEqual(decls['foo'].get_env_default(), 'F')
+        self.assertEqual(decls['foo'].get_env_key(), 'foo')
+
+#############################################################################
+class Test__LazyArgumentDeclarations(unittest.TestCase):
+    """Test SConsGnuArguments.Util._LazyArgumentDeclarations"""
+    @unittest.skipUnless(SConsGnuArguments.Util._lazy_supported, "lazy declarations require python 3")
+    def test_lazy_1(self):
+        """arguments_from_triples(triples, lazy=True) should build declarations on demand"""
+        decls = SConsGnuArguments.Util.arguments_from_triples(_test_arg_triples, lazy = True)
+        self.assertIsInstance(decls, SConsArguments._ArgumentDeclarations)
+        self.assertEqual(len(decls), 4)
+        self.assertTrue('baz' in decls)
+        self.assertFalse(decls.is_built('baz'))
+        self.assertEqual(decls['baz'].get_env_default(), '${bar}/baz')
+        self.assertTrue(decls.is_built('baz'))
+        self.assertFalse(decls.is_built('foo'))
+        self.assertEqual(len(decls), 4)
+
+    @unittest.skipUnless(SConsGnuArguments.Util._lazy_supported, "lazy declarations require python 3")
+    def test_lazy_2(self):
+        """_LazyArgumentDeclarations should build all declarations when iterated"""
+        decls = SConsGnuArguments.Util.arguments_from_triples(_test_arg_triples, lazy = True,
+                                                              name_filter = ['foo', 'bar'])
+        self.assertEqual(sorted(decls.keys()), ['bar', 'foo'])
+        self.assertTrue(decls.is_built('foo'))
+        self.assertTrue(decls.is_built('bar'))
+        for decl in decls.values():
+            self.assertIsInstance(decl, SConsArguments._ArgumentDeclaration)
+
+    def test_lazy_3(self):
+        """_LazyArgumentDeclarations should support deletion of pending declarations"""
+        decls = SConsGnuArguments.Util.arguments_from_triples(_test_arg_triples, lazy = True)
+        del decls['foo']
+        self.assertFalse('foo' in decls)
+        self.assertEqual(len(decls), 3)
+        self.assertIsNone(decls.get('foo'))
+
+    def test_lazy_4(self):
+        """dict(decls) should contain all the declarations, built or not"""
+        decls = SConsGnuArguments.Util.arguments_from_triples(_test_arg_triples, lazy = True)
+        decls['foo']
+        copy = dict(decls)
+        self.assertEqual(sorted(copy.keys()), ['bar', 'baz', 'foo', 'qux'])
+        self.assertEqual(copy['baz'].get_env_default(), '${bar}/baz')
+
+    def test_lazy_5(self):
+        """other.update(decls) should take all the declarations, built or not"""
+        decls = SConsGnuArguments.Util.arguments_from_triples(_test_arg_triples, lazy = True)
+        decls['foo']
+        other = SConsArguments.DeclareArguments()
+        other.update(decls)
+        self.assertEqual(sorted(other.keys()), ['bar', 'baz', 'foo', 'qux'])
+        self.assertEqual(len(SConsArguments.DeclareArguments(decls)), 4)
+        plain = {}
+        plain.update(decls)
+        self.assertEqual(len(plain), 4)
+
+#############################################################################
+class Test_references(unittest.TestCase):
+    """Test SConsGnuArguments.Util.references()"""
+    def test_references_1(self):
+        """references() should find ${name} and $name references"""
+        refs = SConsGnuArguments.Util.references('${datarootdir}/doc/$package/${datarootdir}')
+        self.assertListEqual(refs, ['datarootdir', 'package'])
+
+    def test_references_2(self):
+        """references() should skip escaped dollars and non-strings"""
+        self.assertListEqual(SConsGnuArguments.Util.references('$$foo/bar'), [])
+        self.assertListEqual(SConsGnuArguments.Util.references(None), [])
+
+#############################################################################
+class Test_toposort(unittest.TestCase):
+    """Test SConsGnuArguments.Util.toposort()"""
+    def test_toposort_1(self):
+        """toposort() should put dependencies first"""
+        order = SConsGnuArguments.Util.toposort([('c', ['b']), ('b', ['a', 'x']), ('a', []), ('d', [])])
+        self.assertListEqual(order, ['a', 'd', 'b', 'c'])
+
+    def test_toposort_2(self):
+        """toposort() should raise UserError on cyclic dependencies"""
+        import SCons.Errors
+        self.assertRaises(SCons.Errors.UserError, SConsGnuArguments.Util.toposort,
+                          [('a', ['b']), ('b', ['a']), ('c', [])])
+
+#############################################################################
+class Test__Resolver(unittest.TestCase):
+    """Test SConsGnuArguments.Util._Resolver"""
+    def test_resolve_1(self):
+        """_Resolver(templates).resolve() should expand references within the set"""
+        resolver = SConsGnuArguments.Util._Resolver([ (t[0], t[2]) for t in _test_arg_triples ])
+        values = resolver.resolve()
+        self.assertEqual(values, { 'foo' : 'FOO', 'bar' : 'FOO/bar',
+                                   'baz' : 'FOO/bar/baz', 'qux' : 'FOO/qux' })
+
+    def test_resolve_2(self):
+        """_Resolver(templates).resolve(subst) should pass remaining references to subst"""
+        calls = []
+        def subst(s):
+            calls.append(s)
+            return s.replace('${pkg}', 'PKG')
+        resolver = SConsGnuArguments.Util._Resolver({ 'foo' : '/usr', 'bar' : '${foo}/${pkg}' })
+        values = resolver.resolve(subst)
+        self.assertEqual(values, { 'foo' : '/usr', 'bar' : '/usr/PKG' })
+        self.assertListEqual(calls, ['/usr/${pkg}'])
+
+    def test_update_1(self):
+        """_Resolver.update() should recompute only transitive dependents"""
+        resolver = SConsGnuArguments.Util._Resolver([ (t[0], t[2]) for t in _test_arg_triples ])
+        resolver.resolve()
+        self.assertListEqual(resolver.update({'bar' : '${foo}/BAR'}), ['bar', 'baz'])
+        self.assertEqual(resolver.values['baz'], 'FOO/BAR/baz')
+        self.assertEqual(resolver.values['qux'], 'FOO/qux')
+
+    def test_update_2(self):
+        """_Resolver.update() should stop at unchanged values"""
+        resolver = SConsGnuArguments.Util._Resolver([ (t[0], t[2]) for t in _test_arg_triples ])
+        resolver.resolve()
+        self.assertListEqual(resolver.update({'bar' : 'FOO/bar'}), ['bar'])
+
+    def test_update_3(self):
+        """_Resolver.update() should follow new references"""
+        resolver = SConsGnuArguments.Util._Resolver([ (t[0], t[2]) for t in _test_arg_triples ])
+        resolver.resolve()
+        self.assertListEqual(resolver.update({'bar' : '${qux}/bar'}), ['bar', 'baz'])
+        self.assertEqual(resolver.values['baz'], 'FOO/qux/bar/baz')
+        self.assertListEqual(resolver.update({'foo' : 'X'}), ['foo', 'qux', 'bar', 'baz'])
+        self.assertEqual(resolver.values['baz'], 'X/qux/bar/baz')
+
+#############################################################################
+class Test_resolve_triples(unittest.TestCase):
+    """Test SConsGnuArguments.Util.resolve_triples()"""
+    def test_resolve_triples_1(self):
+        """resolve_triples(triples, env) should return values equal to env.subst()"""
+        import SCons.Environment
+        env = SCons.Environment.Environment(tools = [], foo = '${xyz}', bar = '${foo}/bar',
+                                            baz = '${bar}/baz', xyz = 'XYZ')
+        values = SConsGnuArguments.Util.resolve_triples(_test_arg_triples, env)
+        self.assertEqual(values, { 'foo' : 'XYZ', 'bar' : 'XYZ/bar', 'baz' : 'XYZ/bar/baz' })
+        for (k, v) in values.items():
+            self.assertEqual(v, env.subst('${%s}' % k))
+
+    def test_resolve_triples_3(self):
+        """resolve_triples() should not substitute escaped dollars twice"""
+        import SCons.Environment
+        env = SCons.Environment.Environment(tools = [], foo = '/opt/a$$b', bar = '${foo}/bar',
+                                            baz = '${bar}/$$baz')
+        values = SConsGnuArguments.Util.resolve_triples(_test_arg_triples, env)
+        self.assertEqual(values, { 'foo' : '/opt/a$b', 'bar' : '/opt/a$b/bar', 'baz' : '/opt/a$b/bar/$baz' })
+        for (k, v) in values.items():
+            self.assertEqual(v, env.subst('${%s}' % k))
+
+    def test_resolve_triples_4(self):
+        """resolve_triples() should compress whitespace as env.subst() does"""
+        import SCons.Environment
+        env = SCons.Environment.Environment(tools = [], foo = ' /opt/a  b ', bar = '${foo}/bar',
+                                            baz = '${bar}\t/baz')
+        values = SConsGnuArguments.Util.resolve_triples(_test_arg_triples, env)
+        self.assertEqual(values, { 'foo' : '/opt/a b', 'bar' : '/opt/a b /bar', 'baz' : '/opt/a b /bar /baz' })
+        for (k, v) in values.items():
+            self.assertEqual(v, env.subst('${%s}' % k))
+
+    def test_resolve_triples_5(self):
+        """resolve_triples() should convert lists and other values as env.subst() does"""
+        import SCons.Environment
+        env = SCons.Environment.Environment(tools = [], foo = ['/x', '/y'], bar = '${foo}/bar',
+                                            baz = 5, qux = None)
+        values = SConsGnuArguments.Util.resolve_triples(_test_arg_triples, env)
+        self.assertEqual(values, { 'foo' : '/x /y', 'bar' : '/x /y/bar', 'baz' : '5', 'qux' : '' })
+        for (k, v) in values.items():
+            self.assertEqual(v, env.subst('${%s}' % k))
+
+    def test_resolve_triples_2(self):
+        """resolve_triples(triples, env, cache_file=...) should reuse values until inputs change"""
+        import SCons.Environment
+        import tempfile
+        import shutil
+        import os
+        tmpdir = tempfile.mkdtemp()
+        try:
+            cache_file = os.path.join(tmpdir, 'cache.json')
+            env = SCons.Environment.Environment(tools = [], foo = '${xyz}', bar = '${foo}/bar', xyz = 'XYZ')
+            kw = { 'cache_file' : cache_file, 'arguments' : {} }
+            values = SConsGnuArguments.Util.resolve_triples(_test_arg_triples, env, **kw)
+            self.assertEqual(values, { 'foo' : 'XYZ', 'bar' : 'XYZ/bar' })
+            self.assertTrue(os.path.isfile(cache_file))
+
+            # drop in-process state, so the file is read again
+            SConsGnuArguments.Util._JsonStore._stores.clear()
+            calls = []
+            def subst(s, *args, **kw):
+                calls.append(s)
+                return s
+            env.subst = subst
+            values = SConsGnuArguments.Util.resolve_triples(_test_arg_triples, env, **kw)
+            self.assertEqual(values, { 'foo' : 'XYZ', 'bar' : 'XYZ/bar' })
+            self.assertListEqual(calls, [])
+            del env.subst
+
+            env['xyz'] = 'ZYX'
+            values = SConsGnuArguments.Util.resolve_triples(_test_arg_triples, env, **kw)
+            self.assertEqual(values, { 'foo' : 'ZYX', 'bar' : 'ZYX/bar' })
+
+            kw['arguments'] = { 'foo' : 'ZYX' }
+            self.assertEqual(SConsGnuArguments.Util.resolve_triples(_test_arg_triples, env, **kw), values)
+        finally:
+            SConsGnuArguments.Util._JsonStore._stores.clear()
+            shutil.rmtree(tmpdir)
+
+#############################################################################
+class Test_dir_nodes_from_triples(unittest.TestCase):
+    """Test SConsGnuArguments.Util.dir_nodes_from_triples()"""
+    def env(self):
+        import SCons.Environment
+        env = SCons.Environment.Environment(tools = [])
+        env.Replace(**dict((t[0], t[2]) for t in _test_arg_triples))
+        return env
+
+    def test_dir_nodes_from_triples_1(self):
+        """dir_nodes_from_triples() should return cached nodes until variables change"""
+        env = self.env()
+        registry = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        nodes = SConsGnuArguments.Util.dir_nodes_from_triples(registry, env)
+        self.assertEqual(sorted(nodes.keys()), ['bar', 'baz', 'foo', 'qux'])
+        self.assertIs(nodes['baz'], env.Dir('FOO/bar/baz'))
+        again = SConsGnuArguments.Util.dir_nodes_from_triples(registry, env)
+        self.assertEqual(again, nodes)
+        env['foo'] = 'FOO2'
+        nodes = SConsGnuArguments.Util.dir_nodes_from_triples(registry, env)
+        self.assertIs(nodes['baz'], env.Dir('FOO2/bar/baz'))
+
+    def test_dir_nodes_from_triples_2(self):
+        """dir_nodes_from_triples() should keep separate caches for environments and filters"""
+        env1 = self.env()
+        env2 = env1.Clone(foo = 'FOO2')
+        nodes1 = SConsGnuArguments.Util.dir_nodes_from_triples(_test_arg_triples, env1)
+        nodes2 = SConsGnuArguments.Util.dir_nodes_from_triples(_test_arg_triples, env2)
+        self.assertIs(nodes1['bar'], env1.Dir('FOO/bar'))
+        self.assertIs(nodes2['bar'], env2.Dir('FOO2/bar'))
+        nodes = SConsGnuArguments.Util.dir_nodes_from_triples(_test_arg_triples, env1, name_filter = ['qux'])
+        self.assertEqual(list(nodes.keys()), ['qux'])
+
+    def test_dir_nodes_from_triples_3(self):
+        """dir_nodes_from_triples() should notice added variables and values modified in place"""
+        env = self.env()
+        registry = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        del env['qux']
+        nodes = SConsGnuArguments.Util.dir_nodes_from_triples(registry, env)
+        self.assertEqual(sorted(nodes.keys()), ['bar', 'baz', 'foo'])
+        env['qux'] = ['${foo}']
+        self.assertIs(SConsGnuArguments.Util.dir_nodes_from_triples(registry, env, 'qux'), env.Dir('FOO'))
+        env['qux'][0] = 'QUX'
+        self.assertIs(SConsGnuArguments.Util.dir_nodes_from_triples(registry, env, 'qux'), env.Dir('QUX'))
+
+    def test__env_cache_1(self):
+        """_env_cache() should drop the cache of garbage-collected environment"""
+        import gc
+        env = self.env()
+        SConsGnuArguments.Util._env_cache(env)['x'] = 1
+        self.assertEqual(SConsGnuArguments.Util._env_cache(env), { 'x' : 1 })
+        ident = id(env)
+        del env
+        gc.collect()
+        self.assertFalse(ident in SConsGnuArguments.Util._env_caches)
+
+#############################################################################
+class Test_stage_values(unittest.TestCase):
+    """Test SConsGnuArguments.Util.stage_values()"""
+    def test_stage_values_1(self):
+        """stage_values() should prefix directory values only"""
+        values = { 'prefix' : '/usr', 'bindir' : '/usr/bin', 'man1ext' : '.1', 'foo' : '/x' }
+        self.assertEqual(SConsGnuArguments.Util.stage_values(values, '/stage'),
+                         { 'prefix' : '/stage/usr', 'bindir' : '/stage/usr/bin' })
+        self.assertEqual(SConsGnuArguments.Util.stage_values(values, ''),
+                         { 'prefix' : '/usr', 'bindir' : '/usr/bin' })
+
+    def test_stage_values_2(self):
+        """stage_values() should take categories from registry"""
+        registry = SConsGnuArguments.Util._ArgumentRegistry([
+            SConsGnuArguments.Util.ArgumentSpec('foo', 'Foo', '/x', category = 'dir') ])
+        self.assertEqual(SConsGnuArguments.Util.stage_values({ 'foo' : '/x' }, '/s', registry), { 'foo' : '/s/x' })
+
+#############################################################################
+class Test_ProfileStats(unittest.TestCase):
+    """Test SConsGnuArguments.Util.ProfileStats and profiling hooks"""
+    def test_ProfileStats_1(self):
+        """ProfileStats installed with add_profile_hook() should collect statistics"""
+        stats = SConsGnuArguments.Util.ProfileStats()
+        SConsGnuArguments.Util.add_profile_hook(stats)
+        try:
+            SConsGnuArguments.Util.arguments_from_triples(_test_arg_triples, name_filter = ['foo', 'bar'])
+        finally:
+            SConsGnuArguments.Util.remove_profile_hook(stats)
+        self.assertEqual(sorted(stats.phases.keys()), ['arguments_from_triples', 'map_triples', 'nameconv'])
+        self.assertEqual(stats.phases['arguments_from_triples']['calls'], 1)
+        self.assertEqual(stats.phases['arguments_from_triples']['triples'], 2)
+        self.assertEqual(stats.phases['map_triples']['triples'], 2)
+        self.assertTrue('arguments_from_triples' in stats.table())
+        self.assertTrue('"map_triples"' in stats.json())
+
+    def test_ProfileStats_2(self):
+        """Removed hook should not be called anymore"""
+        stats = SConsGnuArguments.Util.ProfileStats()
+        SConsGnuArguments.Util.add_profile_hook(stats)
+        SConsGnuArguments.Util.remove_profile_hook(stats)
+        SConsGnuArguments.Util.names_from_triples(_test_arg_triples)
+        self.assertEqual(len(stats.phases), 0)
+
+    def test_ProfileStats_3(self):
+        """map_triples() should be reported when the result is consumed"""
+        stats = SConsGnuArguments.Util.ProfileStats()
+        SConsGnuArguments.Util.add_profile_hook(stats)
+        try:
+            names = SConsGnuArguments.Util.names_from_triples(_test_arg_triples)
+            self.assertEqual(len(stats.phases), 0)
+            self.assertEqual(list(names), ['foo', 'bar', 'baz', 'qux'])
+        finally:
+            SConsGnuArguments.Util.remove_profile_hook(stats)
+        self.assertEqual(stats.phases['map_triples']['calls'], 1)
+        self.assertEqual(stats.phases['map_triples']['triples'], 4)
+
+#############################################################################
+class Test_schema(unittest.TestCase):
+    """Test the frozen schema: SConsGnuArguments.Util.schema_digest(),
+    schema_table(), schema_source() and frozen_declarations()"""
+    def setUp(self):
+        self.saved_module = SConsGnuArguments.Util._schema_module
+
+    def tearDown(self):
+        SConsGnuArguments.Util._schema_module = self.saved_module
+
+    def install(self, tables):
+        import types
+        module = types.ModuleType('_schema')
+        exec(SConsGnuArguments.Util.schema_source(tables), module.__dict__)
+        SConsGnuArguments.Util._schema_module = module
+        return module
+
+    def test_schema_digest_1(self):
+        """schema_digest() should change with the tables"""
+        registry = SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples)
+        digest = registry.digest()
+        self.assertEqual(digest, SConsGnuArguments.Util._ArgumentRegistry(_test_arg_triples).digest())
+        registry.append(('foo', 'Foo argument', 'FOO2'))
+        self.assertNotEqual(registry.digest(), digest)
+        registry.append(('foo', 'Foo argument', 'FOO'))
+        self.assertEqual(registry.digest(), digest)
+
+    def test_schema_table_1(self):
+        """schema_table() should compute declarations and digest of SConsArguments"""
+        table = SConsGnuArguments.Util.schema_table(_test_arg_triples, 'abc', { 'opt_key_transform' : False })
+        self.assertEqual(table['digest'], 'abc')
+        self.assertEqual([n for (n, _) in table['declarations']], ['foo', 'bar', 'baz', 'qux'])
+        self.assertEqual(table['declarations'][1][1]['default'], '${foo}/bar')
+        self.assertEqual(table['scons_arguments'],
+                         SConsGnuArguments.Util._scons_arguments_digest({ 'opt_key_transform' : False }))
+        self.assertNotEqual(table['scons_arguments'],
+                            SConsGnuArguments.Util._scons_arguments_digest({ 'env_key_prefix' : 'GNU_' }))
+
+    def test_schema_source_1(self):
+        """schema_source() should generate module with the tables"""
+        triples = _test_arg_triples + [ ('undef', 'Undefined', SConsArguments.UNDEFINED) ]
+        table = SConsGnuArguments.Util.schema_table(triples, 'abc', { 'opt_key_transform' : False })
+        module = self.install({ 'test' : table })
+        self.assertEqual(module.VERSION, SConsGnuArguments.Util._schema_version)
+        frozen = module.TABLES['test']
+        self.assertEqual([(n, d) for (n, d) in frozen['declarations']], table['declarations'])
+        self.assertIs(frozen['declarations'][-1][1]['default'], SConsArguments.UNDEFINED)
+        self.assertEqual(frozen['scons_arguments'], table['scons_arguments'])
+
+    def test_frozen_declarations_1(self):
+        """frozen_declarations() should return declarations only for matching digest and keywords"""
+        kw = { 'opt_key_transform' : False }
+        table = SConsGnuArguments.Util.schema_table(_test_arg_triples, 'abc', kw)
+        self.install({ 'test' : table })
+        decls = SConsGnuArguments.Util.frozen_declarations('test', 'abc', kw)
+        self.assertEqual(sorted(decls.keys()), ['bar', 'baz', 'foo', 'qux'])
+        self.assertEqual(decls['bar'].get_env_default(), '${foo}/bar')
+        again = SConsGnuArguments.Util.frozen_declarations('test', 'abc', kw)
+        self.assertIsNot(again['bar'], decls['bar'])
+        self.assertEqual(again['bar'].get_env_default(), '${foo}/bar')
+        self.assertIsNone(SConsGnuArguments.Util.frozen_declarations('test', 'xyz', kw))
+        self.assertIsNone(SConsGnuArguments.Util.frozen_declarations('test', 'abc', {}))
+        self.assertIsNone(SConsGnuArguments.Util.frozen_declarations('other', 'abc', kw))
+
+    def test_frozen_declarations_3(self):
+        """frozen_declarations() should return None if SConsArguments has changed"""
+        kw = { 'opt_key_transform' : False }
+        table = SConsGnuArguments.Util.schema_table(_test_arg_triples, 'abc', kw)
+        table['scons_arguments'] = SConsGnuArguments.Util._digest(['other'])
+        self.install({ 'test' : table })
+        self.assertIsNone(SConsGnuArguments.Util.frozen_declarations('test', 'abc', kw))
+
+    def test_frozen_declarations_2(self):
+        """frozen_declarations() should return None if there is no schema module"""
+        SConsGnuArguments.Util._schema_module = False
+        self.assertIsNone(SConsGnuArguments.Util.frozen_declarations('test', 'abc', {}))
+
+#############################################################################
+if __name__ == "__main__":
+    ldr = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    # Load tests to test suite
+    tclasses = [ Test_ArgumentSpec
+               , Test__ArgumentRegistry
+               , Test_map_triples
+               , Test__DeclarationsCache
+               , Test__fingerprint_kw
+               , Test_arguments_from_triples
+               , Test_endpoint_names
+               , Test__LazyArgumentDeclarations
+               , Test_references
+               , Test_toposort
+               , Test__Resolver
+               , Test_resolve_triples
+               , Test_dir_nodes_from_triples
+               , Test_stage_values
+               , Test_ProfileStats
+               , Test_schema
+               ]
+
+    for tclass in tclasses:
+        suite.addTests(ldr.loadTestsFromTestCase(tclass))
+
+    if not unittest.TextTestRunner(verbosity = 2).run(suite).wasSuccessful():
+        sys.exit(1)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4: